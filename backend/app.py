@@ -1,101 +1,169 @@
-from flask import Flask, request, jsonify
+import math
+from time import perf_counter
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import json
-import os
+
+from cache_respostas import (
+    CACHE_CONTROL, dados_da_consulta, estatisticas_cache_respostas, etag_confere, resposta_calculo
+)
+from calculo import ErroCalculo, ler_data_referencia, ler_periodo, ler_subclasse
+from cep_resolver import CepError, buscar_distribuidora_local, estatisticas_cache, resolver_uf
+from historico import obter_historico
+from lote import (
+    calcular_lote, ler_lote_json, ler_lote_ndjson, serializar_json, serializar_ndjson
+)
+from metricas import exportar, registrar_excecao, registrar_fases, registrar_requisicao
+from projecao import ler_projecao, projetar
+from tarifa_store import obter_store
 
 app = Flask(__name__)
 CORS(app)
 
-# Carregar dados de tarifas
-def load_tarifas():
-    with open('data/tarifas.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+@app.before_request
+def _inicio_requisicao():
+    request.environ['metricas.inicio'] = perf_counter()
 
-# Carregar bandeira tarifária atual
-def load_bandeira():
-    with open('data/bandeira.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+@app.after_request
+def _fim_requisicao(resposta):
+    # Respostas em streaming (lote) contam até o início do envio
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    registrar_requisicao(rota, resposta.status_code,
+                         perf_counter() - request.environ['metricas.inicio'])
+    return resposta
 
-@app.route('/calculate', methods=['POST'])
+@app.route('/calculate', methods=['GET', 'POST'])
 def calculate():
+    # Início e fim de cada fase (entrada, cep, tarifas, calculo,
+    # serializacao), para as métricas
+    marcas = [perf_counter()]
     try:
-        data = request.get_json()
+        # GET (query string) permite que a CDN sirva repetições do cálculo
+        data = request.get_json() if request.method == 'POST' else dados_da_consulta(request.args)
         cep = data.get('cep', '').replace('-', '').strip()
         consumo = float(data.get('consumo', 0))
 
         if not cep or consumo <= 0:
             return jsonify({'error': 'CEP e consumo são obrigatórios'}), 400
+        # NaN passa no teste acima e nunca acerta o cache de respostas
+        if not math.isfinite(consumo):
+            return jsonify({'error': 'Consumo inválido'}), 400
+
+        # Data de referência e período de leitura opcionais (tarifa e bandeira
+        # do mês, pelo histórico e pelo calendário de bandeiras) e subclasse
+        # (descontos por faixa da Tarifa Social)
+        try:
+            data_referencia = ler_data_referencia(data.get('data_referencia'))
+            periodo = ler_periodo(data.get('periodo'))
+            subclasse = ler_subclasse(data.get('subclasse'))
+        except ErroCalculo as e:
+            return jsonify({'error': str(e)}), e.status
+        marcas.append(perf_counter())
+
+        # Buscar estado pelo índice local de CEPs (ViaCEP como fallback)
+        try:
+            estado = resolver_uf(cep)
+        except CepError as e:
+            return jsonify({'error': str(e)}), e.status
+
+        # Distribuidora que atende o CEP (None fora das faixas mapeadas)
+        distribuidora = buscar_distribuidora_local(cep)
+        marcas.append(perf_counter())
+
+        # Snapshot atual de tarifas e bandeira (recarregado se o sync atualizar)
+        snapshot = obter_store().snapshot()
+        marcas.append(perf_counter())
+
+        # Corpo já serializado do cache de respostas (mesma chave e mesma
+        # versão dos dados), com ETag forte
+        try:
+            corpo, etag = resposta_calculo(snapshot, estado, consumo, distribuidora,
+                                           data_referencia, periodo, subclasse)
+        except ErroCalculo as e:
+            return jsonify({'error': str(e)}), e.status
+        marcas.append(perf_counter())
+
+        if etag_confere(request.headers.get('If-None-Match'), etag):
+            resposta = Response(status=304)
+        else:
+            resposta = Response(corpo, mimetype='application/json')
+        resposta.headers['ETag'] = etag
+        resposta.headers['Cache-Control'] = CACHE_CONTROL
+        marcas.append(perf_counter())
+        registrar_fases(marcas)
+        return resposta
 
-        # Buscar estado pela API ViaCEP
-        import requests
-        response = requests.get(f'https://viacep.com.br/ws/{cep}/json/')
-
-        if response.status_code != 200:
-            return jsonify({'error': 'CEP inválido'}), 400
-
-        cep_data = response.json()
-
-        if 'erro' in cep_data:
-            return jsonify({'error': 'CEP não encontrado'}), 404
-
-        estado = cep_data.get('uf')
-
-        # Carregar dados de tarifas e bandeira
-        tarifas = load_tarifas()
-        bandeira_data = load_bandeira()
-
-        # Buscar tarifa do estado
-        tarifa_estado = None
-        for tarifa in tarifas['tarifas']:
-            if tarifa['estado'] == estado:
-                tarifa_estado = tarifa
-                break
-
-        if not tarifa_estado:
-            return jsonify({'error': 'Estado não encontrado na base de dados'}), 404
-
-        # Calcular valor
-        tarifa_kwh = tarifa_estado['tarifa']
-        valor_energia = consumo * tarifa_kwh
-
-        # Adicionar valor da bandeira
-        bandeira = bandeira_data['bandeira_atual']
-        valor_bandeira_kwh = bandeira_data['valor_kwh']
-        valor_bandeira_total = consumo * valor_bandeira_kwh
-
-        valor_total = valor_energia + valor_bandeira_total
-
-        # Encontrar estados mais barato e mais caro
-        tarifas_ordenadas = sorted(tarifas['tarifas'], key=lambda x: x['tarifa'])
-        mais_barato = tarifas_ordenadas[0]
-        mais_caro = tarifas_ordenadas[-1]
-
-        return jsonify({
-            'distribuidora': tarifa_estado['distribuidora'],
-            'estado': estado,
-            'tarifa': tarifa_kwh,
-            'bandeira': bandeira,
-            'valor_bandeira': valor_bandeira_total,
-            'valor_total': valor_total,
-            'comparacao': {
-                'mais_barato': {
-                    'estado': mais_barato['estado'],
-                    'tarifa': mais_barato['tarifa']
-                },
-                'mais_caro': {
-                    'estado': mais_caro['estado'],
-                    'tarifa': mais_caro['tarifa']
-                }
-            },
-            'ultima_atualizacao_dados': tarifas['ultima_atualizacao']
-        })
+    except Exception as e:
+        registrar_excecao(request.url_rule.rule, e)
+        return jsonify({'error': str(e)}), 500
 
+@app.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
+    try:
+        # Array JSON (ou {"itens": [...]}) ou NDJSON, um item por linha
+        if request.mimetype == 'application/x-ndjson':
+            lote = ler_lote_ndjson(request.stream)
+        else:
+            data = request.get_json()
+            if isinstance(data, dict):
+                data = data.get('itens')
+            lote = ler_lote_json(data)
+
+        # CEPs resolvidos antes de começar a enviar a resposta
+        snapshot = obter_store().snapshot()
+        resultados = calcular_lote(snapshot, lote)
+    except ErroCalculo as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
+        registrar_excecao(request.url_rule.rule, e)
         return jsonify({'error': str(e)}), 500
 
+    if request.accept_mimetypes.best == 'application/x-ndjson':
+        return Response(serializar_ndjson(resultados), mimetype='application/x-ndjson')
+    return Response(serializar_json(snapshot, resultados), mimetype='application/json')
+
+@app.route('/projection', methods=['POST'])
+def projection():
+    try:
+        cep, mes_inicial, consumos = ler_projecao(request.get_json(silent=True))
+
+        # CEP resolvido uma única vez para todos os meses
+        estado = resolver_uf(cep)
+        distribuidora = buscar_distribuidora_local(cep)
+
+        snapshot = obter_store().snapshot()
+        return jsonify(projetar(snapshot, estado, distribuidora, mes_inicial, consumos))
+    except (ErroCalculo, CepError) as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        registrar_excecao(request.url_rule.rule, e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/tarifas/history', methods=['GET'])
+def tarifas_history():
+    uf = request.args.get('uf', '').strip().upper()
+    if not uf:
+        return jsonify({'error': 'Parâmetro uf é obrigatório'}), 400
+
+    try:
+        janelas = obter_historico().janelas_estado(uf, request.args.get('distribuidora'))
+    except Exception as e:
+        registrar_excecao(request.url_rule.rule, e)
+        return jsonify({'error': str(e)}), 500
+
+    if not janelas:
+        return jsonify({'error': 'Sem histórico de tarifas para o estado'}), 404
+    return jsonify({'uf': uf, 'total': len(janelas), 'vigencias': janelas})
+
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    return jsonify({'status': 'ok', 'cache_cep': estatisticas_cache(),
+                    'cache_respostas': estatisticas_cache_respostas()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    texto = exportar({'cep': estatisticas_cache(), 'respostas': estatisticas_cache_respostas()})
+    return Response(texto, mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
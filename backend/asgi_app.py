@@ -0,0 +1,315 @@
+"""
+Variante ASGI (assíncrona) da API.
+
+Mesmas rotas e respostas de api/index.py para /api/calculate,
+/api/health e /api/metrics, mas a consulta à ViaCEP (CEPs fora do
+índice local) é feita com um cliente HTTP assíncrono. Enquanto uma
+consulta espera a rede, o processo continua atendendo outras
+requisições, então centenas de requisições podem ficar em andamento sem
+ocupar uma thread cada.
+
+Execução (na pasta backend):
+    uvicorn asgi_app:app --port 5001
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+from time import perf_counter
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp
+
+from cache_respostas import (
+    CACHE_CONTROL, dados_da_consulta, estatisticas_cache_respostas, etag_confere, resposta_calculo
+)
+from calculo import ErroCalculo, ler_data_referencia, ler_periodo, ler_subclasse
+from cep_resolver import (
+    VIACEP_URL, CepError, buscar_distribuidora_local, buscar_uf_local, estatisticas_cache,
+    obter_cache_viacep, uf_da_resposta_viacep, validar_cep
+)
+from metricas import (
+    exportar, registrar_excecao, registrar_fases, registrar_requisicao, registrar_upstream
+)
+from tarifa_store import obter_store
+from upstream import STATUS_TRANSITORIOS, TIMEOUTS, Disjuntor
+
+# Máximo de consultas simultâneas à ViaCEP por processo
+VIACEP_CONCORRENCIA = int(os.environ.get('VIACEP_CONCORRENCIA', 200))
+
+# Host da ViaCEP nas métricas de chamadas externas
+HOST_VIACEP = urlsplit(VIACEP_URL).hostname or ''
+
+
+class ResolvedorCepAsync:
+    """
+    Resolve CEP → UF sem bloquear o event loop.
+
+    Usa o mesmo índice local e o mesmo cache da versão síncrona; consultas
+    simultâneas ao mesmo CEP compartilham uma única chamada à ViaCEP.
+    """
+
+    def __init__(self, concorrencia=VIACEP_CONCORRENCIA, tentativas=2,
+                 backoff_base=0.2, backoff_max=2.0):
+        self.concorrencia = concorrencia
+        self.tentativas = tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.disjuntor = Disjuntor()
+        self._cliente = None
+        self._semaforo = None
+        self._em_voo = {}
+
+    def _obter_cliente(self):
+        if self._cliente is None:
+            conexao, leitura = TIMEOUTS['viacep.com.br']
+            self._cliente = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(sock_connect=conexao, sock_read=leitura),
+                connector=aiohttp.TCPConnector(limit=self.concorrencia)
+            )
+            self._semaforo = asyncio.Semaphore(self.concorrencia)
+        return self._cliente
+
+    async def fechar(self):
+        if self._cliente is not None:
+            await self._cliente.close()
+            self._cliente = None
+
+    async def _consultar(self, cep):
+        cliente = self._obter_cliente()
+        async with self._semaforo:
+            if not self.disjuntor.permitir():
+                registrar_upstream(HOST_VIACEP, 'circuito_aberto')
+                raise CepError('Serviço de CEP indisponível', 503)
+
+            for tentativa in range(self.tentativas):
+                if tentativa:
+                    teto = min(self.backoff_max, self.backoff_base * (2 ** tentativa))
+                    await asyncio.sleep(random.uniform(0, teto))
+                try:
+                    async with cliente.get(VIACEP_URL.format(cep=cep)) as response:
+                        status = response.status
+                        cep_data = await response.json(content_type=None) if status == 200 else None
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    registrar_upstream(HOST_VIACEP, 'erro_conexao')
+                    continue
+                if status in STATUS_TRANSITORIOS:
+                    registrar_upstream(HOST_VIACEP, 'status_transitorio')
+                    continue
+
+                registrar_upstream(HOST_VIACEP, 'sucesso')
+                self.disjuntor.registrar_sucesso()
+                try:
+                    return uf_da_resposta_viacep(status, cep_data)
+                except CepError as e:
+                    # "Não encontrado" vira resultado (cache negativo)
+                    if e.status == 404:
+                        return e
+                    raise
+
+            registrar_upstream(HOST_VIACEP, 'falha')
+            self.disjuntor.registrar_falha()
+            raise CepError('Serviço de CEP indisponível', 503)
+
+    async def resolver_uf(self, cep):
+        cep = validar_cep(cep)
+
+        estado = buscar_uf_local(cep)
+        if estado:
+            return estado
+
+        cache = obter_cache_viacep()
+        resultado = cache.obter(cep)
+
+        if resultado is None:
+            futuro = self._em_voo.get(cep)
+            if futuro is not None:
+                resultado = await asyncio.shield(futuro)
+            else:
+                futuro = self._em_voo[cep] = asyncio.get_running_loop().create_future()
+                try:
+                    resultado = await self._consultar(cep)
+                except Exception as e:
+                    futuro.set_exception(e)
+                    # Evita o aviso de exceção nunca recuperada
+                    futuro.exception()
+                    raise
+                else:
+                    cache.definir(cep, resultado)
+                    futuro.set_result(resultado)
+                finally:
+                    del self._em_voo[cep]
+                    if not futuro.done():
+                        # Líder cancelado (cliente desconectou): quem espera
+                        # o mesmo CEP recebe erro em vez de ficar pendurado
+                        futuro.set_exception(CepError('Consulta de CEP interrompida', 503))
+                        futuro.exception()
+
+        if isinstance(resultado, CepError):
+            raise resultado
+        return resultado
+
+
+resolvedor = ResolvedorCepAsync()
+
+
+async def _ler_corpo(receive):
+    corpo = b''
+    while True:
+        mensagem = await receive()
+        corpo += mensagem.get('body', b'')
+        if not mensagem.get('more_body'):
+            return corpo
+
+
+def _cabecalho(scope, nome):
+    for chave, valor in scope.get('headers', ()):
+        if chave == nome:
+            return valor.decode('latin-1')
+    return None
+
+
+async def _responder(send, status, dados, cabecalhos=()):
+    # `dados` já serializado (bytes) vem do cache de respostas ou do /metrics
+    corpo = dados if isinstance(dados, bytes) else json.dumps(dados).encode('utf-8')
+    if not any(nome == b'content-type' for nome, _ in cabecalhos):
+        cabecalhos = [(b'content-type', b'application/json'), *cabecalhos]
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            *cabecalhos,
+            (b'content-length', str(len(corpo)).encode()),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': corpo})
+
+
+async def calculate(scope, receive):
+    # Início e fim de cada fase (entrada, cep, tarifas, calculo), para as métricas
+    marcas = [perf_counter()]
+    try:
+        if scope['method'] == 'POST':
+            data = json.loads(await _ler_corpo(receive) or b'null')
+        else:
+            data = dados_da_consulta(dict(parse_qsl(scope.get('query_string', b'').decode('latin-1'))))
+        cep = data.get('cep', '').replace('-', '').strip()
+        consumo = float(data.get('consumo', 0))
+
+        if not cep or consumo <= 0:
+            return 400, {'error': 'CEP e consumo são obrigatórios'}
+        # NaN passa no teste acima e nunca acerta o cache de respostas
+        if not math.isfinite(consumo):
+            return 400, {'error': 'Consumo inválido'}
+
+        # Data de referência e período de leitura opcionais (tarifa e bandeira
+        # do mês, pelo histórico e pelo calendário de bandeiras) e subclasse
+        # (descontos por faixa da Tarifa Social)
+        try:
+            data_referencia = ler_data_referencia(data.get('data_referencia'))
+            periodo = ler_periodo(data.get('periodo'))
+            subclasse = ler_subclasse(data.get('subclasse'))
+        except ErroCalculo as e:
+            return e.status, {'error': str(e)}
+        marcas.append(perf_counter())
+
+        # Buscar estado pelo índice local de CEPs (ViaCEP assíncrona como fallback)
+        try:
+            estado = await resolvedor.resolver_uf(cep)
+        except CepError as e:
+            return e.status, {'error': str(e)}
+
+        # Distribuidora que atende o CEP (None fora das faixas mapeadas)
+        distribuidora = buscar_distribuidora_local(cep)
+        marcas.append(perf_counter())
+
+        snapshot = obter_store().snapshot()
+        marcas.append(perf_counter())
+
+        try:
+            corpo, etag = resposta_calculo(snapshot, estado, consumo, distribuidora,
+                                           data_referencia, periodo, subclasse)
+        except ErroCalculo as e:
+            return e.status, {'error': str(e)}
+        marcas.append(perf_counter())
+        registrar_fases(marcas)
+
+        cabecalhos = [(b'etag', etag.encode()), (b'cache-control', CACHE_CONTROL.encode())]
+        if etag_confere(_cabecalho(scope, b'if-none-match'), etag):
+            return 304, b'', cabecalhos
+        return 200, corpo, cabecalhos
+
+    except Exception as e:
+        registrar_excecao(scope['path'], e)
+        return 500, {'error': str(e)}
+
+
+async def health(scope, receive):
+    return 200, {
+        'status': 'ok',
+        'message': 'API is running',
+        'cache_cep': estatisticas_cache(),
+        'cache_respostas': estatisticas_cache_respostas()
+    }
+
+
+async def metrics(scope, receive):
+    texto = exportar({'cep': estatisticas_cache(), 'respostas': estatisticas_cache_respostas()})
+    return 200, texto.encode('utf-8'), [(b'content-type', b'text/plain; version=0.0.4; charset=utf-8')]
+
+
+ROTAS = {
+    ('GET', '/calculate'): calculate,
+    ('GET', '/api/calculate'): calculate,
+    ('POST', '/calculate'): calculate,
+    ('POST', '/api/calculate'): calculate,
+    ('GET', '/health'): health,
+    ('GET', '/api/health'): health,
+    ('GET', '/metrics'): metrics,
+    ('GET', '/api/metrics'): metrics,
+}
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await resolvedor.fechar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    metodo = scope['method']
+    caminho = scope['path'].rstrip('/') or '/'
+
+    if metodo == 'OPTIONS':
+        await send({
+            'type': 'http.response.start',
+            'status': 204,
+            'headers': [
+                (b'access-control-allow-origin', b'*'),
+                (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+                (b'access-control-allow-headers', b'content-type, if-none-match'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    inicio = perf_counter()
+    rota = ROTAS.get((metodo, caminho))
+    if rota is None:
+        await _responder(send, 404, {'error': 'Rota não encontrada'})
+        registrar_requisicao('desconhecida', 404, perf_counter() - inicio)
+        return
+
+    status, dados, *cabecalhos = await rota(scope, receive)
+    await _responder(send, status, dados, *cabecalhos)
+    registrar_requisicao(caminho, status, perf_counter() - inicio)
@@ -0,0 +1,138 @@
+"""
+Calendário das bandeiras tarifárias.
+
+Além da bandeira atual, bandeira.json traz o `calendario` de
+acionamentos: uma entrada por mês de competência ("AAAA-MM"), gravada
+pela sincronização com a ANEEL (RESOURCE_BANDEIRA). O CalendarioBandeiras
+indexa o calendário pelo número do mês (ano * 12 + mês - 1), então a
+bandeira de um mês é um acesso a dicionário; meses fora do calendário
+usam a bandeira atual. A divisão de um período de leitura entre os meses
+que ele atravessa fica memorizada no próprio calendário, que é montado
+uma vez por snapshot de tarifas.
+"""
+
+from datetime import date, timedelta
+
+# Máximo de períodos de leitura memorizados por calendário
+LIMITE_MEMO = 4096
+
+
+def indice_mes(data):
+    """Número do mês da data (ano * 12 + mês - 1)."""
+    return data.year * 12 + data.month - 1
+
+
+def nome_mes(indice):
+    """"AAAA-MM" do número do mês."""
+    return f'{indice // 12:04d}-{indice % 12 + 1:02d}'
+
+
+def normalizar_bandeira(nome):
+    """
+    Nome canônico da bandeira ("Vermelha Patamar 1", ...), como aparece
+    em bandeiras_disponiveis, a partir das variações da ANEEL.
+    """
+    texto = ' '.join(str(nome or '').upper().replace('-', ' ').split())
+    if 'VERDE' in texto:
+        return 'Verde'
+    if 'AMARELA' in texto:
+        return 'Amarela'
+    if 'VERMELHA' in texto:
+        return 'Vermelha Patamar 2' if '2' in texto else 'Vermelha Patamar 1'
+    if 'ESCASSEZ' in texto:
+        return 'Escassez Hídrica'
+    return str(nome or '').strip()
+
+
+def dividir_por_mes(inicio, fim):
+    """
+    [(número do mês, dias), ...] do período de `inicio` a `fim` (inclusive).
+    """
+    partes = []
+    atual = inicio
+    while atual <= fim:
+        proximo = date(atual.year + atual.month // 12, atual.month % 12 + 1, 1)
+        ultimo = min(fim, proximo - timedelta(days=1))
+        partes.append((indice_mes(atual), (ultimo - atual).days + 1))
+        atual = proximo
+    return partes
+
+
+class CalendarioBandeiras:
+    """
+    Bandeira e valor por kWh de cada mês, indexados pelo número do mês.
+    """
+
+    def __init__(self, bandeira_data):
+        self.atual = (bandeira_data['bandeira_atual'], bandeira_data['valor_kwh'])
+        self.por_mes = {}
+        for entrada in bandeira_data.get('calendario', []):
+            mes = date.fromisoformat(entrada['mes'] + '-01')
+            self.por_mes[indice_mes(mes)] = (entrada['bandeira'], entrada['valor_kwh'])
+        self._periodos = {}
+        self._denso = None
+
+    def do_mes(self, indice):
+        """(bandeira, valor por kWh) do mês; a bandeira atual fora do calendário."""
+        return self.por_mes.get(indice, self.atual)
+
+    def do_periodo(self, inicio, fim):
+        """
+        Bandeiras de um período de leitura de `inicio` a `fim` (inclusive).
+
+        O consumo é distribuído entre os meses na proporção dos dias de
+        cada um. Retorna (valor médio por kWh, [(mês, bandeira, valor por
+        kWh, fração do consumo), ...]).
+        """
+        chave = (inicio, fim)
+        resolvido = self._periodos.get(chave)
+        if resolvido is None:
+            total = (fim - inicio).days + 1
+            partes = []
+            for indice, dias in dividir_por_mes(inicio, fim):
+                bandeira, valor_kwh = self.do_mes(indice)
+                partes.append((nome_mes(indice), bandeira, valor_kwh, dias / total))
+            valor_medio = sum(valor_kwh * fracao for _, _, valor_kwh, fracao in partes)
+
+            if len(self._periodos) >= LIMITE_MEMO:
+                self._periodos.clear()
+            resolvido = self._periodos[chave] = (valor_medio, partes)
+        return resolvido
+
+    def _tabela_densa(self):
+        # Calendário em arrays contíguos, do primeiro ao último mês (meses
+        # sem entrada com a bandeira atual); montado na primeira consulta
+        import numpy as np
+
+        if self._denso is None:
+            nomes = [self.atual[0]]
+            codigos_nome = {self.atual[0]: 0}
+            primeiro = min(self.por_mes, default=0)
+            tamanho = max(self.por_mes, default=-1) - primeiro + 1
+            valores = np.full(tamanho, self.atual[1], dtype=float)
+            codigos = np.zeros(tamanho, dtype=np.intp)
+            for indice, (nome, valor_kwh) in self.por_mes.items():
+                if nome not in codigos_nome:
+                    codigos_nome[nome] = len(nomes)
+                    nomes.append(nome)
+                valores[indice - primeiro] = valor_kwh
+                codigos[indice - primeiro] = codigos_nome[nome]
+            self._denso = (primeiro, valores, codigos, nomes)
+        return self._denso
+
+    def dos_meses(self, indices):
+        """
+        Versão vetorizada de do_mes() para um array numpy de números de
+        mês: (valores por kWh, códigos das bandeiras, nomes por código).
+        """
+        import numpy as np
+
+        primeiro, valores, codigos, nomes = self._tabela_densa()
+        if not len(valores):
+            return (np.full(len(indices), self.atual[1], dtype=float),
+                    np.zeros(len(indices), dtype=np.intp), nomes)
+        posicoes = indices - primeiro
+        dentro = (posicoes >= 0) & (posicoes < len(valores))
+        posicoes = np.clip(posicoes, 0, len(valores) - 1)
+        return (np.where(dentro, valores[posicoes], self.atual[1]),
+                np.where(dentro, codigos[posicoes], 0), nomes)
@@ -0,0 +1,90 @@
+"""
+Benchmark: cache de respostas do /calculate.
+
+Confere que o corpo em cache é idêntico ao jsonify(calcular_conta(...))
+do Flask, que uma nova versão dos dados (tarifas.json ou bandeira.json
+alterados) não reaproveita respostas antigas e que If-None-Match com o
+ETag devolve 304. Mede a latência de ponta a ponta do GET
+/api/calculate (cliente de teste do Flask) com o cache quente e com o
+cache esvaziado a cada requisição.
+
+Uso (na pasta backend):
+    python benchmarks/bench_cache_respostas.py
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from caminhos import API_DIR
+
+sys.path.insert(0, API_DIR)
+
+from resultados import percentil
+
+import cache_respostas
+from calculo import calcular_conta
+from tarifa_store import obter_store
+
+import index
+
+CEPS = ['01310100', '30130000', '20040002', '40020000', '80010000', '90010000', '69005000']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache de respostas do /calculate')
+    parser.add_argument('--requisicoes', type=int, default=5000)
+    args = parser.parse_args()
+
+    cliente = index.app.test_client()
+    snapshot = obter_store().snapshot()
+
+    with index.app.app_context():
+        esperado = index.jsonify(calcular_conta(snapshot, 'SP', 150.0)).get_data()
+    corpo, etag = cache_respostas.resposta_calculo(snapshot, 'SP', 150.0)
+    if corpo != esperado:
+        print("❌ Corpo em cache diferente do jsonify do Flask")
+        sys.exit(1)
+
+    # Nova versão dos dados (outra bandeira): nada do cache antigo é reaproveitado
+    outra_bandeira = {**snapshot.bandeira, 'bandeira_atual': 'Verde', 'valor_kwh': 0.0}
+    novo = snapshot._replace(bandeira=outra_bandeira, versao='outra-versao')
+    corpo_novo, etag_novo = cache_respostas.resposta_calculo(novo, 'SP', 150.0)
+    if corpo_novo == corpo or etag_novo == etag:
+        print("❌ Resposta da versão anterior reaproveitada")
+        sys.exit(1)
+
+    resposta = cliente.get('/api/calculate?cep=01310100&consumo=150')
+    revalidada = cliente.get('/api/calculate?cep=01310100&consumo=150',
+                             headers={'If-None-Match': resposta.headers['ETag']})
+    if revalidada.status_code != 304:
+        print(f"❌ If-None-Match devolveu {revalidada.status_code}")
+        sys.exit(1)
+
+    rng = random.Random(9)
+    urls = [f'/api/calculate?cep={rng.choice(CEPS)}&consumo={rng.choice(range(50, 550, 10))}'
+            for _ in range(args.requisicoes)]
+
+    def medir(esvaziar):
+        latencias = []
+        for url in urls:
+            if esvaziar:
+                cache_respostas._cache.limpar()
+            t = time.perf_counter()
+            cliente.get(url)
+            latencias.append(time.perf_counter() - t)
+        return latencias
+
+    medir(False)
+    quente = medir(False)
+    frio = medir(True)
+
+    print("✅ Corpo idêntico ao jsonify, invalidação por versão e 304 com If-None-Match")
+    for nome, latencias in (('cache quente', quente), ('sem cache', frio)):
+        print(f"{nome:<13} p50 {percentil(latencias, 50) * 1e6:7.1f} µs  "
+              f"p99 {percentil(latencias, 99) * 1e6:7.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
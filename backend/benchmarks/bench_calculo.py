@@ -0,0 +1,104 @@
+"""
+Microbenchmarks do caminho de cálculo, sem rede.
+
+Mede, por chamada, as peças do /calculate e do lote: busca da tarifa
+(IndiceTarifas), resolução local do CEP, calcular_conta() nas suas
+variações (simples, com data de referência, com subclasse), o cache de
+respostas e o cálculo em lote por item. Cada medida é a mediana de
+várias rodadas, para reduzir o ruído entre execuções.
+
+Uso (na pasta backend):
+    python benchmarks/bench_calculo.py --output calculo.json
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import caminhos  # põe backend/ no sys.path
+
+from resultados import gravar
+
+import cache_respostas
+from calculo import calcular_conta, ler_data_referencia
+from cep_resolver import buscar_distribuidora_local, buscar_uf_local
+from lote import calcular_lote, ler_lote_json
+from tarifa_store import obter_store
+
+CEPS = ['01310100', '30130000', '20040002', '40020000', '80010000', '90010000', '60060000']
+TAMANHO_LOTE = 1000
+
+
+def _medir(funcao, repeticoes, rodadas):
+    """Mediana (µs por chamada) de `rodadas` laços de `repeticoes` chamadas."""
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / repeticoes)
+    return statistics.median(tempos) * 1e6
+
+
+def casos(snapshot):
+    """{nome: (função sem argumentos, chamadas por execução)}"""
+    estados = [buscar_uf_local(cep) for cep in CEPS]
+    distribuidoras = [buscar_distribuidora_local(cep) for cep in CEPS]
+    indice = snapshot.indice
+    n = len(CEPS)
+    data_referencia = ler_data_referencia('2025-08-15')
+    contador = iter(range(1 << 62))
+
+    def proximo():
+        return next(contador) % n
+
+    def lote():
+        itens = [{'cep': CEPS[i % n], 'consumo': 50 + i % 500} for i in range(TAMANHO_LOTE)]
+        return list(calcular_lote(snapshot, ler_lote_json(itens)))
+
+    return {
+        'tarifa_para': (lambda: indice.tarifa_para(estados[proximo()], distribuidoras[proximo()]), 1),
+        'comparacao_estado': (lambda: indice.comparacao_estado(estados[proximo()]), 1),
+        'cep_local': (lambda: (buscar_uf_local(CEPS[proximo()]),
+                               buscar_distribuidora_local(CEPS[proximo()])), 1),
+        'calcular_conta': (lambda: calcular_conta(snapshot, estados[proximo()], 150.0), 1),
+        'calcular_conta_data_referencia': (
+            lambda: calcular_conta(snapshot, estados[proximo()], 150.0,
+                                   data_referencia=data_referencia), 1),
+        'calcular_conta_subclasse': (
+            lambda: calcular_conta(snapshot, estados[proximo()], 150.0,
+                                   subclasse='baixa_renda_escalonada'), 1),
+        'resposta_em_cache': (lambda: cache_respostas.resposta_calculo(
+            snapshot, estados[proximo()], 150.0), 1),
+        'lote_por_item': (lote, TAMANHO_LOTE),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks do cálculo')
+    parser.add_argument('--repeticoes', type=int, default=20000, help='chamadas por rodada')
+    parser.add_argument('--rodadas', type=int, default=5)
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    snapshot = obter_store().snapshot()
+    resultados = {}
+    print(f"{'caso':<32} {'µs/chamada':>11}")
+    print("-" * 44)
+    for nome, (funcao, por_execucao) in casos(snapshot).items():
+        # Aquecimento (caches locais, cache de respostas, import tardio)
+        funcao()
+        repeticoes = max(1, args.repeticoes // por_execucao)
+        tempo = _medir(funcao, repeticoes, args.rodadas) / por_execucao
+        resultados[nome] = {'tempo_us': tempo}
+        print(f"{nome:<32} {tempo:11.3f}")
+
+    if args.output:
+        gravar(args.output, 'calculo', resultados,
+               {'repeticoes': args.repeticoes, 'rodadas': args.rodadas,
+                'tamanho_lote': TAMANHO_LOTE})
+
+
+if __name__ == '__main__':
+    main()
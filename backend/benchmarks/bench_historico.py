@@ -0,0 +1,132 @@
+"""
+Benchmark: consulta "tarifa vigente na data" no histórico de tarifas.
+
+Grava num historico.db temporário várias décadas de janelas de vigência
+mensais por distribuidora (com revisões, revisões que voltam ao valor
+original e janelas sobrepostas), confere IndiceHistorico.tarifa_em()
+contra uma varredura linear com a mesma regra e mede: tempo de carga do índice, latência da consulta pelo índice
+(bisect) e pela consulta indexada direto no SQLite.
+
+Uso (na pasta backend):
+    python benchmarks/bench_historico.py --distribuidoras 100 --anos 30
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import caminhos  # põe backend/ no sys.path
+
+from resultados import percentil
+
+from historico import IndiceHistorico, ler_vigencias, registrar_vigencias
+
+
+def gerar_janelas(distribuidoras, anos, seed=5):
+    rng = random.Random(seed)
+    primeiro = date(2025 - anos, 1, 1)
+    for d in range(distribuidoras):
+        nome = f'DISTRIBUIDORA {d:03d}'
+        inicio = primeiro + timedelta(days=rng.randrange(60))
+        while inicio.year < 2026:
+            # Janelas de ~1 mês; de vez em quando, uma que avança sobre a seguinte
+            fim = inicio + timedelta(days=rng.choice([29, 30, 30, 31, 31, 45]))
+            tarifa = round(rng.uniform(0.3, 1.2), 5)
+            yield {'estado': 'SP', 'distribuidora': nome, 'inicio': inicio.isoformat(),
+                   'fim': fim.isoformat(), 'tarifa': tarifa, 'tusd': tarifa / 2, 'te': tarifa / 2}
+            inicio += timedelta(days=30)
+
+
+def tarifa_linear(linhas, distribuidora, dia):
+    # Mesma regra de IndiceHistorico.tarifa_em(), por varredura
+    janelas = {}
+    for linha in linhas:
+        if linha['distribuidora'] == distribuidora:
+            janelas[(linha['inicio'], linha['fim'])] = linha
+    iniciadas = [chave for chave in janelas if date.fromisoformat(chave[0]) <= dia]
+    if not iniciadas:
+        return None
+    cobrem = [chave for chave in iniciadas if date.fromisoformat(chave[1]) >= dia]
+    return janelas[max(cobrem or iniciadas)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consulta por data no histórico de tarifas')
+    parser.add_argument('--distribuidoras', type=int, default=100)
+    parser.add_argument('--anos', type=int, default=30)
+    parser.add_argument('--consultas', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    janelas = list(gerar_janelas(args.distribuidoras, args.anos))
+    # Revisões: mesma janela, valores novos (devem prevalecer)
+    revisadas = rng.sample(janelas, len(janelas) // 50)
+    revisoes = [{**j, 'tusd': j['tusd'] + 0.01, 'tarifa': j['tarifa'] + 0.01} for j in revisadas]
+    # Metade das revisadas volta ao valor original (A -> B -> A): A prevalece
+    reversoes = revisadas[:len(revisadas) // 2]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'historico.db')
+        registrar_vigencias(janelas, caminho)
+        registrar_vigencias(revisoes, caminho)
+        novas = registrar_vigencias(reversoes, caminho)
+        # Reenviar os valores mais recentes não grava nada
+        repetidas = registrar_vigencias(reversoes + revisoes[len(reversoes):], caminho)
+        if novas != len(reversoes) or repetidas:
+            print(f"❌ Gravadas {novas} de {len(reversoes)} reversões e {repetidas} janelas repetidas")
+            sys.exit(1)
+
+        inicio = time.perf_counter()
+        linhas = ler_vigencias(caminho)
+        indice = IndiceHistorico(linhas)
+        carga = time.perf_counter() - inicio
+
+        nomes = [f'DISTRIBUIDORA {d:03d}' for d in range(args.distribuidoras)]
+        primeiro = date(2025 - args.anos, 1, 1).toordinal()
+        consultas = [(rng.choice(nomes), date.fromordinal(rng.randrange(primeiro - 30, date(2027, 1, 1).toordinal())))
+                     for _ in range(args.consultas)]
+
+        conferencias = consultas[:300] + [(j['distribuidora'], date.fromisoformat(j['inicio']))
+                                          for j in revisadas[:100]]
+        for nome, dia in conferencias:
+            if indice.tarifa_em(nome, dia) != tarifa_linear(linhas, nome, dia):
+                print(f"❌ Resultado diferente da varredura linear: {nome} {dia}")
+                sys.exit(1)
+        for janela in reversoes[:100]:
+            tarifa = indice.tarifa_em(janela['distribuidora'], date.fromisoformat(janela['inicio']))
+            if (tarifa['inicio'], tarifa['fim']) == (janela['inicio'], janela['fim']) and tarifa != janela:
+                print(f"❌ Reversão A -> B -> A não prevaleceu: {janela['distribuidora']} {janela['inicio']}")
+                sys.exit(1)
+
+        latencias = []
+        for nome, dia in consultas:
+            t = time.perf_counter()
+            indice.tarifa_em(nome, dia)
+            latencias.append(time.perf_counter() - t)
+
+        conexao = sqlite3.connect(caminho)
+        latencias_sql = []
+        for nome, dia in consultas[:2000]:
+            t = time.perf_counter()
+            conexao.execute(
+                "SELECT tarifa FROM vigencias WHERE estado = ? AND distribuidora = ? AND inicio <= ? "
+                "ORDER BY inicio DESC, id DESC LIMIT 1", ('SP', nome, dia.isoformat())).fetchone()
+            latencias_sql.append(time.perf_counter() - t)
+        conexao.close()
+
+    print(f"✅ Resultados idênticos à varredura linear ({indice.total} janelas, "
+          f"{args.distribuidoras} distribuidoras, {args.anos} anos, {len(reversoes)} reversões A -> B -> A)")
+    print(f"carga do índice:  {carga * 1000:8.1f} ms")
+    print(f"índice (bisect):  p50 {percentil(latencias, 50) * 1e6:7.2f} µs  "
+          f"p99 {percentil(latencias, 99) * 1e6:7.2f} µs")
+    print(f"SQLite indexado:  p50 {percentil(latencias_sql, 50) * 1e6:7.2f} µs  "
+          f"p99 {percentil(latencias_sql, 99) * 1e6:7.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Microbenchmark: identificação distribuidora → estado na sincronização.
+
+Compara a identificação original (match exato + varredura parcial sobre
+todo o DISTRIBUIDORA_ESTADO a cada registro) com o identificador
+compilado, sobre os SigAgente de um fixture sintético da ANEEL. Confere
+antes que os dois devolvem o mesmo estado para cada agente.
+
+Uso (na pasta backend):
+    python benchmarks/bench_identificar_estado.py --registros 50000
+"""
+
+import argparse
+import sys
+import time
+
+import caminhos  # põe backend/ no sys.path
+
+from fixtures_aneel import gerar_registros
+from sync_aneel_data import DISTRIBUIDORA_ESTADO, IdentificadorDistribuidoras
+
+
+def identificar_antigo(distribuidora):
+    distribuidora_upper = distribuidora.upper().strip()
+
+    if distribuidora_upper in DISTRIBUIDORA_ESTADO:
+        return DISTRIBUIDORA_ESTADO[distribuidora_upper]
+
+    for nome, estado in DISTRIBUIDORA_ESTADO.items():
+        if nome in distribuidora_upper or distribuidora_upper in nome:
+            return estado
+
+    return None
+
+
+def medir(funcao, agentes):
+    inicio = time.perf_counter()
+    for agente in agentes:
+        funcao(agente)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Identificação distribuidora → estado')
+    parser.add_argument('--registros', type=int, default=50000)
+    args = parser.parse_args()
+
+    agentes = [r['SigAgente'] for r in gerar_registros(args.registros)]
+
+    identificador = IdentificadorDistribuidoras(DISTRIBUIDORA_ESTADO)
+    divergentes = [a for a in set(agentes) if identificar_antigo(a) != identificador.identificar(a)]
+    if divergentes:
+        print(f"❌ Resultados diferentes para: {sorted(divergentes)}")
+        sys.exit(1)
+
+    tempo_antigo = medir(identificar_antigo, agentes)
+    # Identificador novo (memo vazio), como no início de cada sincronização
+    tempo_novo = medir(IdentificadorDistribuidoras(DISTRIBUIDORA_ESTADO).identificar, agentes)
+
+    print(f"{len(agentes)} registros, {len(set(agentes))} agentes distintos")
+    print(f"original:  {tempo_antigo * 1000:8.1f} ms  ({tempo_antigo / len(agentes) * 1e6:.2f} µs/registro)")
+    print(f"compilado: {tempo_novo * 1000:8.1f} ms  ({tempo_novo / len(agentes) * 1e6:.2f} µs/registro)")
+    print(f"ganho:     {tempo_antigo / tempo_novo:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: custo dos tributos (ICMS, PIS/COFINS) por cálculo.
+
+Confere TabelaImpostos contra a conta feita direto sobre impostos.json
+(faixa por varredura, gross-up por dentro), confere a versão vetorizada
+usada na projeção e mede o tempo de TabelaImpostos.calcular() e o de
+calcular_conta() com e sem tributos.
+
+Uso (na pasta backend):
+    python benchmarks/bench_impostos.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import caminhos  # põe backend/ no sys.path
+
+from resultados import percentil
+
+import numpy as np
+
+import calculo
+import impostos
+from tarifa_store import obter_store
+
+
+def tributos_direto(impostos_data, estado, consumo, valor):
+    # Mesma regra de TabelaImpostos.calcular(), sem nada pré-calculado
+    regra = impostos_data['estados'][estado]
+    icms = regra['icms']
+    for faixa in sorted(regra.get('faixas', []), key=lambda f: f['ate_kwh']):
+        if consumo <= faixa['ate_kwh']:
+            icms = faixa['icms']
+            break
+    pis = regra.get('pis', impostos_data['pis'])
+    cofins = regra.get('cofins', impostos_data['cofins'])
+    return valor / (1 - icms - pis - cofins)
+
+
+class _SemImpostos:
+    def calcular(self, estado, consumo, valor):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo dos tributos por cálculo')
+    parser.add_argument('--calculos', type=int, default=50000)
+    args = parser.parse_args()
+
+    with open(impostos.IMPOSTOS_PATH, 'r', encoding='utf-8') as f:
+        impostos_data = json.load(f)
+
+    inicio = time.perf_counter()
+    tabela = impostos.TabelaImpostos(impostos_data)
+    carga = time.perf_counter() - inicio
+
+    rng = random.Random(3)
+    estados = sorted(impostos_data['estados'])
+    casos = [(rng.choice(estados), float(rng.choice([30, 50, 51, 90, 90.5, 150, rng.uniform(1, 1000)])))
+             for _ in range(args.calculos)]
+
+    for estado, consumo in casos[:5000]:
+        valor = consumo * 0.8
+        detalhamento, total = tabela.calcular(estado, consumo, valor)
+        soma = sum(detalhamento[t]['valor'] for t in ('icms', 'pis', 'cofins'))
+        if not (abs(total - tributos_direto(impostos_data, estado, consumo, valor)) < 1e-9
+                and abs(soma - detalhamento['total']) < 1e-9):
+            print(f"❌ Tributos diferentes da conta direta: {estado} {consumo} kWh")
+            sys.exit(1)
+
+    for estado in estados:
+        consumos = np.array([consumo for uf, consumo in casos if uf == estado])
+        esperado = [tabela.fator(estado, consumo)[3] for consumo in consumos]
+        if not np.array_equal(tabela.fatores(estado, consumos), esperado):
+            print(f"❌ Versão vetorizada diferente: {estado}")
+            sys.exit(1)
+
+    latencias = []
+    for estado, consumo in casos:
+        t = time.perf_counter()
+        tabela.calcular(estado, consumo, consumo * 0.8)
+        latencias.append(time.perf_counter() - t)
+
+    snapshot = obter_store().snapshot()
+    casos_conta = [(estado, consumo) for estado, consumo in casos[:10000]
+                   if snapshot.indice.tarifa_para(estado)]
+
+    def medir_contas():
+        t = time.perf_counter()
+        for estado, consumo in casos_conta:
+            calculo.calcular_conta(snapshot, estado, consumo)
+        return (time.perf_counter() - t) / len(casos_conta)
+
+    com_impostos = medir_contas()
+    carregar = calculo.carregar_tabela_impostos
+    calculo.carregar_tabela_impostos = _SemImpostos
+    try:
+        sem_impostos = medir_contas()
+    finally:
+        calculo.carregar_tabela_impostos = carregar
+
+    print(f"✅ Tributos idênticos à conta direta ({len(estados)} UFs)")
+    print(f"compilação da tabela:      {carga * 1000:8.3f} ms")
+    print(f"TabelaImpostos.calcular(): p50 {percentil(latencias, 50) * 1e6:6.2f} µs  "
+          f"p99 {percentil(latencias, 99) * 1e6:6.2f} µs")
+    print(f"calcular_conta():          {sem_impostos * 1e6:6.2f} µs sem tributos, "
+          f"{com_impostos * 1e6:6.2f} µs com tributos")
+
+
+if __name__ == '__main__':
+    main()
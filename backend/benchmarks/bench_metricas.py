@@ -0,0 +1,129 @@
+"""
+Benchmark: custo da instrumentação de métricas por requisição.
+
+Mede registrar_fases() (as cinco fases de um /calculate),
+registrar_requisicao() e o conjunto gravado por um /calculate (marcas,
+fases e requisição), sozinho e com várias threads gravando ao mesmo
+tempo. Os tempos incluem a agregação em lote feita a cada
+metricas.PENDENTES_MAXIMO medidas, com durações variadas. Confere que o texto exportado é
+consistente: buckets acumulados não decrescentes e _count igual ao total
+de medidas.
+
+Uso (na pasta backend):
+    python benchmarks/bench_metricas.py
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import threading
+import time
+from time import perf_counter
+
+import caminhos  # põe backend/ no sys.path
+
+import metricas
+
+FASES = metricas.FASES_CALCULO
+
+
+def requisicao_instrumentada():
+    # O que um /calculate grava: uma marca por fase, as fases e a requisição
+    comeco = perf_counter()
+    marcas = [perf_counter()]
+    for _ in FASES:
+        marcas.append(perf_counter())
+    metricas.registrar_fases(marcas)
+    metricas.registrar_requisicao('/api/calculate', 200, perf_counter() - comeco)
+
+
+def requisicao_so_marcas():
+    # As mesmas marcas, sem gravar nada
+    comeco = perf_counter()
+    marcas = [perf_counter()]
+    for _ in FASES:
+        marcas.append(perf_counter())
+    return marcas, perf_counter() - comeco
+
+
+def requisicao_sem_instrumentacao():
+    comeco = perf_counter()
+    for _ in FASES:
+        pass
+    return perf_counter() - comeco
+
+
+def _por_chamada(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def _conferir_exportacao(esperado):
+    contagens = {}
+    anterior = {}
+    for linha in metricas.exportar().splitlines():
+        if linha.startswith('calculadora_fase_segundos_bucket'):
+            fase = linha.split('fase="')[1].split('"')[0]
+            valor = int(linha.rsplit(' ', 1)[1])
+            if valor < anterior.get(fase, 0):
+                return f'bucket decrescente em {fase}'
+            anterior[fase] = valor
+        elif linha.startswith('calculadora_fase_segundos_count'):
+            fase = linha.split('fase="')[1].split('"')[0]
+            contagens[fase] = int(linha.rsplit(' ', 1)[1])
+    for fase in FASES:
+        if contagens.get(fase) != esperado or anterior.get(fase) != esperado:
+            return f'{fase}: {contagens.get(fase)} medidas, esperado {esperado}'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo da instrumentação de métricas')
+    parser.add_argument('--repeticoes', type=int, default=200000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    # Durações de 1 µs a ~30 ms, espalhadas pelos buckets
+    rng = random.Random(3)
+    amostras = [list(itertools.accumulate(10 ** rng.uniform(-6, -1.5) for _ in range(len(FASES) + 1)))
+                for _ in range(4096)]
+    marcas = itertools.cycle(amostras)
+    duracoes = itertools.cycle([a[-1] for a in amostras])
+    fases = _por_chamada(lambda: metricas.registrar_fases(next(marcas)), args.repeticoes)
+    requisicao = _por_chamada(
+        lambda: metricas.registrar_requisicao('/api/calculate', 200, next(duracoes)), args.repeticoes)
+    iteracao = _por_chamada(lambda: (next(marcas), next(duracoes)), args.repeticoes) / 2
+    fases -= iteracao
+    requisicao -= iteracao
+    base = _por_chamada(requisicao_sem_instrumentacao, args.repeticoes)
+    so_marcas = _por_chamada(requisicao_so_marcas, args.repeticoes)
+    completa = _por_chamada(requisicao_instrumentada, args.repeticoes)
+
+    por_thread = args.repeticoes // args.threads
+    threads = [threading.Thread(target=lambda: [requisicao_instrumentada() for _ in range(por_thread)])
+               for _ in range(args.threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    concorrente = (time.perf_counter() - inicio) / (por_thread * args.threads)
+
+    erro = _conferir_exportacao(2 * args.repeticoes + por_thread * args.threads)
+    if erro:
+        print(f"❌ Exportação inconsistente: {erro}")
+        sys.exit(1)
+
+    print("✅ Exportação consistente (buckets acumulados e _count batem com as medidas)")
+    print(f"registrar_fases():            {fases * 1e6:6.2f} µs")
+    print(f"registrar_requisicao():       {requisicao * 1e6:6.2f} µs")
+    print(f"por /calculate (5 fases + 1): {(completa - base) * 1e6:6.2f} µs "
+          f"(marcas {(so_marcas - base) * 1e6:.2f} µs, gravação {(completa - so_marcas) * 1e6:.2f} µs)")
+    print(f"idem, {args.threads} threads:            {(concorrente - base) * 1e6:6.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
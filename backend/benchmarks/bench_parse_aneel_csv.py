@@ -0,0 +1,112 @@
+"""
+Benchmark: importação do CSV de tarifas homologadas (parse_aneel_csv).
+
+Gera um CSV sintético no formato do portal da ANEEL (`;`, vírgula
+decimal, Latin-1) com os registros de fixtures_aneel, confere que a
+importação dá o mesmo resultado (tarifas por estado, por distribuidora
+e janelas de vigência) que os registros da API passados ao
+AcumuladorTarifasB1, e mede a importação do arquivo inteiro nos modos
+normal e colunar: linhas/s, MB/s e pico de memória (tracemalloc), que
+não cresce com o tamanho do arquivo.
+
+Uso (na pasta backend):
+    python benchmarks/bench_parse_aneel_csv.py --linhas 100000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import caminhos  # põe backend/ no sys.path
+
+from fixtures_aneel import gerar_registros
+
+from parse_aneel_csv import importar_csv
+from sync_aneel_data import AcumuladorTarifasB1
+
+DATA_ATUAL = datetime(2025, 10, 15)
+CAMPOS = [
+    'DatGeracaoConjuntoDados', 'DscREH', 'SigAgente', 'NumCNPJDistribuidora',
+    'DatInicioVigencia', 'DatFimVigencia', 'DscBaseTarifaria', 'DscSubGrupo',
+    'DscModalidadeTarifaria', 'DscClasse', 'DscSubClasse', 'DscDetalhe',
+    'NomPostoTarifario', 'DscUnidadeTerciaria', 'SigAgenteAcessante', 'VlrTUSD', 'VlrTE'
+]
+
+
+def gravar_csv(caminho, linhas, seed=42):
+    with open(caminho, 'w', encoding='latin-1', newline='') as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(CAMPOS)
+        for record in gerar_registros(linhas, seed=seed, hoje=DATA_ATUAL.date()):
+            escritor.writerow([record[campo] for campo in CAMPOS])
+
+
+def _estado(acumulador):
+    return (acumulador.resultado(), acumulador.resultado_distribuidoras(), acumulador.janelas,
+            acumulador.proxima_mudanca, dict(acumulador.nao_identificados))
+
+
+def conferir(diretorio, linhas):
+    caminho = os.path.join(diretorio, 'conferencia.csv')
+    gravar_csv(caminho, linhas, seed=7)
+
+    referencia = AcumuladorTarifasB1(DATA_ATUAL, debug=False, historico=True)
+    for record in gerar_registros(linhas, seed=7, hoje=DATA_ATUAL.date()):
+        referencia.adicionar(record)
+
+    for colunar in (False, True):
+        acumulador, _ = importar_csv(caminho, DATA_ATUAL, colunar=colunar, tamanho_bloco=5000)
+        if _estado(acumulador) != _estado(referencia):
+            return f"resultado diferente do processamento da API (colunar={colunar})"
+    return None
+
+
+def medir(caminho, colunar):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    _, leitor = importar_csv(caminho, DATA_ATUAL, colunar=colunar)
+    decorrido = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Sem tracemalloc, que deixa as alocações mais lentas
+    inicio = time.perf_counter()
+    importar_csv(caminho, DATA_ATUAL, colunar=colunar)
+    return min(decorrido, time.perf_counter() - inicio), pico, leitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importação do CSV da ANEEL')
+    parser.add_argument('--linhas', type=int, default=100000, help='linhas do CSV sintético')
+    parser.add_argument('--linhas-conferencia', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        erro = conferir(diretorio, args.linhas_conferencia)
+        if erro:
+            print(f"❌ {erro}")
+            sys.exit(1)
+        print(f"✅ Importação do CSV igual ao processamento dos registros da API "
+              f"({args.linhas_conferencia} linhas, modos normal e colunar)")
+
+        caminho = os.path.join(diretorio, 'tarifas.csv')
+        inicio = time.perf_counter()
+        gravar_csv(caminho, args.linhas)
+        tamanho_mb = os.path.getsize(caminho) / 1e6
+        print(f"CSV sintético: {args.linhas} linhas, {tamanho_mb:.1f} MB "
+              f"(gerado em {time.perf_counter() - inicio:.1f} s)")
+
+        for nome, colunar in (('normal', False), ('colunar', True)):
+            decorrido, pico, leitor = medir(caminho, colunar)
+            print(f"{nome:<8} {decorrido:6.2f} s  {leitor.linhas / decorrido:10,.0f} linhas/s  "
+                  f"{tamanho_mb / decorrido:6.1f} MB/s  pico {pico / 1e6:6.1f} MB  "
+                  f"({leitor.candidatas} candidatas a B1)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: AcumuladorTarifasB1 registro a registro x modo colunar.
+
+Gera um fixture sintético da ANEEL, acrescido de registros nos casos de
+borda do filtro (datas vazias, inválidas ou ausentes, valores zerados ou
+não numéricos, agentes desconhecidos, empates de vigência), confere que
+os dois modos produzem exatamente o mesmo resultado (por estado e por
+distribuidora), as mesmas janelas de vigência para o histórico, a mesma
+próxima mudança de vigência e a mesma contagem de agentes não
+identificados, e mede a vazão de cada um.
+
+Uso (na pasta backend):
+    python benchmarks/bench_processar_b1.py --registros 200000
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import caminhos  # põe backend/ no sys.path
+
+from fixtures_aneel import gerar_registros
+from sync_aneel_data import AcumuladorTarifasB1, TAMANHO_LOTE_COLUNAR
+
+
+def casos_de_borda(n, seed=7):
+    rng = random.Random(seed)
+    datas = ['', None, '2024-13-01', '01/02/2025', '2025-1-5', '2020-01-01',
+             '2030-12-31', '2026-10-18', 'N/A']
+    valores = ['', '0', '0,00', 'N/A', None, 'abc', '123,45', '1.234,5', 321.5, 0]
+    agentes = ['DESCONHECIDA', '', '  CEMIG-D  ', 'Enel  Ceará', 'cpfl-paulista', 'LIGHT']
+    for _ in range(n):
+        registro = {
+            'SigAgente': rng.choice(agentes),
+            'DscSubGrupo': rng.choice(['B1', 'A4', None, 'n/a']),
+            'DscClasse': rng.choice(['Residencial', 'Rural', '', None]),
+            'DscModalidadeTarifaria': rng.choice(['Convencional', 'Azul', '']),
+            'DatInicioVigencia': rng.choice(datas),
+            'DatFimVigencia': rng.choice(datas),
+            'VlrTUSD': rng.choice(valores),
+            'VlrTE': rng.choice(valores),
+        }
+        for campo in ('DatInicioVigencia', 'DatFimVigencia', 'VlrTUSD', 'DscClasse'):
+            if rng.random() < 0.1:
+                del registro[campo]
+        yield registro
+
+
+def reduzir(registros, colunar, data_atual):
+    acumulador = AcumuladorTarifasB1(data_atual, debug=False, historico=True)
+    inicio = time.perf_counter()
+    if colunar:
+        for i in range(0, len(registros), TAMANHO_LOTE_COLUNAR):
+            acumulador.adicionar_lote(registros[i:i + TAMANHO_LOTE_COLUNAR])
+    else:
+        for registro in registros:
+            acumulador.adicionar(registro)
+    decorrido = time.perf_counter() - inicio
+    return acumulador, decorrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Redução B1: registro a registro x colunar')
+    parser.add_argument('--registros', type=int, default=200000)
+    args = parser.parse_args()
+
+    data_atual = datetime.now()
+    registros = list(gerar_registros(args.registros))
+    registros += list(casos_de_borda(args.registros // 20))
+    random.Random(1).shuffle(registros)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        por_registro, tempo_registro = reduzir(registros, False, data_atual)
+        colunar, tempo_colunar = reduzir(registros, True, data_atual)
+
+    iguais = (
+        por_registro.resultado() == colunar.resultado()
+        and list(por_registro.tarifas_por_estado) == list(colunar.tarifas_por_estado)
+        and por_registro.resultado_distribuidoras() == colunar.resultado_distribuidoras()
+        and list(por_registro.tarifas_por_distribuidora) == list(colunar.tarifas_por_distribuidora)
+        and por_registro.proxima_mudanca == colunar.proxima_mudanca
+        and por_registro.nao_identificados == colunar.nao_identificados
+        and list(por_registro.janelas.items()) == list(colunar.janelas.items())
+    )
+    if not iguais:
+        print("❌ Os dois modos produziram resultados diferentes")
+        sys.exit(1)
+
+    n = len(registros)
+    print(f"✅ Resultados idênticos ({len(colunar.tarifas_por_estado)} estados, "
+          f"{len(colunar.tarifas_por_distribuidora)} distribuidoras, "
+          f"{len(colunar.janelas)} janelas de vigência, {n} registros)")
+    print(f"registro a registro: {tempo_registro:6.2f} s  {n / tempo_registro:10.0f} registros/s")
+    print(f"colunar:             {tempo_colunar:6.2f} s  {n / tempo_colunar:10.0f} registros/s")
+    print(f"ganho:               {tempo_registro / tempo_colunar:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
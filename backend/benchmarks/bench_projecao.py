@@ -0,0 +1,92 @@
+"""
+Benchmark: projeção mês a mês (projecao.projetar) x uma chamada de
+calcular_conta() por mês.
+
+Grava um histórico temporário de vigências anuais da distribuidora e um
+calendário de bandeiras sintético, confere que os valores de cada mês
+da projeção (com e sem impostos) batem com os de
+calcular_conta(data_referencia=mês) e mede
+o tempo das duas abordagens para horizontes de 12 meses a 50 anos.
+
+Uso (na pasta backend):
+    python benchmarks/bench_projecao.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import caminhos  # põe backend/ no sys.path
+
+import numpy as np
+
+import historico
+from bandeiras import CalendarioBandeiras, indice_mes, nome_mes
+from calculo import calcular_conta
+from fixtures_aneel import gerar_bandeiras
+from projecao import projetar
+from sync_aneel_data import processar_bandeiras
+from tarifa_store import obter_store
+
+ESTADO = 'SP'
+DISTRIBUIDORA = 'ENEL SP'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Projeção vetorizada x cálculo mês a mês')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    hoje = date.today()
+    with tempfile.TemporaryDirectory() as pasta:
+        historico.HISTORICO_PATH = os.path.join(pasta, 'historico.db')
+        historico.registrar_vigencias([
+            {'estado': ESTADO, 'distribuidora': DISTRIBUIDORA,
+             'inicio': f'{ano}-07-04', 'fim': f'{ano + 1}-07-03',
+             'tarifa': round(0.5 + 0.01 * (ano - 2000), 5), 'tusd': 0.3, 'te': 0.2}
+            for ano in range(2000, hoje.year + 1)
+        ], historico.HISTORICO_PATH)
+
+        snapshot = obter_store().snapshot()
+        calendario = processar_bandeiras(gerar_bandeiras(300, hoje=hoje))
+        snapshot = snapshot._replace(calendario=CalendarioBandeiras(
+            {**snapshot.bandeira, 'calendario': calendario}))
+
+        mes_inicial = indice_mes(date(2001, 1, 1))
+        print(f"{'meses':>6} {'projeção':>12} {'mês a mês':>12} {'ganho':>8}")
+        for meses in (12, 120, 600):
+            consumos = 100 + 50 * np.sin(np.arange(meses) / 1.9)
+
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                projecao = projetar(snapshot, ESTADO, DISTRIBUIDORA, mes_inicial, consumos)
+            tempo_vetorizado = (time.perf_counter() - inicio) / args.repeticoes
+
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                contas = [
+                    calcular_conta(snapshot, ESTADO, float(consumo), DISTRIBUIDORA,
+                                   date.fromisoformat(nome_mes(mes_inicial + i) + '-01'))
+                    for i, consumo in enumerate(consumos)
+                ]
+            tempo_mensal = (time.perf_counter() - inicio) / args.repeticoes
+
+            esperado = np.array([conta['valor_total'] for conta in contas])
+            com_impostos = np.array([conta['valor_total_com_impostos'] for conta in contas])
+            if not (np.allclose(projecao['mensal']['valor_total'], esperado, rtol=1e-12) and
+                    np.allclose(projecao['mensal']['valor_total_com_impostos'], com_impostos,
+                                rtol=1e-12)):
+                print(f"❌ Projeção diferente do cálculo mês a mês ({meses} meses)")
+                sys.exit(1)
+
+            print(f"{meses:>6} {tempo_vetorizado * 1000:>9.2f} ms {tempo_mensal * 1000:>9.2f} ms "
+                  f"{tempo_mensal / tempo_vetorizado:>7.1f}x")
+
+    print("✅ Valores mensais (com e sem impostos) idênticos aos de calcular_conta()")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: publicação atômica dos arquivos de dados.
+
+Numa cópia de data/ em diretório temporário:
+  - uma thread lê tarifas.json sem parar enquanto outra o regrava,
+    primeiro com escrita direta no arquivo vigente (como os scripts
+    faziam) e depois com gravar_json_atomico(); conta as leituras que
+    encontraram o arquivo pela metade (JSON inválido) ou ausente;
+  - aplica N alterações de tarifa com uma publicação por alteração e com
+    uma única publicação em lote, e confere que o resultado é o mesmo.
+
+Uso (na pasta backend):
+    python benchmarks/bench_publicacao.py --gravacoes 200 --alteracoes 27
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from caminhos import DATA_DIR
+
+from publicacao import PublicacaoDados, gravar_json_atomico
+
+
+def _copiar_dados(destino):
+    for nome in ('tarifas.json', 'bandeira.json'):
+        shutil.copy(os.path.join(DATA_DIR, nome), destino)
+
+
+def _gravar_direto(caminho, dados, **opcoes_json):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, **opcoes_json)
+
+
+def leituras_quebradas(caminho, gravar, gravacoes):
+    """(leituras, leituras com arquivo ausente ou pela metade)"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    parar = threading.Event()
+    contagem = [0, 0]
+
+    def ler():
+        while not parar.is_set():
+            contagem[0] += 1
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    json.load(f)
+            except (OSError, ValueError):
+                contagem[1] += 1
+
+    leitor = threading.Thread(target=ler)
+    leitor.start()
+    for i in range(gravacoes):
+        dados['observacao'] = f'gravação {i}'
+        gravar(caminho, dados, ensure_ascii=False, indent=2)
+        time.sleep(0)
+    parar.set()
+    leitor.join()
+    return contagem
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publicação atômica dos dados')
+    parser.add_argument('--gravacoes', type=int, default=200)
+    parser.add_argument('--alteracoes', type=int, default=27, help='tarifas alteradas')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        _copiar_dados(diretorio)
+        caminho = os.path.join(diretorio, 'tarifas.json')
+
+        direto = leituras_quebradas(caminho, _gravar_direto, args.gravacoes)
+        atomico = leituras_quebradas(caminho, gravar_json_atomico, args.gravacoes)
+        if atomico[1]:
+            print(f"❌ {atomico[1]} leituras quebradas com a gravação atômica")
+            sys.exit(1)
+
+        with open(os.path.join(DATA_DIR, 'tarifas.json'), 'r', encoding='utf-8') as f:
+            estados = [t['estado'] for t in json.load(f)['tarifas']][:args.alteracoes]
+        operacoes = [{'tipo': 'tarifa', 'estado': estado, 'tarifa': 0.5 + i / 1000}
+                     for i, estado in enumerate(estados)]
+
+        _copiar_dados(diretorio)
+        inicio = time.perf_counter()
+        for operacao in operacoes:
+            publicacao = PublicacaoDados(diretorio)
+            publicacao.aplicar([operacao])
+            publicacao.publicar()
+        uma_a_uma = time.perf_counter() - inicio
+        with open(caminho, 'r', encoding='utf-8') as f:
+            esperado = json.load(f)['tarifas']
+
+        _copiar_dados(diretorio)
+        inicio = time.perf_counter()
+        publicacao = PublicacaoDados(diretorio)
+        publicacao.aplicar(operacoes)
+        versao = publicacao.publicar()
+        em_lote = time.perf_counter() - inicio
+        with open(caminho, 'r', encoding='utf-8') as f:
+            obtido = json.load(f)['tarifas']
+
+    if obtido != esperado or versao != 1:
+        print("❌ Publicação em lote diferente das publicações uma a uma")
+        sys.exit(1)
+
+    print("✅ Nenhuma leitura quebrada com a gravação atômica; lote igual às alterações uma a uma")
+    print(f"Escrita direta:   {direto[1]:6d} de {direto[0]} leituras quebradas")
+    print(f"Escrita atômica:  {atomico[1]:6d} de {atomico[0]} leituras quebradas")
+    print(f"{len(operacoes)} alterações, uma publicação cada: {uma_a_uma * 1000:8.1f} ms")
+    print(f"{len(operacoes)} alterações, uma publicação:      {em_lote * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
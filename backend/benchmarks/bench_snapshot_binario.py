@@ -0,0 +1,143 @@
+"""
+Benchmark: partida a frio do TarifaStore lendo JSON x tarifas.bin.
+
+Para cada cenário (dados reais de data/ e uma tabela sintética maior,
+como a esperada com tarifas por distribuidora e histórico), copia os
+arquivos para um diretório temporário e mede, em processos novos:
+  - tempo do primeiro snapshot() (leitura + decodificação + índice);
+  - RSS máximo do processo ao final.
+O modo JSON roda sem tarifas.bin no diretório (fallback). O binário é
+medido com o mtime dos JSON inalterado (não lê os JSON) e com o mtime
+alterado, como após uma cópia no deploy (lê os JSON só para conferir a
+versão). Antes de medir, confere que o conteúdo lido do binário é igual
+ao dos JSON (inclusive em tarifas sem TUSD/TE).
+
+Uso (na pasta backend):
+    python benchmarks/bench_snapshot_binario.py --registros 50000 --execucoes 5
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from caminhos import BACKEND_DIR, DATA_DIR
+
+from snapshot_binario import (
+    ARQUIVO_BINARIO, assinatura_origem, carregar_snapshot_binario, gerar_snapshot_binario
+)
+
+# O pico de RSS vem de VmHWM: o ru_maxrss de um processo filho no Linux
+# herda o pico do processo pai no momento do fork
+MEDICAO = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+from tarifa_store import TarifaStore
+inicio = time.perf_counter()
+snapshot = TarifaStore(data_dir={data_dir!r}).snapshot()
+decorrido = time.perf_counter() - inicio
+try:
+    with open('/proc/self/status') as f:
+        rss = next(int(l.split()[1]) for l in f if l.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(decorrido, rss, len(snapshot.tarifas['tarifas']))
+"""
+
+
+def gerar_tarifas_sinteticas(n, seed=42):
+    rng = random.Random(seed)
+    ufs = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+           'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']
+    tarifas = []
+    for i in range(n):
+        tusd = round(rng.uniform(0.25, 0.65), 5)
+        te = round(rng.uniform(0.18, 0.33), 5)
+        tarifa = {
+            'estado': ufs[i % len(ufs)],
+            'distribuidora': f'DISTRIBUIDORA {i % 2000:04d}',
+            'tarifa': round(tusd + te, 5),
+            'tusd': tusd,
+            'te': te
+        }
+        # Algumas tarifas sem os componentes (ex.: definidas à mão)
+        if i % 100 == 0:
+            del tarifa['tusd'], tarifa['te']
+        tarifas.append(tarifa)
+    return {
+        'ultima_atualizacao': 'October de 2025',
+        'fonte': 'Sintético',
+        'observacao': 'Gerado por bench_snapshot_binario.py',
+        'tarifas': tarifas
+    }
+
+
+def medir(data_dir, execucoes):
+    codigo = MEDICAO.format(backend=BACKEND_DIR, data_dir=data_dir)
+    tempos, rss = [], []
+    for _ in range(execucoes):
+        saida = subprocess.run([sys.executable, '-c', codigo], check=True,
+                               capture_output=True, text=True).stdout.split()
+        tempos.append(float(saida[0]))
+        rss.append(int(saida[1]))
+    return statistics.median(tempos), statistics.median(rss), int(saida[2])
+
+
+def conferir(data_dir):
+    """Se tarifas.bin tem o mesmo conteúdo de tarifas.json e bandeira.json."""
+    conteudos = []
+    for nome in ('tarifas.json', 'bandeira.json'):
+        with open(os.path.join(data_dir, nome), 'r', encoding='utf-8') as f:
+            conteudos.append(json.load(f))
+    binario = carregar_snapshot_binario(data_dir, assinatura=assinatura_origem(data_dir))
+    return binario is not None and list(binario[:2]) == conteudos
+
+
+def cenario(nome, origem, execucoes, tarifas_sinteticas=None):
+    with tempfile.TemporaryDirectory() as data_dir:
+        shutil.copy(os.path.join(origem, 'bandeira.json'), data_dir)
+        if tarifas_sinteticas is None:
+            shutil.copy(os.path.join(origem, 'tarifas.json'), data_dir)
+        else:
+            with open(os.path.join(data_dir, 'tarifas.json'), 'w', encoding='utf-8') as f:
+                json.dump(tarifas_sinteticas, f, ensure_ascii=False, indent=2)
+
+        tempo_json, rss_json, registros = medir(data_dir, execucoes)
+        gerar_snapshot_binario(data_dir)
+        if not conferir(data_dir):
+            print(f"❌ {nome}: conteúdo de tarifas.bin diferente dos JSON")
+            sys.exit(1)
+        tempo_bin, rss_bin, _ = medir(data_dir, execucoes)
+        os.utime(os.path.join(data_dir, 'tarifas.json'))
+        tempo_hash, rss_hash, _ = medir(data_dir, execucoes)
+        tamanho_json = os.path.getsize(os.path.join(data_dir, 'tarifas.json'))
+        tamanho_bin = os.path.getsize(os.path.join(data_dir, ARQUIVO_BINARIO))
+
+    print(f"{nome} ({registros} registros)")
+    print(f"  JSON:    {tempo_json * 1000:8.2f} ms  RSS {rss_json / 1024:6.1f} MB  "
+          f"arquivo {tamanho_json / 1024:8.1f} KB")
+    print(f"  binário: {tempo_bin * 1000:8.2f} ms  RSS {rss_bin / 1024:6.1f} MB  "
+          f"arquivo {tamanho_bin / 1024:8.1f} KB")
+    print(f"  binário, mtime alterado: {tempo_hash * 1000:8.2f} ms  RSS {rss_hash / 1024:6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partida a frio: JSON x tarifas.bin')
+    parser.add_argument('--registros', type=int, default=50000,
+                        help='tamanho da tabela sintética')
+    parser.add_argument('--execucoes', type=int, default=5,
+                        help='processos por medição (reporta a mediana)')
+    args = parser.parse_args()
+
+    origem = DATA_DIR
+    cenario('Dados atuais', origem, args.execucoes)
+    cenario('Tabela sintética', origem, args.execucoes, gerar_tarifas_sinteticas(args.registros))
+
+
+if __name__ == '__main__':
+    main()
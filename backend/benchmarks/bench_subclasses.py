@@ -0,0 +1,89 @@
+"""
+Benchmark: consumo faturado por faixas de desconto (Tarifa Social).
+
+Confere TabelaSubclasses.consumo_faturado() (bisect sobre as faixas
+compiladas) contra a soma faixa a faixa sobre subclasses.json, inclusive
+nos limites das faixas, e mede as duas abordagens. Mede também o
+calcular_conta() com e sem subclasse.
+
+Uso (na pasta backend):
+    python benchmarks/bench_subclasses.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import caminhos  # põe backend/ no sys.path
+
+import subclasses
+from calculo import calcular_conta
+from tarifa_store import obter_store
+
+
+def faturado_por_faixas(faixas, consumo):
+    # Mesma regra de TabelaSubclasses.consumo_faturado(), faixa a faixa
+    descontado = 0.0
+    inicio = 0.0
+    for faixa in sorted(faixas, key=lambda f: f['ate_kwh']):
+        if consumo <= inicio:
+            break
+        descontado += faixa['desconto'] * (min(consumo, faixa['ate_kwh']) - inicio)
+        inicio = faixa['ate_kwh']
+    return consumo - descontado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consumo faturado por faixas de desconto')
+    parser.add_argument('--calculos', type=int, default=100000)
+    args = parser.parse_args()
+
+    with open(subclasses.SUBCLASSES_PATH, 'r', encoding='utf-8') as f:
+        subclasses_data = json.load(f)
+    tabela = subclasses.TabelaSubclasses(subclasses_data)
+
+    rng = random.Random(7)
+    nomes = sorted(subclasses_data['subclasses'])
+    limites = sorted({faixa['ate_kwh'] for regra in subclasses_data['subclasses'].values()
+                      for faixa in regra['faixas']})
+    casos = [(rng.choice(nomes), rng.choice([rng.uniform(0, 400), rng.choice(limites) + rng.choice([-0.5, 0, 0.5])]))
+             for _ in range(args.calculos)]
+
+    for nome, consumo in casos:
+        esperado = faturado_por_faixas(subclasses_data['subclasses'][nome]['faixas'], consumo)
+        if abs(tabela.consumo_faturado(nome, consumo) - esperado) > 1e-9:
+            print(f"❌ Consumo faturado diferente: {nome} {consumo} kWh")
+            sys.exit(1)
+
+    inicio = time.perf_counter()
+    for nome, consumo in casos:
+        tabela.consumo_faturado(nome, consumo)
+    tempo_bisect = (time.perf_counter() - inicio) / len(casos)
+
+    inicio = time.perf_counter()
+    for nome, consumo in casos:
+        faturado_por_faixas(subclasses_data['subclasses'][nome]['faixas'], consumo)
+    tempo_faixas = (time.perf_counter() - inicio) / len(casos)
+
+    snapshot = obter_store().snapshot()
+    contas = casos[:20000]
+    inicio = time.perf_counter()
+    for _, consumo in contas:
+        calcular_conta(snapshot, 'SP', consumo)
+    sem_subclasse = (time.perf_counter() - inicio) / len(contas)
+    inicio = time.perf_counter()
+    for nome, consumo in contas:
+        calcular_conta(snapshot, 'SP', consumo, subclasse=nome)
+    com_subclasse = (time.perf_counter() - inicio) / len(contas)
+
+    print(f"✅ Consumo faturado idêntico à soma por faixas ({len(casos)} casos, {len(nomes)} subclasses)")
+    print(f"faixas compiladas (bisect): {tempo_bisect * 1e6:6.2f} µs")
+    print(f"faixa a faixa:              {tempo_faixas * 1e6:6.2f} µs")
+    print(f"calcular_conta():           {sem_subclasse * 1e6:6.2f} µs sem subclasse, "
+          f"{com_subclasse * 1e6:6.2f} µs com subclasse")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Microbenchmark: busca da tarifa + bloco de comparação por requisição.
+
+Compara o caminho antigo do calculate() (busca linear pelo estado e
+sorted() da tabela inteira) com o IndiceTarifas pré-calculado.
+
+Uso (na pasta backend):
+    python benchmarks/bench_tarifa_index.py
+"""
+
+import json
+import os
+import time
+import timeit
+
+from caminhos import DATA_DIR
+
+from tarifa_index import IndiceTarifas
+
+REPETICOES = 200000
+
+
+def caminho_antigo(tarifas, estado):
+    tarifa_estado = None
+    for tarifa in tarifas['tarifas']:
+        if tarifa['estado'] == estado:
+            tarifa_estado = tarifa
+            break
+
+    tarifas_ordenadas = sorted(tarifas['tarifas'], key=lambda x: x['tarifa'])
+    mais_barato = tarifas_ordenadas[0]
+    mais_caro = tarifas_ordenadas[-1]
+    comparacao = {
+        'mais_barato': {'estado': mais_barato['estado'], 'tarifa': mais_barato['tarifa']},
+        'mais_caro': {'estado': mais_caro['estado'], 'tarifa': mais_caro['tarifa']}
+    }
+    return tarifa_estado, comparacao
+
+
+def caminho_indice(indice, estado):
+    return indice.tarifa_estado(estado), indice.comparacao_estado(estado)
+
+
+def medir(funcao, dados, estados):
+    n = len(estados)
+    contador = iter(range(REPETICOES))
+    tempo = timeit.timeit(lambda: funcao(dados, estados[next(contador) % n]),
+                          number=REPETICOES, timer=time.process_time)
+    return tempo / REPETICOES * 1e6
+
+
+def main():
+    with open(os.path.join(DATA_DIR, 'tarifas.json'), 'r', encoding='utf-8') as f:
+        tarifas = json.load(f)
+
+    indice = IndiceTarifas(tarifas)
+    estados = [t['estado'] for t in tarifas['tarifas']]
+
+    for estado in estados:
+        antigo = caminho_antigo(tarifas, estado)
+        novo = caminho_indice(indice, estado)
+        assert antigo[0] is novo[0]
+        assert antigo[1]['mais_barato'] == novo[1]['mais_barato']
+        assert antigo[1]['mais_caro'] == novo[1]['mais_caro']
+
+    antigo_us = medir(caminho_antigo, tarifas, estados)
+    novo_us = medir(caminho_indice, indice, estados)
+
+    print(f"Estados na tabela: {len(estados)}")
+    print(f"Busca linear + sorted(): {antigo_us:8.3f} µs/requisição (CPU)")
+    print(f"IndiceTarifas:           {novo_us:8.3f} µs/requisição (CPU)")
+    print(f"Ganho:                   {antigo_us / novo_us:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+"""
+Caminhos usados pelos benchmarks.
+
+Importar este módulo põe backend/ e benchmarks/ no sys.path, para que os
+scripts desta pasta importem os módulos do backend e os utilitários
+daqui (fixtures_aneel, resultados, fake_viacep) de qualquer diretório.
+"""
+
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+API_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'api')
+DATA_DIR = os.path.join(BACKEND_DIR, 'data')
+
+for caminho in (BENCHMARKS_DIR, BACKEND_DIR):
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
@@ -0,0 +1,111 @@
+"""
+Verificação do orçamento de cold start de api/index.py.
+
+Importa o handler em processos novos com `python -X importtime` e mede:
+  - total: tempo cumulativo da importação de `index` (Flask incluído e
+    a carga dos dados feita na importação);
+  - próprio: tudo menos Flask e flask-cors (o próprio index.py, a carga
+    dos dados, os módulos do backend e qualquer outra dependência que
+    passe a ser importada na partida, como requests).
+numpy está no requirements.txt da raiz só para o /api/projection e não
+pode ser importado na partida: se aparecer na importação, a verificação
+falha mesmo dentro dos limites.
+Usa a mediana das execuções e sai com código 1 se algum dos dois
+passar do limite, então serve como teste de regressão no CI.
+
+Uso (na pasta backend):
+    python benchmarks/check_import_time.py --limite-total 400 --limite-proprio 40
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from caminhos import API_DIR
+
+LIMITE_TOTAL_MS = float(os.environ.get('IMPORT_LIMITE_TOTAL_MS', 400))
+LIMITE_PROPRIO_MS = float(os.environ.get('IMPORT_LIMITE_PROPRIO_MS', 40))
+
+# Dependências que o handler precisa na partida (fora do orçamento "próprio")
+DEPENDENCIAS_BASE = {'flask', 'flask_cors'}
+# Dependências que só podem ser importadas na primeira chamada da rota que as usa
+DEPENDENCIAS_TARDIAS = {'numpy'}
+
+
+def ler_importtime(saida):
+    """
+    Linhas do -X importtime como (profundidade, nome, próprio µs, cumulativo µs).
+    """
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        proprio, cumulativo, nome = linha[len('import time:'):].split('|')
+        if not proprio.strip().isdigit():
+            continue  # cabeçalho
+        profundidade = (len(nome) - len(nome.lstrip()) - 1) // 2
+        linhas.append((profundidade, nome.strip(), int(proprio), int(cumulativo)))
+    return linhas
+
+
+def medir_importacao():
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import index'],
+        cwd=API_DIR, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        print(resultado.stderr)
+        sys.exit(1)
+
+    linhas = ler_importtime(resultado.stderr)
+    # A saída vem em pós-ordem: os filhos diretos de `index` são as linhas de
+    # profundidade 1 desde a linha de profundidade 0 anterior
+    fim = max(i for i, (p, nome, _, _) in enumerate(linhas) if p == 0 and nome == 'index')
+    inicio = max([i for i, (p, _, _, _) in enumerate(linhas[:fim]) if p == 0], default=-1) + 1
+
+    total = linhas[fim][3]
+    filhos = sorted(((c, nome) for p, nome, _, c in linhas[inicio:fim] if p == 1), reverse=True)
+    base = sum(c for c, nome in filhos if nome.split('.')[0] in DEPENDENCIAS_BASE)
+    tardias = {nome for _, nome, _, _ in linhas[inicio:fim] if nome.split('.')[0] in DEPENDENCIAS_TARDIAS}
+    return total / 1000, (total - base) / 1000, filhos, tardias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Orçamento de importação de api/index.py')
+    parser.add_argument('--limite-total', type=float, default=LIMITE_TOTAL_MS, help='ms')
+    parser.add_argument('--limite-proprio', type=float, default=LIMITE_PROPRIO_MS, help='ms')
+    parser.add_argument('--execucoes', type=int, default=5)
+    args = parser.parse_args()
+
+    # Primeira execução só para gerar os .pyc
+    medir_importacao()
+    medicoes = [medir_importacao() for _ in range(args.execucoes)]
+
+    total = statistics.median(m[0] for m in medicoes)
+    proprio = statistics.median(m[1] for m in medicoes)
+
+    print(f"importação de api/index.py (mediana de {args.execucoes}):")
+    print(f"  total:   {total:7.1f} ms  (limite {args.limite_total:.0f} ms)")
+    print(f"  próprio: {proprio:7.1f} ms  (limite {args.limite_proprio:.0f} ms)")
+    print("  módulos mais caros importados por index.py:")
+    for cumulativo, nome in medicoes[-1][2][:5]:
+        print(f"    {nome:<20} {cumulativo / 1000:7.1f} ms")
+
+    falhas = []
+    if total > args.limite_total:
+        falhas.append(f"total {total:.1f} ms > {args.limite_total:.0f} ms")
+    if proprio > args.limite_proprio:
+        falhas.append(f"próprio {proprio:.1f} ms > {args.limite_proprio:.0f} ms")
+    tardias = sorted(set().union(*(m[3] for m in medicoes)))
+    if tardias:
+        falhas.append(f"importado na partida: {', '.join(tardias)}")
+    if falhas:
+        print(f"❌ Orçamento de cold start excedido: {'; '.join(falhas)}")
+        sys.exit(1)
+    print("✅ Dentro do orçamento de cold start")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Servidor falso do datastore_search da ANEEL (CKAN), com paginação.
+
+Serve `offset`/`limit` (e um resource_show com last_modified) sobre uma
+lista de registros: um arquivo gravado (lista de registros ou resposta
+completa do datastore_search) ou registros sintéticos de fixtures_aneel.
+Recursos específicos (ex.: o de bandeiras) podem ter registros próprios.
+
+Uso (na pasta backend):
+    python benchmarks/fake_aneel.py --porta 8082 --registros 50000
+    ANEEL_API_BASE=http://127.0.0.1:8082/api/3/action/datastore_search python sync_aneel_data.py
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import caminhos  # põe backend/ no sys.path
+
+from fixtures_aneel import gerar_bandeiras, gerar_registros
+
+
+class _ServidorFake(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def carregar_fixture(caminho):
+    """Lê registros gravados (lista ou resposta do datastore_search)."""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    if isinstance(dados, dict):
+        dados = dados.get('result', {}).get('records', [])
+    return dados
+
+
+def iniciar_fake_aneel(registros, porta=0, latencia=0.0, last_modified='2025-10-01T00:00:00',
+                       recursos=None):
+    """
+    Sobe o servidor falso numa thread e o retorna.
+
+    `recursos` mapeia resource_id → registros servidos para esse recurso;
+    os demais recebem `registros`.
+
+    A URL a usar em ANEEL_API_BASE fica em `servidor.url_api`; o
+    resource_show informa `servidor.last_modified`, que pode ser alterado
+    para simular uma nova versão do recurso.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            servidor.requisicoes += 1
+            if latencia:
+                time.sleep(latencia)
+
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+
+            if url.path.endswith('/resource_show'):
+                self._enviar({
+                    'success': True,
+                    'result': {'id': params.get('id', [''])[0], 'last_modified': servidor.last_modified}
+                })
+                return
+
+            offset = int(params.get('offset', ['0'])[0])
+            limit = int(params.get('limit', ['100'])[0])
+            resource_id = params.get('resource_id', [''])[0]
+            dados = (recursos or {}).get(resource_id, registros)
+
+            self._enviar({
+                'success': True,
+                'result': {
+                    'resource_id': resource_id,
+                    'total': len(dados),
+                    'offset': offset,
+                    'limit': limit,
+                    'records': dados[offset:offset + limit],
+                }
+            })
+
+        def _enviar(self, dados):
+            corpo = json.dumps(dados).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+    servidor = _ServidorFake(('127.0.0.1', porta), Handler)
+    servidor.requisicoes = 0
+    servidor.last_modified = last_modified
+    servidor.url_api = f'http://127.0.0.1:{servidor.server_port}/api/3/action/datastore_search'
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='datastore_search da ANEEL falso')
+    parser.add_argument('--porta', type=int, default=8082)
+    parser.add_argument('--registros', type=int, default=50000, help='registros sintéticos')
+    parser.add_argument('--fixture', help='arquivo JSON com registros gravados')
+    parser.add_argument('--latencia', type=float, default=0.0, help='segundos por página')
+    args = parser.parse_args()
+
+    if args.fixture:
+        registros = carregar_fixture(args.fixture)
+    else:
+        registros = list(gerar_registros(args.registros))
+
+    # Bandeiras: um acionamento por mês nos últimos 10 anos
+    from sync_aneel_data import RESOURCE_BANDEIRA
+    servidor = iniciar_fake_aneel(registros, args.porta, args.latencia,
+                                  recursos={RESOURCE_BANDEIRA: list(gerar_bandeiras(120))})
+    print(f"ANEEL falsa com {len(registros)} registros em {servidor.url_api} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Servidor ViaCEP falso para benchmarks e testes de carga locais.
+
+Responde /ws/<cep>/json/ com latência e taxa de erro configuráveis:
+CEPs terminados em "999" devolvem {"erro": true} (CEP não encontrado) e
+uma fração `taxa_erro` das requisições recebe 503. É assíncrono
+(HTTP/1.1 com keep-alive), para que a latência simulada não limite o
+número de requisições simultâneas.
+
+Uso (na pasta backend):
+    python benchmarks/fake_viacep.py --porta 8081 --latencia 0.05 --taxa-erro 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+
+_STATUS = {200: b'OK', 400: b'Bad Request', 404: b'Not Found', 503: b'Service Unavailable'}
+
+
+class FakeViaCep:
+    """
+    Servidor falso rodando num event loop próprio, numa thread daemon.
+
+    A URL a usar em VIACEP_URL fica em `url_viacep`.
+    """
+
+    def __init__(self, porta=0, latencia=0.05, taxa_erro=0.0, uf='SP'):
+        self.latencia = latencia
+        self.taxa_erro = taxa_erro
+        self.uf = uf
+        self.requisicoes = 0
+        self._loop = asyncio.new_event_loop()
+
+        pronto = threading.Event()
+        threading.Thread(target=self._rodar, args=(porta, pronto), daemon=True).start()
+        pronto.wait()
+        self.url_viacep = f'http://127.0.0.1:{self.porta}/ws/{{cep}}/json/'
+
+    def _rodar(self, porta, pronto):
+        asyncio.set_event_loop(self._loop)
+        self._servidor = self._loop.run_until_complete(
+            asyncio.start_server(self._atender, '127.0.0.1', porta, backlog=2048))
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        pronto.set()
+        self._loop.run_forever()
+
+    def _resposta(self, caminho):
+        partes = caminho.strip('/').split('/')
+        if len(partes) != 3 or partes[0] != 'ws' or partes[2] != 'json':
+            return 400, {'erro': 'formato'}
+        if self.taxa_erro and random.random() < self.taxa_erro:
+            return 503, {'erro': 'indisponível'}
+
+        cep = partes[1]
+        if cep.endswith('999'):
+            return 200, {'erro': True}
+        return 200, {'cep': cep, 'uf': self.uf}
+
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                # Descarta os cabeçalhos (requisições GET, sem corpo)
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+
+                self.requisicoes += 1
+                if self.latencia:
+                    await asyncio.sleep(self.latencia)
+
+                partes = linha.split()
+                status, dados = self._resposta(partes[1].decode() if len(partes) > 1 else '')
+                corpo = json.dumps(dados).encode('utf-8')
+                writer.write(
+                    b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: %d\r\n\r\n' % (status, _STATUS[status], len(corpo)) + corpo
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def parar(self):
+        self._loop.call_soon_threadsafe(self._servidor.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def iniciar_fake_viacep(porta=0, latencia=0.05, taxa_erro=0.0, uf='SP'):
+    """Sobe o servidor falso em segundo plano e o retorna."""
+    return FakeViaCep(porta, latencia, taxa_erro, uf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ViaCEP falso para testes locais')
+    parser.add_argument('--porta', type=int, default=8081)
+    parser.add_argument('--latencia', type=float, default=0.05, help='segundos por resposta')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='fração de respostas 503')
+    args = parser.parse_args()
+
+    servidor = iniciar_fake_viacep(args.porta, args.latencia, args.taxa_erro)
+    print(f"ViaCEP falso em {servidor.url_viacep} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Registros sintéticos no formato dos datasets de tarifas homologadas e de
+acionamento das bandeiras tarifárias da ANEEL.
+
+Usados pelos benchmarks e pelo servidor ANEEL falso para exercitar a
+sincronização sem rede. Os campos, formatos de data e valores com vírgula
+decimal seguem os registros reais do datastore_search.
+"""
+
+import random
+from datetime import date, timedelta
+
+AGENTES = [
+    'EQUATORIAL AL', 'CEA', 'COELBA', 'ENEL CE', 'EDP ES', 'EQUATORIAL MA',
+    'CEMIG-D', 'EQUATORIAL PA', 'EPB', 'Neoenergia PE', 'EQUATORIAL PI',
+    'COPEL-DIS', 'LIGHT', 'ENEL RJ', 'COSERN', 'RGE SUL', 'CEEE-D', 'CELESC-DIS',
+    'CPFL-PAULISTA', 'CPFL-PIRATINING', 'ELEKTRO', 'ENEL SP', 'EDP SP',
+    'ENERGISA MS', 'ENERGISA MT', 'ENERGISA TO', 'ENERGISA RO', 'ENERGISA AC',
+    'ENERGISA SE', 'SULGIPE', 'AMAZONAS ENERGIA', 'RORAIMA ENERGIA', 'CEB-DIS',
+    'NEOENERGIA BRASILIA', 'ENEL GO', 'EQUATORIAL GO', 'DMED', 'COCEL', 'CERAL',
+    'HIDROPAN', 'MUXENERGIA', 'ELETROCAR', 'FORCEL', 'CERTAJA', 'COOPERALIANCA',
+]
+
+SUBGRUPOS = ['B1', 'B2', 'B3', 'B4', 'A4', 'A3a', 'AS']
+CLASSES = ['Residencial', 'Rural', 'Comercial', 'Industrial', 'Não se aplica']
+MODALIDADES = ['Convencional', 'Branca', 'Azul', 'Verde', 'Convencional pré-pagamento']
+
+
+def _valor(rng, minimo, maximo):
+    # Formato da API: vírgula decimal, duas casas
+    return f'{rng.uniform(minimo, maximo):.2f}'.replace('.', ',')
+
+
+def gerar_registros(n, seed=42, hoje=None):
+    """
+    Gera `n` registros com janelas de vigência anuais ao redor de `hoje`.
+    """
+    rng = random.Random(seed)
+    hoje = hoje or date.today()
+
+    for i in range(n):
+        anos_atras = rng.randint(-1, 6)
+        inicio = date(hoje.year - anos_atras, rng.randint(1, 12), 1)
+        fim = inicio + timedelta(days=364)
+
+        yield {
+            '_id': i + 1,
+            'DatGeracaoConjuntoDados': hoje.isoformat(),
+            'DscREH': f'REH {rng.randint(2800, 3500)}/{inicio.year}',
+            'SigAgente': rng.choice(AGENTES),
+            'NumCNPJDistribuidora': f'{rng.randint(0, 99999999999999):014d}',
+            'DatInicioVigencia': inicio.isoformat(),
+            'DatFimVigencia': fim.isoformat(),
+            'DscBaseTarifaria': 'Tarifa de Aplicação',
+            'DscSubGrupo': rng.choice(SUBGRUPOS),
+            'DscModalidadeTarifaria': rng.choice(MODALIDADES),
+            'DscClasse': rng.choice(CLASSES),
+            'DscSubClasse': 'Não se aplica',
+            'DscDetalhe': 'Não se aplica',
+            'NomPostoTarifario': 'Não se aplica',
+            'DscUnidadeTerciaria': 'MWh',
+            'SigAgenteAcessante': 'Não se aplica',
+            'VlrTUSD': _valor(rng, 250, 650),
+            'VlrTE': _valor(rng, 180, 330),
+        }
+
+
+BANDEIRAS = [('Verde', '0,00'), ('Amarela', '18,85'), ('Vermelha P1', '44,63'), ('Vermelha P2', '78,77')]
+
+
+def gerar_bandeiras(meses, seed=42, hoje=None):
+    """
+    Gera um acionamento de bandeira por mês, dos `meses` anteriores a `hoje`
+    até o mês corrente (valores em R$/MWh, como no dataset).
+    """
+    rng = random.Random(seed)
+    hoje = hoje or date.today()
+    atual = hoje.year * 12 + hoje.month - 1
+
+    for i, indice in enumerate(range(atual - meses + 1, atual + 1)):
+        nome, valor = rng.choice(BANDEIRAS)
+        yield {
+            '_id': i + 1,
+            'DatGeracaoConjuntoDados': hoje.isoformat(),
+            'DatCompetencia': f'{indice // 12:04d}-{indice % 12 + 1:02d}-01',
+            'NomBandeiraAcionada': nome,
+            'VlrAdicionalBandeira': valor,
+        }
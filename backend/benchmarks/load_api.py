@@ -0,0 +1,191 @@
+"""
+Teste de carga de ponta a ponta da API (api/index.py), todo local.
+
+Sobe o ViaCEP falso (latência e taxa de erro configuráveis) e o app
+Flask da Vercel num pool fixo de threads, e gera carga com clientes
+aiohttp em três cenários:
+  - unico: POST /api/calculate com consumo inédito a cada requisição
+    (sem acerto no cache de respostas); uma fração dos CEPs é inédita e
+    fora do índice local, e vai à ViaCEP falsa;
+  - lote: POST /api/calculate/batch com `--tamanho-lote` itens, com a
+    mesma mistura de CEPs;
+  - cache: GET /api/calculate repetindo poucas consultas (respostas do
+    cache em memória).
+Reporta RPS e latências p50/p95/p99 de cada cenário. Com `--output`,
+grava os resultados em JSON para comparar com `resultados.py`.
+
+Com `--url`, a carga vai para um servidor já em execução (que deve usar
+VIACEP_URL apontando para um ViaCEP falso, p. ex. fake_viacep.py).
+
+Uso (na pasta backend):
+    python benchmarks/load_api.py --duracao 10 --concorrencia 32 --output carga.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+from caminhos import API_DIR
+
+from fake_viacep import iniciar_fake_viacep
+from resultados import gravar, resumo_latencias
+
+CENARIOS = ('unico', 'lote', 'cache')
+
+# CEPs do índice local (estados com tarifa)
+CEPS_LOCAIS = ['01310100', '30130000', '20040002', '40020000', '80010000', '90010000',
+               '60060000', '50030000', '88010000']
+
+
+class GeradorConsultas:
+    """
+    Corpos das requisições de cada cenário. Consumos e CEPs da ViaCEP
+    nunca se repetem entre requisições (nem entre cenários).
+    """
+
+    def __init__(self, fracao_viacep):
+        self.fracao_viacep = fracao_viacep
+        self._contador = itertools.count()
+        # CEPs abaixo de 01000-000 não estão no índice local
+        self._ceps_viacep = (f'00{i:06d}' for i in itertools.count())
+        self._acumulado = 0.0
+
+    def _item(self):
+        i = next(self._contador)
+        self._acumulado += self.fracao_viacep
+        if self._acumulado >= 1.0:
+            self._acumulado -= 1.0
+            cep = next(self._ceps_viacep)
+        else:
+            cep = CEPS_LOCAIS[i % len(CEPS_LOCAIS)]
+        return {'cep': cep, 'consumo': 100 + i / 100}
+
+    def unico(self):
+        return self._item()
+
+    def lote(self, tamanho):
+        return [self._item() for _ in range(tamanho)]
+
+
+async def gerar_carga(enviar, duracao, concorrencia):
+    """
+    Roda `concorrencia` clientes chamando `enviar(cliente)` (que retorna o
+    status HTTP) durante `duracao` segundos.
+    """
+    import aiohttp
+
+    latencias = []
+    erros = 0
+    limite = time.perf_counter() + duracao
+
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(connector=conector) as cliente:
+
+        async def usuario():
+            nonlocal erros
+            while time.perf_counter() < limite:
+                inicio = time.perf_counter()
+                try:
+                    if await enviar(cliente) != 200:
+                        erros += 1
+                except Exception:
+                    erros += 1
+                latencias.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario() for _ in range(concorrencia)))
+        decorrido = time.perf_counter() - inicio
+
+    return resumo_latencias(latencias, decorrido, erros)
+
+
+def enviadores(url, consultas, tamanho_lote):
+    """{cenário: corrotina cliente → status}"""
+    urls_cache = [f'{url}/api/calculate?cep={cep}&consumo={consumo}'
+                  for cep in CEPS_LOCAIS for consumo in (100, 150, 220)]
+    ciclo_cache = itertools.cycle(urls_cache)
+
+    async def unico(cliente):
+        async with cliente.post(f'{url}/api/calculate', json=consultas.unico()) as response:
+            await response.read()
+            return response.status
+
+    async def lote(cliente):
+        async with cliente.post(f'{url}/api/calculate/batch',
+                                json=consultas.lote(tamanho_lote)) as response:
+            await response.read()
+            return response.status
+
+    async def cache(cliente):
+        async with cliente.get(next(ciclo_cache)) as response:
+            await response.read()
+            return response.status
+
+    return {'unico': unico, 'lote': lote, 'cache': cache}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga de ponta a ponta na API')
+    parser.add_argument('--duracao', type=float, default=10, help='segundos por cenário')
+    parser.add_argument('--aquecimento', type=float, default=1, help='segundos antes de medir')
+    parser.add_argument('--concorrencia', type=int, default=32, help='clientes simultâneos')
+    parser.add_argument('--workers', type=int, default=8, help='threads do servidor')
+    parser.add_argument('--latencia', type=float, default=0.05,
+                        help='latência do ViaCEP falso (s)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0,
+                        help='fração de respostas 503 do ViaCEP falso')
+    parser.add_argument('--fracao-viacep', type=float, default=0.1,
+                        help='fração dos CEPs que vão à ViaCEP')
+    parser.add_argument('--tamanho-lote', type=int, default=100)
+    parser.add_argument('--cenarios', default=','.join(CENARIOS),
+                        help='lista separada por vírgulas (%s)' % ', '.join(CENARIOS))
+    parser.add_argument('--url', help='servidor já em execução (sem /api)')
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    args = parser.parse_args()
+
+    cenarios = [c.strip() for c in args.cenarios.split(',') if c.strip()]
+    desconhecidos = set(cenarios) - set(CENARIOS)
+    if desconhecidos:
+        parser.error(f'cenário desconhecido: {", ".join(sorted(desconhecidos))}')
+
+    url = args.url
+    if url is None:
+        fake = iniciar_fake_viacep(latencia=args.latencia, taxa_erro=args.taxa_erro)
+        os.environ['VIACEP_URL'] = fake.url_viacep
+
+        # Importados depois de apontar VIACEP_URL para o servidor falso
+        sys.path.insert(0, API_DIR)
+        import index
+        from load_async import iniciar_sync
+
+        _, url = iniciar_sync(index.app, args.workers)
+
+    consultas = GeradorConsultas(args.fracao_viacep)
+    chamadas = enviadores(url, consultas, args.tamanho_lote)
+
+    print(f"ViaCEP falso: latência {args.latencia * 1000:.0f} ms, erro {args.taxa_erro:.0%} | "
+          f"{args.fracao_viacep:.0%} dos CEPs na ViaCEP | {args.concorrencia} clientes | "
+          f"{args.duracao:.0f} s por cenário")
+    print("-" * 78)
+    resultados = {}
+    for cenario in cenarios:
+        if args.aquecimento:
+            asyncio.run(gerar_carga(chamadas[cenario], args.aquecimento, args.concorrencia))
+        r = asyncio.run(gerar_carga(chamadas[cenario], args.duracao, args.concorrencia))
+        if cenario == 'lote':
+            r['itens_por_segundo'] = r['rps'] * args.tamanho_lote
+        resultados[cenario] = r
+        print(f"{cenario:<6} {r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+              f"p95 {r['p95_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  erros {r['erros']}")
+    print("-" * 78)
+
+    if args.output:
+        parametros = {k: v for k, v in vars(args).items() if k != 'output'}
+        gravar(args.output, 'carga_api', resultados, parametros)
+
+
+if __name__ == '__main__':
+    main()
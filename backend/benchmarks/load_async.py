@@ -0,0 +1,154 @@
+"""
+Teste de carga: /api/calculate síncrono (Flask) x assíncrono (ASGI).
+
+Sobe um ViaCEP falso com latência fixa e, no mesmo processo, as duas
+variantes da API:
+  - síncrona: app Flask servido por um pool fixo de threads, simulando
+    os workers WSGI;
+  - assíncrona: asgi_app servido pelo uvicorn.
+Cada requisição usa um CEP inédito fora do índice local, para forçar a
+consulta à ViaCEP. Reporta RPS sustentado e latências p50/p99.
+
+Uso (na pasta backend):
+    python benchmarks/load_async.py --duracao 10 --concorrencia 100 --workers 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import caminhos  # põe backend/ no sys.path
+
+from resultados import percentil
+
+from fake_viacep import iniciar_fake_viacep
+
+
+def iniciar_sync(app, workers):
+    """Serve o app WSGI com no máximo `workers` requisições simultâneas."""
+    from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+    class HandlerSilencioso(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    class ServidorPool(BaseWSGIServer):
+        request_queue_size = 1024
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+
+        def process_request(self, request, client_address):
+            self._pool.submit(self._atender, request, client_address)
+
+        def _atender(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    servidor = ServidorPool('127.0.0.1', 0, app, handler=HandlerSilencioso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f'http://127.0.0.1:{servidor.server_port}'
+
+
+def iniciar_async(app):
+    """Serve o app ASGI com o uvicorn numa thread separada."""
+    import socket
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    porta = sock.getsockname()[1]
+    sock.close()
+
+    config = uvicorn.Config(app, host='127.0.0.1', port=porta, log_level='warning',
+                            lifespan='on', backlog=2048)
+    servidor = uvicorn.Server(config)
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor, f'http://127.0.0.1:{porta}'
+
+
+async def gerar_carga(url, ceps, duracao, concorrencia):
+    import aiohttp
+
+    latencias = []
+    erros = 0
+    limite = time.perf_counter() + duracao
+
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(connector=conector) as cliente:
+
+        async def usuario():
+            nonlocal erros
+            while time.perf_counter() < limite:
+                inicio = time.perf_counter()
+                try:
+                    async with cliente.post(f'{url}/calculate',
+                                            json={'cep': next(ceps), 'consumo': 150}) as response:
+                        await response.read()
+                        if response.status != 200:
+                            erros += 1
+                except Exception:
+                    erros += 1
+                latencias.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario() for _ in range(concorrencia)))
+        decorrido = time.perf_counter() - inicio
+
+    return {
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'rps': len(latencias) / decorrido,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga síncrona x assíncrona no /api/calculate')
+    parser.add_argument('--duracao', type=float, default=10, help='segundos por modo')
+    parser.add_argument('--concorrencia', type=int, default=100, help='clientes simultâneos')
+    parser.add_argument('--workers', type=int, default=8, help='threads do servidor síncrono')
+    parser.add_argument('--latencia', type=float, default=0.2, help='latência do ViaCEP falso (s)')
+    args = parser.parse_args()
+
+    fake = iniciar_fake_viacep(latencia=args.latencia)
+    os.environ['VIACEP_URL'] = fake.url_viacep
+
+    # Importados depois de apontar VIACEP_URL para o servidor falso
+    import app as app_sync
+    import asgi_app
+
+    # CEPs abaixo de 01000-000 não estão no índice local: todos vão à ViaCEP.
+    # Cada modo usa uma faixa própria para não aproveitar o cache do outro.
+    ceps_sync = (f'00{i:06d}' for i in itertools.count(0))
+    ceps_async = (f'00{i:06d}' for i in itertools.count(500000))
+
+    _, url_sync = iniciar_sync(app_sync.app, args.workers)
+    _, url_async = iniciar_async(asgi_app.app)
+
+    print(f"ViaCEP falso: latência {args.latencia * 1000:.0f} ms | "
+          f"{args.concorrencia} clientes | {args.duracao:.0f} s por modo")
+    print("-" * 70)
+    for nome, url, ceps in (('síncrono (%d workers)' % args.workers, url_sync, ceps_sync),
+                            ('assíncrono (ASGI)', url_async, ceps_async)):
+        r = asyncio.run(gerar_carga(url, ceps, args.duracao, args.concorrencia))
+        print(f"{nome:<24} {r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+              f"p99 {r['p99_ms']:7.1f} ms  erros {r['erros']}")
+    print("-" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Resultados dos benchmarks em JSON, para comparar execuções entre commits.
+
+Os scripts gravam com `--output arquivo.json` um documento com os
+resultados e os metadados da execução (commit, Python, máquina,
+parâmetros). Para comparar duas execuções (sai com código 1 se alguma
+métrica piorar além da tolerância):
+
+    python benchmarks/resultados.py antes.json depois.json --tolerancia 0.10
+
+Nas métricas de tempo (`*_us`, `*_ms`) menor é melhor; em `rps`, maior é
+melhor. As demais são mostradas sem avaliação.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+
+def percentil(valores, p):
+    """Percentil `p` (0 a 100) de uma lista de valores; 0.0 se vazia."""
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def resumo_latencias(latencias, decorrido, erros=0):
+    """RPS e percentis (ms) de uma rodada de carga."""
+    return {
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'rps': len(latencias) / decorrido if decorrido else 0.0,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+    }
+
+
+def _commit():
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                               capture_output=True, text=True, timeout=5)
+        sujo = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                              cwd=REPO_DIR, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if saida.returncode != 0:
+        return None
+    return saida.stdout.strip() + ('-modificado' if sujo.stdout.strip() else '')
+
+
+def metadados(parametros=None):
+    return {
+        'commit': _commit(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': parametros or {},
+    }
+
+
+def gravar(caminho, benchmark, resultados, parametros=None):
+    """Grava `resultados` ({nome: {métrica: valor}}) com os metadados."""
+    documento = {'benchmark': benchmark, **metadados(parametros), 'resultados': resultados}
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"📄 Resultados gravados em {caminho}")
+
+
+def _sentido(metrica):
+    # -1: menor é melhor; 1: maior é melhor; 0: sem avaliação
+    if metrica.endswith(('_us', '_ms')):
+        return -1
+    if metrica == 'rps':
+        return 1
+    return 0
+
+
+def comparar(antes, depois, tolerancia):
+    """Imprime as variações e retorna a lista de métricas que pioraram."""
+    pioras = []
+    print(f"{antes.get('commit')} → {depois.get('commit')}")
+    for nome, metricas in depois['resultados'].items():
+        anteriores = antes['resultados'].get(nome)
+        if anteriores is None:
+            print(f"  {nome}: novo")
+            continue
+        for metrica, valor in metricas.items():
+            anterior = anteriores.get(metrica)
+            if not isinstance(valor, (int, float)) or not isinstance(anterior, (int, float)):
+                continue
+            variacao = (valor - anterior) / anterior if anterior else 0.0
+            sentido = _sentido(metrica)
+            marca = ''
+            if sentido and -sentido * variacao > tolerancia:
+                marca = '  ❌ pior'
+                pioras.append(f'{nome}.{metrica}')
+            elif sentido and sentido * variacao > tolerancia:
+                marca = '  ✅ melhor'
+            print(f"  {nome}.{metrica}: {anterior:.3f} → {valor:.3f} ({variacao:+.1%}){marca}")
+    return pioras
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara duas execuções de benchmark')
+    parser.add_argument('antes')
+    parser.add_argument('depois')
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help='variação aceita antes de acusar piora (fração)')
+    args = parser.parse_args()
+
+    with open(args.antes, 'r', encoding='utf-8') as f:
+        antes = json.load(f)
+    with open(args.depois, 'r', encoding='utf-8') as f:
+        depois = json.load(f)
+    if antes.get('benchmark') != depois.get('benchmark'):
+        print(f"❌ Benchmarks diferentes: {antes.get('benchmark')} x {depois.get('benchmark')}")
+        sys.exit(1)
+
+    pioras = comparar(antes, depois, args.tolerancia)
+    if pioras:
+        print(f"❌ {len(pioras)} métrica(s) pioraram mais de {args.tolerancia:.0%}: {', '.join(pioras)}")
+        sys.exit(1)
+    print(f"✅ Nenhuma métrica piorou mais de {args.tolerancia:.0%}")
+
+
+if __name__ == '__main__':
+    main()
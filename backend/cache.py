@@ -0,0 +1,158 @@
+"""
+Cache em memória com limite de tamanho (LRU), TTL por entrada e
+coalescência de cargas concorrentes (single-flight).
+
+Usado para memorizar resultados de consultas externas, como a ViaCEP.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class CargaInterrompida(Exception):
+    """A carga de que a thread dependia foi interrompida sem resultado."""
+
+
+class _Carga:
+    """Carga em andamento de uma chave, aguardada pelas demais threads."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.erro = None
+
+
+class CacheTTL:
+    """
+    Cache LRU com TTL por entrada, seguro para uso entre threads.
+
+    `ttl` pode ser um número de segundos ou uma função que recebe o valor
+    e devolve o TTL, o que permite cachear resultados negativos por menos
+    tempo que os positivos.
+    """
+
+    def __init__(self, tamanho_maximo=10000, ttl=86400, relogio=time.monotonic):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._relogio = relogio
+        self._dados = OrderedDict()
+        self._cargas = {}
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.expiracoes = 0
+        self.coalescidas = 0
+
+    def __len__(self):
+        return len(self._dados)
+
+    def _ttl_para(self, valor, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return ttl(valor) if callable(ttl) else ttl
+
+    def _buscar(self, chave):
+        # Deve ser chamado com o lock adquirido
+        entrada = self._dados.get(chave)
+        if entrada is None:
+            self.falhas += 1
+            return _AUSENTE
+
+        valor, expira_em = entrada
+        if expira_em <= self._relogio():
+            del self._dados[chave]
+            self.expiracoes += 1
+            self.falhas += 1
+            return _AUSENTE
+
+        self._dados.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def _gravar(self, chave, valor, ttl):
+        # Deve ser chamado com o lock adquirido
+        self._dados[chave] = (valor, self._relogio() + self._ttl_para(valor, ttl))
+        self._dados.move_to_end(chave)
+        while len(self._dados) > self.tamanho_maximo:
+            self._dados.popitem(last=False)
+            self.despejos += 1
+
+    def obter(self, chave, padrao=None):
+        """Retorna o valor em cache para a chave, ou `padrao`."""
+        with self._lock:
+            valor = self._buscar(chave)
+        return padrao if valor is _AUSENTE else valor
+
+    def definir(self, chave, valor, ttl=None):
+        """Grava um valor no cache."""
+        with self._lock:
+            self._gravar(chave, valor, ttl)
+
+    def obter_ou_carregar(self, chave, carregar, ttl=None):
+        """
+        Retorna o valor em cache ou executa `carregar()` para obtê-lo.
+
+        Se várias threads pedirem a mesma chave ausente ao mesmo tempo,
+        apenas uma executa `carregar()`; as demais aguardam o resultado.
+        Exceções levantadas por `carregar()` não são cacheadas. Se a carga
+        for interrompida por uma BaseException (KeyboardInterrupt, Timeout
+        do gevent...), nada é gravado e as threads que aguardavam recebem
+        CargaInterrompida.
+        """
+        with self._lock:
+            valor = self._buscar(chave)
+            if valor is not _AUSENTE:
+                return valor
+
+            carga = self._cargas.get(chave)
+            lider = carga is None
+            if lider:
+                carga = self._cargas[chave] = _Carga()
+            else:
+                self.coalescidas += 1
+
+        if not lider:
+            carga.evento.wait()
+            if carga.erro is not None:
+                raise carga.erro
+            return carga.valor
+
+        concluida = False
+        try:
+            carga.valor = carregar()
+            concluida = True
+        except Exception as e:
+            carga.erro = e
+            raise
+        finally:
+            with self._lock:
+                if concluida:
+                    self._gravar(chave, carga.valor, ttl)
+                del self._cargas[chave]
+            if not concluida and carga.erro is None:
+                carga.erro = CargaInterrompida(f'Carga de {chave!r} interrompida')
+            carga.evento.set()
+
+        return carga.valor
+
+    def limpar(self):
+        """Remove todas as entradas (os contadores são mantidos)."""
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self):
+        """Contadores de uso do cache, para dimensionamento."""
+        with self._lock:
+            return {
+                'tamanho': len(self._dados),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'despejos': self.despejos,
+                'expiracoes': self.expiracoes,
+                'coalescidas': self.coalescidas,
+            }
@@ -0,0 +1,93 @@
+"""
+Cache das respostas do /calculate.
+
+Com os dados fixos, a resposta de um cálculo depende só de (UF,
+distribuidora, consumo, data de referência, período, subclasse). O corpo
+JSON já serializado fica num CacheTTL em memória, com essa chave mais a
+versão do snapshot de tarifas (e a do histórico, quando há data de
+referência). Quando tarifas.json ou bandeira.json mudam, a versão do
+snapshot muda, as entradas antigas deixam de ser encontradas e saem pelo
+LRU.
+
+Cada corpo tem um ETag forte (versão dos dados + hash do corpo), e as
+respostas levam Cache-Control, para que o navegador revalide com
+If-None-Match e a CDN da Vercel sirva repetições do GET /api/calculate
+sem chegar à função.
+"""
+
+import hashlib
+import json
+import os
+
+from cache import CacheTTL
+from calculo import calcular_conta
+
+CACHE_RESPOSTAS_TAMANHO = int(os.environ.get('CACHE_RESPOSTAS_TAMANHO', 10000))
+CACHE_RESPOSTAS_TTL = float(os.environ.get('CACHE_RESPOSTAS_TTL', 86400))
+
+# Navegador: 1 min (depois revalida com o ETag); CDN: 5 min, mais 1 min
+# servindo a cópia anterior enquanto revalida. Depois de uma publicação,
+# a CDN pode servir a conta antiga por até s-maxage + stale-while-revalidate
+# (6 min), a menos que o cache dela seja limpo
+CACHE_CONTROL = os.environ.get(
+    'CACHE_CONTROL_CALCULO', 'public, max-age=60, s-maxage=300, stale-while-revalidate=60'
+)
+
+_cache = CacheTTL(tamanho_maximo=CACHE_RESPOSTAS_TAMANHO, ttl=CACHE_RESPOSTAS_TTL)
+
+
+def dados_da_consulta(args):
+    """
+    Parâmetros do GET /calculate (query string) no formato do corpo do
+    POST; o período vem de `periodo_inicio` e `periodo_fim`.
+    """
+    dados = {campo: args[campo] for campo in ('cep', 'consumo', 'data_referencia', 'subclasse')
+             if campo in args}
+    if 'periodo_inicio' in args or 'periodo_fim' in args:
+        dados['periodo'] = {'inicio': args.get('periodo_inicio'), 'fim': args.get('periodo_fim')}
+    return dados
+
+
+def serializar(resultado):
+    # Mesmo formato do jsonify do Flask (chaves ordenadas, sem espaços)
+    return (json.dumps(resultado, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def resposta_calculo(snapshot, estado, consumo, distribuidora=None, data_referencia=None,
+                     periodo=None, subclasse=None):
+    """
+    (corpo JSON em bytes, ETag) do /calculate, do cache quando possível.
+    ErroCalculo de calcular_conta() é propagado e não vai para o cache.
+    """
+    versao_historico = None
+    if data_referencia is not None:
+        from historico import obter_historico
+        versao_historico = obter_historico().versao
+
+    chave = (snapshot.versao, versao_historico, estado, distribuidora, consumo, data_referencia,
+             periodo, subclasse)
+
+    def carregar():
+        corpo = serializar(calcular_conta(snapshot, estado, consumo, distribuidora,
+                                          data_referencia, periodo, subclasse))
+        return corpo, f'"{snapshot.versao}-{hashlib.blake2b(corpo, digest_size=8).hexdigest()}"'
+
+    return _cache.obter_ou_carregar(chave, carregar)
+
+
+def etag_confere(if_none_match, etag):
+    """
+    True se o cabeçalho If-None-Match do cliente inclui `etag` (ou `*`).
+    """
+    if not if_none_match:
+        return False
+    for valor in if_none_match.split(','):
+        valor = valor.strip()
+        if valor in (etag, '*', 'W/' + etag):
+            return True
+    return False
+
+
+def estatisticas_cache_respostas():
+    """Contadores do cache de respostas, para o /health."""
+    return _cache.estatisticas()
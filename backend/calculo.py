@@ -0,0 +1,167 @@
+"""
+Cálculo da conta de energia a partir de um snapshot de tarifas.
+
+Compartilhado pelas duas entradas da API (api/index.py e backend/app.py).
+"""
+
+from datetime import date
+
+from bandeiras import indice_mes
+from impostos import carregar_tabela_impostos
+from subclasses import carregar_tabela_subclasses
+
+# Maior período de leitura aceito no /calculate
+DIAS_MAXIMOS_PERIODO = 366
+
+
+class ErroCalculo(Exception):
+    """
+    Erro de cálculo, com o status HTTP a ser devolvido ao cliente.
+    """
+
+    def __init__(self, mensagem, status):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def ler_data_referencia(valor):
+    """
+    Data de referência opcional do /calculate: "AAAA-MM-DD" ou "AAAA-MM"
+    (primeiro dia do mês). Retorna None se ausente.
+    """
+    if valor in (None, ''):
+        return None
+    try:
+        texto = str(valor).strip()
+        return date.fromisoformat(texto + '-01' if len(texto) == 7 else texto)
+    except ValueError:
+        raise ErroCalculo('data_referencia inválida (use AAAA-MM-DD ou AAAA-MM)', 400)
+
+
+def ler_periodo(valor):
+    """
+    Período de leitura opcional do /calculate: {"inicio": "AAAA-MM-DD",
+    "fim": "AAAA-MM-DD"}, datas inclusivas. Retorna (inicio, fim) ou None.
+    """
+    if valor in (None, ''):
+        return None
+    try:
+        inicio = date.fromisoformat(str(valor['inicio']).strip())
+        fim = date.fromisoformat(str(valor['fim']).strip())
+    except (TypeError, KeyError, ValueError):
+        raise ErroCalculo('periodo inválido (use {"inicio": "AAAA-MM-DD", "fim": "AAAA-MM-DD"})', 400)
+    if fim < inicio or (fim - inicio).days >= DIAS_MAXIMOS_PERIODO:
+        raise ErroCalculo(f'periodo deve ter de 1 a {DIAS_MAXIMOS_PERIODO} dias', 400)
+    return inicio, fim
+
+
+def ler_subclasse(valor):
+    """
+    Subclasse opcional do /calculate e do lote ("baixa_renda", ...).
+    Retorna None se ausente.
+    """
+    if valor in (None, ''):
+        return None
+    subclasses = carregar_tabela_subclasses()
+    if valor not in subclasses:
+        raise ErroCalculo(f'subclasse inválida (use: {", ".join(subclasses.descricoes)})', 400)
+    return valor
+
+
+def calcular_conta(snapshot, estado, consumo, distribuidora=None, data_referencia=None,
+                   periodo=None, subclasse=None):
+    """
+    Calcula a conta para `consumo` kWh no estado informado.
+
+    Usa a tarifa da `distribuidora` que atende o CEP, quando conhecida;
+    senão, a tarifa de referência do estado. Com `data_referencia`
+    (date), usa a tarifa dessa distribuidora vigente na data, segundo o
+    histórico, e a bandeira do mês; sem histórico da distribuidora, fica
+    a tarifa atual e a resposta traz `tarifa_historica` falso. Com
+    `periodo` (inicio, fim), a bandeira de cada mês do período incide
+    sobre a parte do consumo proporcional aos seus dias. Sem nenhum dos
+    dois, vale a bandeira atual. Com `subclasse`, energia e bandeira
+    incidem só sobre o consumo faturado pelas faixas de desconto dela
+    (Tarifa Social). `valor_total` é sem impostos; ICMS e PIS/COFINS vêm
+    em `impostos`, com o total em `valor_total_com_impostos`. Retorna o
+    dicionário da resposta do /calculate.
+    """
+    indice = snapshot.indice
+    bandeira_data = snapshot.bandeira
+
+    # Buscar tarifa da distribuidora (ou do estado)
+    tarifa_estado = indice.tarifa_para(estado, distribuidora)
+
+    if not tarifa_estado:
+        raise ErroCalculo('Estado não encontrado na base de dados', 404)
+
+    vigencia = None
+    if data_referencia is not None:
+        # Importado sob demanda: o histórico não faz parte do cold start
+        from historico import obter_historico
+
+        # Histórico da distribuidora do CEP; senão, o da referência do
+        # estado. Sem histórico de nenhuma das duas, fica a tarifa atual.
+        historico = obter_historico()
+        for nome in (distribuidora, tarifa_estado['distribuidora']):
+            if nome and historico.possui(nome):
+                vigencia = historico.tarifa_em(nome, data_referencia)
+                if not vigencia:
+                    raise ErroCalculo('Sem tarifa homologada para a data de referência', 404)
+                tarifa_estado = vigencia
+                break
+
+    # Consumo que paga a tarifa cheia (descontos por faixa da subclasse)
+    consumo_faturado = consumo
+    if subclasse is not None:
+        consumo_faturado = carregar_tabela_subclasses().consumo_faturado(
+            subclasse, consumo, tarifa_estado['distribuidora'])
+
+    # Calcular valor
+    tarifa_kwh = tarifa_estado['tarifa']
+    valor_energia = consumo_faturado * tarifa_kwh
+
+    # Adicionar valor da bandeira
+    partes = None
+    if periodo is not None:
+        valor_bandeira_kwh, partes = snapshot.calendario.do_periodo(*periodo)
+        bandeira = partes[-1][1]
+    elif data_referencia is not None:
+        bandeira, valor_bandeira_kwh = snapshot.calendario.do_mes(indice_mes(data_referencia))
+    else:
+        bandeira = bandeira_data['bandeira_atual']
+        valor_bandeira_kwh = bandeira_data['valor_kwh']
+    valor_bandeira_total = consumo_faturado * valor_bandeira_kwh
+
+    valor_total = valor_energia + valor_bandeira_total
+
+    resultado = {
+        'distribuidora': tarifa_estado['distribuidora'],
+        'estado': estado,
+        'tarifa': tarifa_kwh,
+        'bandeira': bandeira,
+        'valor_bandeira': valor_bandeira_total,
+        'valor_total': valor_total,
+        'comparacao': indice.comparacao_estado(estado),
+        'ultima_atualizacao_dados': indice.ultima_atualizacao
+    }
+    if subclasse is not None:
+        resultado['subclasse'] = subclasse
+        resultado['consumo_faturado'] = consumo_faturado
+        resultado['desconto'] = (consumo - consumo_faturado) * (tarifa_kwh + valor_bandeira_kwh)
+    if data_referencia is not None:
+        resultado['data_referencia'] = data_referencia.isoformat()
+        resultado['tarifa_historica'] = vigencia is not None
+    if vigencia:
+        resultado['vigencia'] = {'inicio': vigencia['inicio'], 'fim': vigencia['fim']}
+    tributos = carregar_tabela_impostos().calcular(estado, consumo, valor_total)
+    if tributos:
+        resultado['impostos'], resultado['valor_total_com_impostos'] = tributos
+    if partes:
+        resultado['periodo'] = {'inicio': periodo[0].isoformat(), 'fim': periodo[1].isoformat()}
+        resultado['bandeiras'] = [
+            {'mes': mes, 'bandeira': nome, 'valor_kwh': valor_kwh, 'consumo': consumo * fracao,
+             'valor_bandeira': consumo_faturado * fracao * valor_kwh}
+            for mes, nome, valor_kwh, fracao in partes
+        ]
+    return resultado
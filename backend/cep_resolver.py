@@ -0,0 +1,280 @@
+"""
+Resolução de CEP para Unidade da Federação.
+
+A consulta é feita primeiro em um índice local de faixas de CEP
+(data/cep_faixas.json), carregado uma única vez em memória e pesquisado
+por busca binária. A API ViaCEP só é consultada para CEPs que não caem
+em nenhuma faixa conhecida, de modo que o caminho comum do /calculate
+não depende de rede.
+
+O CEP também identifica a distribuidora, nos estados atendidos por mais
+de uma (data/cep_distribuidoras.json).
+"""
+
+import bisect
+import json
+import os
+from array import array
+
+from cache import CacheTTL, CargaInterrompida
+
+# Diretório de dados
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+VIACEP_URL = os.environ.get('VIACEP_URL', 'https://viacep.com.br/ws/{cep}/json/')
+
+# Cache das respostas da ViaCEP (CEPs fora do índice local)
+CEP_CACHE_TAMANHO = int(os.environ.get('CEP_CACHE_TAMANHO', 10000))
+CEP_CACHE_TTL = float(os.environ.get('CEP_CACHE_TTL', 7 * 86400))
+CEP_CACHE_TTL_NEGATIVO = float(os.environ.get('CEP_CACHE_TTL_NEGATIVO', 3600))
+
+
+class CepError(Exception):
+    """
+    Erro de resolução de CEP, com o status HTTP a ser devolvido ao cliente.
+    """
+
+    def __init__(self, mensagem, status):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class IndiceFaixasCep:
+    """
+    Índice ordenado de faixas de CEP (inclusivas) → UF.
+
+    As faixas não podem se sobrepor; a busca é um bisect sobre o início
+    de cada faixa seguido de uma comparação com o fim.
+    """
+
+    def __init__(self, faixas):
+        faixas = sorted(faixas, key=lambda f: int(f['inicio']))
+        self._inicios = [int(f['inicio']) for f in faixas]
+        self._fins = [int(f['fim']) for f in faixas]
+        self._ufs = [f['uf'] for f in faixas]
+
+    def __len__(self):
+        return len(self._inicios)
+
+    def buscar(self, cep):
+        """
+        Retorna a UF da faixa que contém o CEP (inteiro), ou None.
+        """
+        i = bisect.bisect_right(self._inicios, cep) - 1
+        if i >= 0 and cep <= self._fins[i]:
+            return self._ufs[i]
+        return None
+
+
+class IndiceDistribuidorasCep:
+    """
+    Faixas de CEP (inclusivas) → distribuidora, com consulta O(1).
+
+    O espaço de CEPs é dividido em blocos de 1000 (os 5 primeiros
+    dígitos). Uma tabela pré-calculada guarda, para cada bloco, a
+    distribuidora que cobre o bloco inteiro, nenhuma, ou a marca de bloco
+    misto (cortado por um limite de faixa); só nesse último caso a busca
+    cai no bisect sobre as faixas.
+    """
+
+    TAMANHO_BLOCO = 1000
+    _MISTO = 0xFFFF
+
+    def __init__(self, faixas):
+        faixas = sorted(faixas, key=lambda f: int(f['inicio']))
+        self._inicios = [int(f['inicio']) for f in faixas]
+        self._fins = [int(f['fim']) for f in faixas]
+
+        # Código de cada distribuidora (1..n; 0 = sem faixa)
+        self.distribuidoras = []
+        codigos = {}
+        self._codigos = []
+        for f in faixas:
+            nome = f['distribuidora']
+            if nome not in codigos:
+                self.distribuidoras.append(nome)
+                codigos[nome] = len(self.distribuidoras)
+            self._codigos.append(codigos[nome])
+
+        tamanho = self.TAMANHO_BLOCO
+        self._blocos = array('H', bytes(2 * (100000000 // tamanho)))
+        for inicio, fim, codigo in zip(self._inicios, self._fins, self._codigos):
+            # Blocos inteiramente dentro da faixa recebem o código; os das
+            # pontas, se cortados pela faixa, ficam mistos
+            primeiro = -(-inicio // tamanho)
+            ultimo = (fim + 1) // tamanho
+            if primeiro < ultimo:
+                self._blocos[primeiro:ultimo] = array('H', [codigo]) * (ultimo - primeiro)
+            for bloco in (inicio // tamanho, fim // tamanho):
+                if not primeiro <= bloco < ultimo:
+                    self._blocos[bloco] = self._MISTO
+
+    def __len__(self):
+        return len(self._inicios)
+
+    def buscar(self, cep):
+        """
+        Retorna a distribuidora da faixa que contém o CEP (inteiro), ou None.
+        """
+        codigo = self._blocos[cep // self.TAMANHO_BLOCO]
+        if codigo == self._MISTO:
+            i = bisect.bisect_right(self._inicios, cep) - 1
+            codigo = self._codigos[i] if i >= 0 and cep <= self._fins[i] else 0
+        return self.distribuidoras[codigo - 1] if codigo else None
+
+
+# Índices carregados sob demanda
+_indice_cache = None
+_indice_distribuidoras_cache = None
+
+
+def carregar_indice():
+    """
+    Carrega o índice de faixas de CEP (uma única vez por processo).
+    """
+    global _indice_cache
+    if _indice_cache is None:
+        faixas_path = os.path.join(DATA_DIR, 'cep_faixas.json')
+        with open(faixas_path, 'r', encoding='utf-8') as f:
+            _indice_cache = IndiceFaixasCep(json.load(f)['faixas'])
+    return _indice_cache
+
+
+def carregar_indice_distribuidoras():
+    """
+    Carrega o índice CEP → distribuidora (uma única vez por processo).
+    """
+    global _indice_distribuidoras_cache
+    if _indice_distribuidoras_cache is None:
+        faixas_path = os.path.join(DATA_DIR, 'cep_distribuidoras.json')
+        with open(faixas_path, 'r', encoding='utf-8') as f:
+            _indice_distribuidoras_cache = IndiceDistribuidorasCep(json.load(f)['faixas'])
+    return _indice_distribuidoras_cache
+
+
+def normalizar_cep(cep):
+    """
+    Remove hífen e espaços do CEP informado.
+    """
+    return str(cep).replace('-', '').strip()
+
+
+def validar_cep(cep):
+    """
+    Normaliza o CEP e levanta CepError se não tiver 8 dígitos.
+    """
+    cep = normalizar_cep(cep)
+
+    # A ViaCEP responde 400 para formatos inválidos; não vale a viagem
+    if len(cep) != 8 or not cep.isdigit():
+        raise CepError('CEP inválido', 400)
+
+    return cep
+
+
+def buscar_uf_local(cep):
+    """
+    Busca a UF do CEP apenas no índice local. Retorna None se não houver faixa.
+    """
+    if len(cep) != 8 or not cep.isdigit():
+        return None
+    return carregar_indice().buscar(int(cep))
+
+
+def buscar_distribuidora_local(cep):
+    """
+    Distribuidora que atende o CEP, se ele estiver numa faixa mapeada.
+    """
+    if len(cep) != 8 or not cep.isdigit():
+        return None
+    return carregar_indice_distribuidoras().buscar(int(cep))
+
+
+def buscar_uf_viacep(cep):
+    """
+    Busca a UF do CEP na API ViaCEP.
+    """
+    from upstream import UpstreamError, obter_cliente
+
+    try:
+        response = obter_cliente().get(VIACEP_URL.format(cep=cep))
+    except UpstreamError:
+        raise CepError('Serviço de CEP indisponível', 503)
+
+    status = response.status_code
+    return uf_da_resposta_viacep(status, response.json() if status == 200 else None)
+
+
+def uf_da_resposta_viacep(status, cep_data):
+    """
+    Extrai a UF do status e do JSON de uma resposta da ViaCEP.
+    """
+    if status != 200:
+        raise CepError('CEP inválido', 400)
+
+    if 'erro' in cep_data:
+        raise CepError('CEP não encontrado', 404)
+
+    return cep_data.get('uf')
+
+
+def _ttl_resultado(resultado):
+    # "CEP não encontrado" fica em cache por menos tempo que uma UF válida
+    return CEP_CACHE_TTL_NEGATIVO if isinstance(resultado, CepError) else CEP_CACHE_TTL
+
+
+def _consultar_viacep(cep):
+    try:
+        return buscar_uf_viacep(cep)
+    except CepError as e:
+        if e.status == 404:
+            return e
+        raise
+
+
+_cache_viacep = CacheTTL(tamanho_maximo=CEP_CACHE_TAMANHO, ttl=_ttl_resultado)
+
+
+def buscar_uf_viacep_cacheado(cep):
+    """
+    Busca a UF na ViaCEP passando pelo cache.
+
+    Respostas "CEP não encontrado" também são cacheadas (cache negativo) e
+    requisições simultâneas para o mesmo CEP geram uma única consulta.
+    """
+    try:
+        resultado = _cache_viacep.obter_ou_carregar(cep, lambda: _consultar_viacep(cep))
+    except CargaInterrompida:
+        raise CepError('Consulta de CEP interrompida', 503)
+    if isinstance(resultado, CepError):
+        raise resultado
+    return resultado
+
+
+def obter_cache_viacep():
+    """
+    Cache compartilhado das respostas da ViaCEP (UF ou CepError 404).
+    """
+    return _cache_viacep
+
+
+def estatisticas_cache():
+    """
+    Contadores do cache de CEPs (acertos, falhas, despejos...).
+    """
+    return _cache_viacep.estatisticas()
+
+
+def resolver_uf(cep):
+    """
+    Resolve a UF de um CEP: índice local primeiro, ViaCEP como fallback.
+
+    Levanta CepError quando o CEP é inválido ou não existe.
+    """
+    cep = validar_cep(cep)
+
+    estado = buscar_uf_local(cep)
+    if estado:
+        return estado
+
+    return buscar_uf_viacep_cacheado(cep)
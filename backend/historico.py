@@ -0,0 +1,245 @@
+"""
+Histórico das tarifas homologadas (data/historico.db).
+
+Cada janela de vigência de cada distribuidora vista na ANEEL é gravada
+em SQLite só com INSERT: nenhuma linha é alterada ou apagada. Uma janela
+só ganha linha nova quando TUSD ou TE diferem da última linha gravada
+para as mesmas datas: se a ANEEL revisar uma janela, a revisão entra como
+nova linha e prevalece sobre a anterior, inclusive quando volta a um
+valor já visto (A → B → A). Substitui os antigos
+tarifas_backup_<timestamp>.json.
+
+As consultas "tarifa vigente na data X" não vão ao SQLite: o histórico
+é carregado uma vez em listas ordenadas por início de vigência, uma por
+distribuidora, e resolvido com bisect. O índice é recarregado quando o
+arquivo muda.
+"""
+
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import closing
+from datetime import date, datetime
+from pathlib import Path
+
+# Diretório de dados
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+HISTORICO_PATH = os.path.join(DATA_DIR, 'historico.db')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS vigencias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    estado TEXT NOT NULL,
+    distribuidora TEXT NOT NULL,
+    inicio TEXT NOT NULL,
+    fim TEXT NOT NULL,
+    tarifa REAL NOT NULL,
+    tusd REAL NOT NULL,
+    te REAL NOT NULL,
+    registrado_em TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vigencias_janela ON vigencias (distribuidora, inicio, fim);
+CREATE INDEX IF NOT EXISTS vigencias_estado ON vigencias (estado, distribuidora, inicio);
+"""
+
+CAMPOS = ('estado', 'distribuidora', 'inicio', 'fim', 'tarifa', 'tusd', 'te')
+
+
+def _migrar(conexao):
+    # Bancos antigos tinham UNIQUE (distribuidora, inicio, fim, tusd, te),
+    # que impedia gravar a volta a um valor já visto
+    tabela = conexao.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'vigencias'").fetchone()
+    if tabela and 'UNIQUE' in tabela[0]:
+        with conexao:
+            conexao.execute("DROP INDEX IF EXISTS vigencias_janela")
+            conexao.execute("DROP INDEX IF EXISTS vigencias_estado")
+            conexao.execute("ALTER TABLE vigencias RENAME TO vigencias_antigas")
+            conexao.executescript(ESQUEMA)
+            conexao.execute("INSERT INTO vigencias SELECT * FROM vigencias_antigas ORDER BY id")
+            conexao.execute("DROP TABLE vigencias_antigas")
+
+
+def registrar_vigencias(janelas, caminho=HISTORICO_PATH):
+    """
+    Acrescenta ao histórico as janelas de vigência novas ou revisadas
+    (TUSD ou TE diferentes da última linha com as mesmas datas).
+
+    Cada janela é um dicionário com estado, distribuidora, inicio e fim
+    (AAAA-MM-DD), tarifa, tusd e te (R$/kWh). Retorna quantas linhas
+    foram gravadas.
+    """
+    registrado_em = datetime.now().isoformat(timespec='seconds')
+
+    with closing(sqlite3.connect(caminho)) as conexao:
+        conexao.executescript(ESQUEMA)
+        _migrar(conexao)
+
+        # Valores da última linha de cada janela (a gravada por último vale)
+        ultimos = {}
+        for distribuidora, inicio, fim, tusd, te in conexao.execute(
+                "SELECT distribuidora, inicio, fim, tusd, te FROM vigencias ORDER BY id"):
+            ultimos[(distribuidora, inicio, fim)] = (tusd, te)
+
+        linhas = []
+        for janela in janelas:
+            chave = (janela['distribuidora'], janela['inicio'], janela['fim'])
+            valores = (janela['tusd'], janela['te'])
+            if ultimos.get(chave) != valores:
+                ultimos[chave] = valores
+                linhas.append(tuple(janela[campo] for campo in CAMPOS) + (registrado_em,))
+
+        with conexao:
+            conexao.executemany(
+                f"INSERT INTO vigencias ({', '.join(CAMPOS)}, registrado_em) "
+                f"VALUES ({', '.join('?' * (len(CAMPOS) + 1))})",
+                linhas
+            )
+        return len(linhas)
+
+
+def ler_vigencias(caminho=HISTORICO_PATH):
+    """
+    Todas as janelas do histórico, na ordem em que foram gravadas.
+    """
+    # Somente leitura: funciona também em sistemas de arquivos read-only
+    uri = Path(caminho).resolve().as_uri() + '?mode=ro'
+    with closing(sqlite3.connect(uri, uri=True)) as conexao:
+        return [dict(zip(CAMPOS, linha)) for linha in conexao.execute(
+            f"SELECT {', '.join(CAMPOS)} FROM vigencias ORDER BY id")]
+
+
+class IndiceHistorico:
+    """
+    Janelas de vigência ordenadas por distribuidora e início.
+
+    Para cada distribuidora guarda, em listas paralelas, o início e o fim
+    de cada janela (como ordinal do dia) e o maior fim entre as janelas
+    anteriores, que encerra cedo a busca por sobreposições. `versao`
+    identifica o arquivo de origem (entra na chave do cache de respostas).
+    """
+
+    def __init__(self, linhas, versao=None):
+        self.versao = versao
+        # Uma janela por (distribuidora, início, fim); a gravada por último vale
+        janelas = {}
+        for linha in linhas:
+            janelas[(linha['distribuidora'].strip().upper(), linha['inicio'], linha['fim'])] = linha
+
+        self._por_distribuidora = {}
+        self._por_estado = {}
+        for chave in sorted(janelas):
+            janela = janelas[chave]
+            inicios, fins, alcances, lista = self._por_distribuidora.setdefault(
+                chave[0], ([], [], [], []))
+            fim = date.fromisoformat(janela['fim']).toordinal()
+            inicios.append(date.fromisoformat(janela['inicio']).toordinal())
+            fins.append(fim)
+            alcances.append(max(fim, alcances[-1]) if alcances else fim)
+            lista.append(janela)
+            self._por_estado.setdefault(janela['estado'], []).append(janela)
+
+        self.total = len(janelas)
+        # Séries em arrays numpy, montadas na primeira consulta vetorizada
+        self._vetores = {}
+
+    def possui(self, distribuidora):
+        """Se há alguma janela da distribuidora no histórico."""
+        return (distribuidora or '').strip().upper() in self._por_distribuidora
+
+    def tarifa_em(self, distribuidora, data_referencia):
+        """
+        Janela da `distribuidora` vigente em `data_referencia` (date).
+
+        Entre janelas sobrepostas vale a de início mais recente. Numa data
+        não coberta por nenhuma janela, vale a última iniciada antes dela
+        (a tarifa segue em vigor até a próxima homologação). Retorna None
+        antes da primeira janela ou para distribuidora sem histórico.
+        """
+        serie = self._por_distribuidora.get((distribuidora or '').strip().upper())
+        if serie is None:
+            return None
+        inicios, fins, alcances, lista = serie
+
+        dia = data_referencia.toordinal()
+        i = bisect_right(inicios, dia) - 1
+        if i < 0:
+            return None
+        j = i
+        while j >= 0 and alcances[j] >= dia:
+            if fins[j] >= dia:
+                return lista[j]
+            j -= 1
+        return lista[i]
+
+    def tarifas_em(self, distribuidora, dias):
+        """
+        Versão vetorizada de tarifa_em(): tarifa (R$/kWh) vigente em cada
+        dia de `dias` (array numpy de ordinais), NaN antes da primeira
+        janela. Retorna None para distribuidora sem histórico.
+
+        Só os dias em que a janela de início mais recente já terminou mas
+        uma anterior ainda vale (sobreposição) são resolvidos um a um.
+        """
+        import numpy as np
+
+        nome = (distribuidora or '').strip().upper()
+        serie = self._por_distribuidora.get(nome)
+        if serie is None:
+            return None
+        vetores = self._vetores.get(nome)
+        if vetores is None:
+            inicios, fins, alcances, lista = serie
+            vetores = self._vetores[nome] = (
+                np.array(inicios), np.array(fins), np.array(alcances),
+                np.array([janela['tarifa'] for janela in lista], dtype=float))
+        inicios, fins, alcances, tarifas_janela = vetores
+
+        i = np.searchsorted(inicios, dias, side='right') - 1
+        iniciadas = i >= 0
+        i = np.where(iniciadas, i, 0)
+        tarifas = np.where(iniciadas, tarifas_janela[i], np.nan)
+        for k in np.flatnonzero(iniciadas & (fins[i] < dias) & (alcances[i] >= dias)):
+            tarifas[k] = self.tarifa_em(nome, date.fromordinal(int(dias[k])))['tarifa']
+        return tarifas
+
+    def janelas_estado(self, estado, distribuidora=None):
+        """
+        Janelas do estado, por distribuidora e início de vigência.
+        """
+        janelas = self._por_estado.get(estado, [])
+        if distribuidora:
+            nome = distribuidora.strip().upper()
+            janelas = [j for j in janelas if j['distribuidora'].strip().upper() == nome]
+        return janelas
+
+
+# Índice compartilhado pelo processo, com a assinatura (mtime/tamanho) do arquivo
+_indice = None
+_assinatura = None
+_indice_lock = threading.Lock()
+
+
+def obter_historico(caminho=None):
+    """
+    Índice do histórico, recarregado quando o arquivo muda.
+
+    Sem o arquivo (nenhuma sincronização gravou histórico ainda), o índice
+    fica vazio.
+    """
+    global _indice, _assinatura
+    caminho = caminho or HISTORICO_PATH
+    try:
+        st = os.stat(caminho)
+        assinatura = (caminho, st.st_mtime_ns, st.st_size)
+    except OSError:
+        assinatura = (caminho, None, None)
+
+    if _indice is None or assinatura != _assinatura:
+        with _indice_lock:
+            if _indice is None or assinatura != _assinatura:
+                linhas = ler_vigencias(caminho) if assinatura[1] is not None else []
+                _indice, _assinatura = IndiceHistorico(linhas, assinatura[1:]), assinatura
+    return _indice
@@ -0,0 +1,99 @@
+"""
+Tributos sobre a conta de energia: ICMS (por UF) e PIS/COFINS.
+
+As alíquotas vêm de data/impostos.json. Na carga, a regra de cada UF é
+compilada em uma lista crescente de limites de consumo (as faixas) e,
+para cada faixa e para o consumo acima da última, as alíquotas já
+combinadas no fator de gross-up. Por requisição sobra um bisect e uma
+multiplicação.
+
+Os tributos são calculados "por dentro", como na fatura: o total é
+base / (1 - ICMS - PIS - COFINS) e cada tributo é a sua alíquota sobre
+esse total. A faixa é escolhida pelo consumo do mês e vale para a conta
+inteira (até o limite, a alíquota da faixa; acima dele, a alíquota geral).
+"""
+
+import json
+import os
+from bisect import bisect_left
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+IMPOSTOS_PATH = os.path.join(DATA_DIR, 'impostos.json')
+
+
+class TabelaImpostos:
+    """
+    Regras de tributação compiladas por UF.
+    """
+
+    def __init__(self, impostos_data):
+        pis = impostos_data['pis']
+        cofins = impostos_data['cofins']
+        self._por_estado = {}
+        for estado, regra in impostos_data['estados'].items():
+            pis_uf = regra.get('pis', pis)
+            cofins_uf = regra.get('cofins', cofins)
+            faixas = sorted(regra.get('faixas', []), key=lambda faixa: faixa['ate_kwh'])
+            limites = [faixa['ate_kwh'] for faixa in faixas]
+            aliquotas = [faixa['icms'] for faixa in faixas] + [regra['icms']]
+            self._por_estado[estado] = (limites, [
+                (icms, pis_uf, cofins_uf, 1 / (1 - icms - pis_uf - cofins_uf))
+                for icms in aliquotas
+            ])
+
+    def fator(self, estado, consumo):
+        """
+        (icms, pis, cofins, fator de gross-up) para `consumo` kWh na UF,
+        ou None se ela não estiver na tabela.
+        """
+        regra = self._por_estado.get(estado)
+        if regra is None:
+            return None
+        limites, aliquotas = regra
+        return aliquotas[bisect_left(limites, consumo)]
+
+    def fatores(self, estado, consumos):
+        """
+        Versão vetorizada de fator() para um array numpy de consumos: só o
+        fator de gross-up de cada um, ou None se a UF não estiver na tabela.
+        """
+        import numpy as np
+
+        regra = self._por_estado.get(estado)
+        if regra is None:
+            return None
+        limites, aliquotas = regra
+        fatores = np.array([fator for _, _, _, fator in aliquotas])
+        return fatores[np.searchsorted(limites, consumos, side='left')]
+
+    def calcular(self, estado, consumo, valor):
+        """
+        Tributos sobre `valor` (energia + bandeira, sem impostos). Retorna
+        (detalhamento, total com impostos), ou None se a UF não estiver na
+        tabela.
+        """
+        aliquotas = self.fator(estado, consumo)
+        if aliquotas is None:
+            return None
+        icms, pis, cofins, fator = aliquotas
+        total = valor * fator
+        return {
+            'icms': {'aliquota': icms, 'valor': total * icms},
+            'pis': {'aliquota': pis, 'valor': total * pis},
+            'cofins': {'aliquota': cofins, 'valor': total * cofins},
+            'total': total - valor
+        }, total
+
+
+_tabela_cache = None
+
+
+def carregar_tabela_impostos():
+    """
+    Carrega e compila a tabela de tributos (uma única vez por processo).
+    """
+    global _tabela_cache
+    if _tabela_cache is None:
+        with open(IMPOSTOS_PATH, 'r', encoding='utf-8') as f:
+            _tabela_cache = TabelaImpostos(json.load(f))
+    return _tabela_cache
@@ -0,0 +1,275 @@
+"""
+Cálculo em lote (POST /api/calculate/batch).
+
+Os itens `{cep, consumo}` chegam como array JSON ou NDJSON e são
+guardados de forma compacta (CEP normalizado + consumo). Os CEPs são
+deduplicados e resolvidos uma única vez cada (os que não estão no índice
+local vão à ViaCEP em paralelo); em seguida todos os itens são
+calculados numa única passada sobre uma tabela CEP → valores (tarifa
+da distribuidora do CEP ou do estado) pré-calculada a partir do
+snapshot, e a resposta é serializada em streaming, na ordem de entrada.
+Cada item traz também o total com ICMS e PIS/COFINS (o detalhamento
+dos tributos fica só no /calculate) e pode ter `subclasse` (descontos
+por faixa da Tarifa Social, como no /calculate).
+
+A resolução dos CEPs termina antes do primeiro byte da resposta: uma
+falha inesperada nela vira um erro HTTP, e não um corpo truncado. Os
+itens usam a tarifa e a bandeira atuais, como um /calculate sem data;
+itens com `data_referencia` ou `periodo` são recusados (erro no item).
+"""
+
+import json
+import math
+import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from calculo import ErroCalculo
+from cep_resolver import (
+    CepError, buscar_distribuidora_local, buscar_uf_local, normalizar_cep, resolver_uf
+)
+from impostos import carregar_tabela_impostos
+from subclasses import carregar_tabela_subclasses
+
+LOTE_MAXIMO = int(os.environ.get('LOTE_MAXIMO', 100000))
+LOTE_THREADS = int(os.environ.get('LOTE_THREADS', 16))
+
+# Itens serializados por bloco enviado ao cliente
+TAMANHO_BLOCO = 1000
+
+_ITEM_INVALIDO = ('CEP e consumo são obrigatórios', 400)
+_ITEM_COM_DATA = ('data_referencia e periodo não são aceitos no lote; use o /calculate', 400)
+
+
+class Lote:
+    """
+    Itens de um lote em formato compacto.
+
+    `ceps[i]` é o CEP normalizado do item i (None se o item for inválido),
+    `consumos[i]` o seu consumo em kWh e `subclasses[i]` a subclasse
+    informada (ou None). `erros` guarda (mensagem, status) dos itens
+    inválidos que não são só falta de CEP ou consumo.
+    """
+
+    def __init__(self):
+        self.ceps = []
+        self.consumos = array('d')
+        self.subclasses = []
+        self.erros = {}
+
+    def __len__(self):
+        return len(self.ceps)
+
+    def adicionar(self, item):
+        if len(self.ceps) >= LOTE_MAXIMO:
+            raise ErroCalculo(f'Lote excede o limite de {LOTE_MAXIMO} itens', 413)
+
+        cep = None
+        consumo = 0.0
+        subclasse = None
+        if isinstance(item, dict):
+            try:
+                consumo = float(item.get('consumo', 0))
+            except (TypeError, ValueError):
+                consumo = 0.0
+            cep = normalizar_cep(item.get('cep', '')) or None
+            subclasse = item.get('subclasse') or None
+            if item.get('data_referencia') or item.get('periodo'):
+                self.erros[len(self.ceps)] = _ITEM_COM_DATA
+                cep = None
+        if not math.isfinite(consumo) or consumo <= 0:
+            cep = None
+
+        self.ceps.append(cep)
+        self.consumos.append(consumo if cep else 0.0)
+        self.subclasses.append(subclasse)
+
+
+def ler_lote_json(itens):
+    """Monta um Lote a partir de uma lista já decodificada."""
+    if not isinstance(itens, list):
+        raise ErroCalculo('Envie uma lista de itens {cep, consumo}', 400)
+
+    lote = Lote()
+    for item in itens:
+        lote.adicionar(item)
+    return lote
+
+
+def _linhas(stream, tamanho_bloco=1 << 16):
+    # Lê o stream em blocos grandes; iterar linha a linha no stream da
+    # requisição custa uma chamada de leitura por poucos bytes
+    resto = b''
+    while True:
+        bloco = stream.read(tamanho_bloco)
+        if not bloco:
+            break
+        linhas = (resto + bloco).split(b'\n')
+        resto = linhas.pop()
+        yield from linhas
+    if resto:
+        yield resto
+
+
+def ler_lote_ndjson(stream):
+    """Monta um Lote a partir de um stream binário NDJSON (um item por linha)."""
+    lote = Lote()
+    for linha in _linhas(stream):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            item = json.loads(linha)
+        except ValueError:
+            item = None
+        lote.adicionar(item)
+    return lote
+
+
+def resolver_ceps(ceps):
+    """
+    Resolve cada CEP distinto uma única vez.
+
+    Retorna dict CEP → UF ou CepError. CEPs fora do índice local são
+    consultados em paralelo (passando pelo cache da ViaCEP).
+    """
+    resolvidos = {}
+    pendentes = []
+    for cep in set(ceps):
+        if cep is None:
+            continue
+        estado = buscar_uf_local(cep)
+        if estado:
+            resolvidos[cep] = estado
+        else:
+            pendentes.append(cep)
+
+    def resolver(cep):
+        try:
+            return resolver_uf(cep)
+        except CepError as e:
+            return e
+
+    if pendentes:
+        with ThreadPoolExecutor(max_workers=min(LOTE_THREADS, len(pendentes))) as executor:
+            resolvidos.update(zip(pendentes, executor.map(resolver, pendentes)))
+
+    return resolvidos
+
+
+def _tabela_valores(snapshot, resolvidos):
+    # CEP → (distribuidora, tarifa, valor da bandeira por kWh), ou None se
+    # não houver tarifa para a UF
+    valor_bandeira_kwh = snapshot.bandeira['valor_kwh']
+    tabela = {}
+    for cep, estado in resolvidos.items():
+        if isinstance(estado, CepError):
+            continue
+        tarifa = snapshot.indice.tarifa_para(estado, buscar_distribuidora_local(cep))
+        tabela[cep] = (tarifa['distribuidora'], tarifa['tarifa'], valor_bandeira_kwh) if tarifa else None
+    return tabela
+
+
+def calcular_lote(snapshot, lote):
+    """
+    Resolve os CEPs e carrega as tabelas do lote e retorna um gerador com
+    o resultado (ou erro) de cada item, na ordem do lote. Erros
+    inesperados são levantados aqui, antes de o gerador existir.
+    """
+    resolvidos = resolver_ceps(lote.ceps)
+    tabela = _tabela_valores(snapshot, resolvidos)
+    impostos = carregar_tabela_impostos()
+    subclasses = None
+    if any(subclasse is not None for subclasse in lote.subclasses):
+        subclasses = carregar_tabela_subclasses()
+    return _resultados(snapshot, lote, resolvidos, tabela, impostos, subclasses)
+
+
+def _resultados(snapshot, lote, resolvidos, tabela, impostos, subclasses):
+    bandeira = snapshot.bandeira['bandeira_atual']
+
+    for i, (cep, consumo, subclasse) in enumerate(zip(lote.ceps, lote.consumos, lote.subclasses)):
+        if cep is None:
+            mensagem, status = lote.erros.get(i, _ITEM_INVALIDO)
+            yield {'indice': i, 'error': mensagem, 'status': status}
+            continue
+
+        estado = resolvidos[cep]
+        if isinstance(estado, CepError):
+            yield {'indice': i, 'cep': cep, 'error': str(estado), 'status': estado.status}
+            continue
+
+        valores = tabela[cep]
+        if valores is None:
+            yield {'indice': i, 'cep': cep, 'estado': estado,
+                   'error': 'Estado não encontrado na base de dados', 'status': 404}
+            continue
+
+        distribuidora, tarifa_kwh, valor_bandeira_kwh = valores
+        consumo_faturado = consumo
+        if subclasse is not None:
+            if subclasse not in subclasses:
+                yield {'indice': i, 'cep': cep, 'error': 'subclasse inválida', 'status': 400}
+                continue
+            consumo_faturado = subclasses.consumo_faturado(subclasse, consumo, distribuidora)
+
+        valor_bandeira_total = consumo_faturado * valor_bandeira_kwh
+        valor_total = consumo_faturado * tarifa_kwh + valor_bandeira_total
+        resultado = {
+            'indice': i,
+            'cep': cep,
+            'consumo': consumo,
+            'distribuidora': distribuidora,
+            'estado': estado,
+            'tarifa': tarifa_kwh,
+            'bandeira': bandeira,
+            'valor_bandeira': valor_bandeira_total,
+            'valor_total': valor_total
+        }
+        if subclasse is not None:
+            resultado['subclasse'] = subclasse
+            resultado['consumo_faturado'] = consumo_faturado
+        aliquotas = impostos.fator(estado, consumo)
+        if aliquotas:
+            resultado['valor_total_com_impostos'] = valor_total * aliquotas[3]
+        yield resultado
+
+
+def serializar_json(snapshot, resultados):
+    """
+    Serializa os resultados como um objeto JSON, em blocos.
+    """
+    cabecalho = {
+        'bandeira': snapshot.bandeira['bandeira_atual'],
+        'ultima_atualizacao_dados': snapshot.indice.ultima_atualizacao
+    }
+    yield json.dumps(cabecalho)[:-1] + ', "resultados": ['
+
+    total = erros = 0
+    bloco = []
+    for resultado in resultados:
+        total += 1
+        if 'error' in resultado:
+            erros += 1
+        bloco.append(json.dumps(resultado))
+        if len(bloco) >= TAMANHO_BLOCO:
+            yield (',' if total > len(bloco) else '') + ','.join(bloco)
+            bloco = []
+    if bloco:
+        yield (',' if total > len(bloco) else '') + ','.join(bloco)
+
+    yield f'], "total": {total}, "erros": {erros}}}'
+
+
+def serializar_ndjson(resultados):
+    """
+    Serializa os resultados como NDJSON (um resultado por linha), em blocos.
+    """
+    bloco = []
+    for resultado in resultados:
+        bloco.append(json.dumps(resultado) + '\n')
+        if len(bloco) >= TAMANHO_BLOCO:
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
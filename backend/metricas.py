@@ -0,0 +1,234 @@
+"""
+Métricas da API em memória, exportadas no formato texto do Prometheus
+(GET /api/metrics).
+
+- calculadora_fase_segundos{fase}: duração de cada fase do /calculate
+  (entrada, cep, tarifas, calculo, serializacao). `calculo` inclui a
+  serialização do JSON quando a resposta não está no cache de respostas;
+  `serializacao` é a montagem da resposta HTTP.
+- calculadora_requisicao_segundos{rota,status}: cada requisição (o
+  _count é o total de respostas por rota e status).
+- calculadora_excecoes_total{rota,tipo}: exceções inesperadas (as que
+  viram 500).
+- calculadora_upstream_chamadas_total{host,resultado}: chamadas a
+  serviços externos por resultado (sucesso, status_transitorio,
+  erro_conexao, falha, circuito_aberto).
+
+Os histogramas têm limites fixos. A rota anota o instante do fim de
+cada fase numa lista (`marcas`); na requisição, registrar_fases() e
+registrar_requisicao() só acrescentam a medida a uma lista de pendentes
+(list.append, atômico sob o GIL, sem lock). A contagem por bucket é
+feita em lote, por histograma e rótulos (valores ordenados e um bisect
+por limite), ao exportar ou quando as pendentes chegam a
+PENDENTES_MAXIMO. As contagens são por processo (na Vercel, por
+instância da função).
+"""
+
+import threading
+from bisect import bisect_right
+from operator import sub
+
+# Limites dos buckets (segundos), de 10 µs a 10 s
+LIMITES_SEGUNDOS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Fases do /calculate, na ordem das marcas
+FASES_CALCULO = ('entrada', 'cep', 'tarifas', 'calculo', 'serializacao')
+
+# Medidas pendentes que disparam a agregação na própria requisição
+PENDENTES_MAXIMO = 1024
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(nomes, valores, extra=''):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Histogramas:
+    """
+    Histogramas de buckets fixos de uma métrica, um por combinação de
+    rótulos. Cada um é uma lista: contagem por bucket e, no fim, a soma.
+    As medidas ficam pendentes até agregar().
+    """
+
+    def __init__(self, nome, ajuda, rotulos, limites=LIMITES_SEGUNDOS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.limites = limites
+        self.lock = threading.Lock()
+        self._por_valor = {}
+        self._pendentes = []
+
+    def anotar(self, medida):
+        """Guarda uma medida para a próxima agregação."""
+        self._pendentes.append(medida)
+        if len(self._pendentes) >= PENDENTES_MAXIMO:
+            self.agregar()
+
+    def observar(self, valores_rotulos, valor):
+        self.anotar((valores_rotulos, valor))
+
+    def _valores(self, medidas):
+        """{valores dos rótulos: [valores]} de uma lista de medidas."""
+        valores = {}
+        for valores_rotulos, valor in medidas:
+            lista = valores.get(valores_rotulos)
+            if lista is None:
+                lista = valores[valores_rotulos] = []
+            lista.append(valor)
+        return valores
+
+    def agregar(self):
+        """Conta as medidas pendentes nos buckets."""
+        with self.lock:
+            # Cópia e remoção do prefixo copiado são atômicas: o que for
+            # acrescentado no meio fica para a próxima agregação
+            medidas = self._pendentes[:]
+            del self._pendentes[:len(medidas)]
+            for valores_rotulos, valores in self._valores(medidas).items():
+                linha = self._por_valor.get(valores_rotulos)
+                if linha is None:
+                    linha = self._por_valor[valores_rotulos] = [0] * (len(self.limites) + 1) + [0.0]
+                # Bucket "le" = primeiro limite >= valor: com os valores
+                # ordenados, cada bucket é a diferença entre dois bisects
+                ordenados = sorted(valores)
+                anterior = 0
+                for i, limite in enumerate(self.limites):
+                    ate = bisect_right(ordenados, limite, anterior)
+                    linha[i] += ate - anterior
+                    anterior = ate
+                linha[-2] += len(ordenados) - anterior
+                linha[-1] += sum(valores)
+
+    def exportar(self):
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} histogram']
+        self.agregar()
+        with self.lock:
+            copias = sorted((valores, list(linha)) for valores, linha in self._por_valor.items())
+        for valores_rotulos, linha in copias:
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float('inf'),), linha):
+                acumulado += contagem
+                le = 'le="+Inf"' if limite == float('inf') else f'le="{limite!r}"'
+                linhas.append(f'{self.nome}_bucket{_rotulos(self.rotulos, valores_rotulos, le)} {acumulado}')
+            linhas.append(f'{self.nome}_sum{_rotulos(self.rotulos, valores_rotulos)} {linha[-1]!r}')
+            linhas.append(f'{self.nome}_count{_rotulos(self.rotulos, valores_rotulos)} {acumulado}')
+        return linhas
+
+
+class HistogramasFases(Histogramas):
+    """
+    Histogramas por fase: cada medida são as `marcas` de uma requisição
+    (o instante do início e do fim de cada fase, na ordem de `fases`).
+    """
+
+    def __init__(self, nome, ajuda, fases, limites=LIMITES_SEGUNDOS):
+        super().__init__(nome, ajuda, ('fase',), limites)
+        self.fases = fases
+
+    def _valores(self, medidas):
+        # Requisições com todas as fases: durações por coluna de marcas
+        # (zip e map em C); as interrompidas no meio, uma a uma
+        n = len(self.fases) + 1
+        completas = [marcas for marcas in medidas if len(marcas) == n]
+        colunas = list(zip(*completas)) or [()] * n
+        duracoes = [list(map(sub, colunas[k], colunas[k - 1])) for k in range(1, n)]
+        if len(completas) < len(medidas):
+            for marcas in medidas:
+                if len(marcas) < n:
+                    for k in range(1, len(marcas)):
+                        duracoes[k - 1].append(marcas[k] - marcas[k - 1])
+        return {(fase,): lista for fase, lista in zip(self.fases, duracoes) if lista}
+
+
+class Contadores:
+    """
+    Contador com rótulos (um valor por combinação de rótulos).
+    """
+
+    def __init__(self, nome, ajuda, rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos):
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + 1
+
+    def exportar(self):
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} counter']
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for valores_rotulos, total in valores:
+            linhas.append(f'{self.nome}{_rotulos(self.rotulos, valores_rotulos)} {total}')
+        return linhas
+
+
+FASES = HistogramasFases(
+    'calculadora_fase_segundos', 'Duração de cada fase do /calculate', FASES_CALCULO)
+REQUISICOES = Histogramas(
+    'calculadora_requisicao_segundos', 'Duração das requisições por rota e status HTTP',
+    ('rota', 'status'))
+EXCECOES = Contadores(
+    'calculadora_excecoes_total', 'Exceções inesperadas (respostas 500) por rota e tipo',
+    ('rota', 'tipo'))
+UPSTREAM = Contadores(
+    'calculadora_upstream_chamadas_total', 'Chamadas a serviços externos por resultado',
+    ('host', 'resultado'))
+
+
+def registrar_fases(marcas):
+    """
+    Grava as fases do /calculate a partir das `marcas` (perf_counter no
+    início e no fim de cada fase, na ordem de FASES_CALCULO). Com menos
+    marcas, só as fases concluídas. A lista não deve ser alterada depois.
+    """
+    FASES.anotar(marcas)
+
+
+def registrar_requisicao(rota, status, duracao):
+    """Registra uma requisição concluída."""
+    REQUISICOES.observar((rota, status), duracao)
+
+
+def registrar_excecao(rota, erro):
+    """Registra uma exceção inesperada tratada como erro 500."""
+    EXCECOES.incrementar(rota, type(erro).__name__)
+
+
+def registrar_upstream(host, resultado):
+    """Registra o resultado de uma chamada (ou tentativa) a um serviço externo."""
+    UPSTREAM.incrementar(host, resultado)
+
+
+def exportar(caches=None):
+    """
+    Texto no formato de exposição do Prometheus. `caches` (nome →
+    estatisticas() de um CacheTTL) entra como métricas dos caches.
+    """
+    linhas = []
+    for familia in (FASES, REQUISICOES, EXCECOES, UPSTREAM):
+        linhas.extend(familia.exportar())
+
+    if caches:
+        for campo, tipo in (('acertos', 'counter'), ('falhas', 'counter'), ('despejos', 'counter'),
+                            ('expiracoes', 'counter'), ('coalescidas', 'counter'),
+                            ('tamanho', 'gauge')):
+            nome = f'calculadora_cache_{campo}' + ('_total' if tipo == 'counter' else '')
+            linhas.append(f'# HELP {nome} Cache em memória: {campo}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for cache, estatisticas in sorted(caches.items()):
+                linhas.append(f'{nome}{_rotulos(("cache",), (cache,))} {estatisticas[campo]}')
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,202 @@
+"""
+Importação offline do CSV de tarifas homologadas da ANEEL.
+
+O arquivo baixado do portal de dados abertos (separador `;`, vírgula
+decimal, em geral Latin-1) passa pelo mesmo processamento B1 da
+sincronização com a API (AcumuladorTarifasB1): tarifas vigentes por
+estado e por distribuidora e janelas de vigência para o histórico. O
+resultado é publicado como no sync_aneel_data.py (tarifas.json,
+tarifas.bin e historico.db).
+
+O CSV é lido em fluxo, em blocos de linhas, com memória constante: só
+as colunas usadas pelo acumulador viram dicionário, e só nas linhas que
+podem ser B1 (o filtro eh_b1 é avaliado uma vez por combinação distinta
+de subgrupo, classe e modalidade).
+
+Uso (na pasta backend):
+    python parse_aneel_csv.py tarifas-homologadas-distribuidoras-energia-eletrica.csv
+    python parse_aneel_csv.py dump.csv --colunar --simular
+"""
+
+import argparse
+import codecs
+import csv
+import os
+import time
+from datetime import datetime
+from operator import itemgetter
+
+from historico import registrar_vigencias
+from sync_aneel_data import (
+    DATA_DIR, TAMANHO_LOTE_COLUNAR, AcumuladorTarifasB1, eh_b1, salvar_tarifas, tarifas_mudaram
+)
+
+# Colunas lidas pelo AcumuladorTarifasB1
+COLUNAS = (
+    'SigAgente', 'DatInicioVigencia', 'DatFimVigencia', 'DscSubGrupo',
+    'DscModalidadeTarifaria', 'DscClasse', 'VlrTUSD', 'VlrTE'
+)
+COLUNAS_B1 = ('DscSubGrupo', 'DscClasse', 'DscModalidadeTarifaria')
+
+TAMANHO_BUFFER = 1 << 20
+
+
+class ErroCSV(Exception):
+    """CSV sem as colunas do dataset de tarifas homologadas."""
+
+
+def detectar_codificacao(caminho, amostra=TAMANHO_BUFFER):
+    """
+    'utf-8-sig' (com BOM), 'utf-8' se o início do arquivo é UTF-8 válido,
+    senão 'latin-1' (o formato dos arquivos do portal da ANEEL).
+    """
+    with open(caminho, 'rb') as f:
+        inicio = f.read(amostra)
+    if inicio.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # final=False: um caractere cortado no fim da amostra não é erro
+        codecs.getincrementaldecoder('utf-8')().decode(inicio, final=False)
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+
+class LeitorCSVTarifas:
+    """
+    Lê o CSV em blocos de registros (dicts com as COLUNAS) das linhas que
+    passam no filtro B1. `linhas`, `candidatas` e `invalidas` contam as
+    linhas lidas, as entregues e as com colunas faltando.
+    """
+
+    def __init__(self, arquivo, tamanho_bloco=TAMANHO_LOTE_COLUNAR):
+        self.tamanho_bloco = tamanho_bloco
+        self.linhas = 0
+        self.candidatas = 0
+        self.invalidas = 0
+
+        cabecalho = arquivo.readline()
+        separador = ';' if cabecalho.count(';') >= cabecalho.count(',') else ','
+        nomes = [nome.strip().strip('"') for nome in next(csv.reader([cabecalho], delimiter=separador))]
+        faltando = [coluna for coluna in COLUNAS if coluna not in nomes]
+        if faltando:
+            raise ErroCSV(f'Colunas ausentes no CSV: {", ".join(faltando)}')
+
+        self._leitor = csv.reader(arquivo, delimiter=separador)
+        self._colunas = itemgetter(*(nomes.index(coluna) for coluna in COLUNAS))
+        self._colunas_b1 = itemgetter(*(nomes.index(coluna) for coluna in COLUNAS_B1))
+
+    def __iter__(self):
+        filtro = {}
+        colunas, colunas_b1 = self._colunas, self._colunas_b1
+        bloco = []
+        linhas = self.linhas
+        for linhas, linha in enumerate(self._leitor, linhas + 1):
+            try:
+                chave = colunas_b1(linha)
+                b1 = filtro.get(chave)
+                if b1 is None:
+                    b1 = filtro[chave] = eh_b1(*chave)
+                if not b1:
+                    continue
+                bloco.append(dict(zip(COLUNAS, colunas(linha))))
+            except IndexError:
+                # Linha com colunas faltando (ou em branco)
+                if any(linha):
+                    self.invalidas += 1
+                continue
+
+            if len(bloco) >= self.tamanho_bloco:
+                self.linhas = linhas
+                self.candidatas += len(bloco)
+                yield bloco
+                bloco = []
+        self.linhas = linhas
+        if bloco:
+            self.candidatas += len(bloco)
+            yield bloco
+
+
+def importar_csv(caminho, data_atual=None, colunar=False, historico=True, encoding=None,
+                 tamanho_bloco=TAMANHO_LOTE_COLUNAR):
+    """
+    Processa o CSV com o AcumuladorTarifasB1.
+
+    Retorna (acumulador, leitor); o leitor tem as contagens de linhas.
+    Com `colunar=True`, cada bloco é reduzido de uma vez com numpy.
+    """
+    acumulador = AcumuladorTarifasB1(data_atual, debug=False, historico=historico)
+    with open(caminho, 'r', encoding=encoding or detectar_codificacao(caminho), newline='',
+              buffering=TAMANHO_BUFFER) as arquivo:
+        leitor = LeitorCSVTarifas(arquivo, tamanho_bloco)
+        for bloco in leitor:
+            if colunar:
+                acumulador.adicionar_lote(bloco)
+            else:
+                for record in bloco:
+                    acumulador.adicionar(record)
+    return acumulador, leitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa o CSV de tarifas homologadas da ANEEL')
+    parser.add_argument('arquivo', help='CSV baixado do portal de dados abertos da ANEEL')
+    parser.add_argument('--colunar', action='store_true',
+                        help='processa cada bloco em modo colunar (requer numpy)')
+    parser.add_argument('--encoding', help='codificação do arquivo (padrão: detectada)')
+    parser.add_argument('--data-referencia', metavar='AAAA-MM-DD',
+                        help='data em que as tarifas devem estar vigentes (padrão: hoje)')
+    parser.add_argument('--sem-historico', action='store_true',
+                        help='não grava as janelas de vigência em historico.db')
+    parser.add_argument('--simular', action='store_true',
+                        help='processa e mostra o resultado sem gravar nada')
+    args = parser.parse_args()
+
+    data_atual = None
+    if args.data_referencia:
+        try:
+            data_atual = datetime.strptime(args.data_referencia, '%Y-%m-%d')
+        except ValueError:
+            parser.error('--data-referencia deve estar no formato AAAA-MM-DD')
+
+    print(f"\n📂 Lendo {args.arquivo} ({os.path.getsize(args.arquivo) / 1e6:.1f} MB)...")
+    inicio = time.perf_counter()
+    try:
+        acumulador, leitor = importar_csv(args.arquivo, data_atual, args.colunar,
+                                          historico=not args.sem_historico, encoding=args.encoding)
+    except (ErroCSV, OSError, UnicodeDecodeError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    decorrido = time.perf_counter() - inicio
+
+    print(f"✅ {leitor.linhas} linhas em {decorrido:.2f} s ({leitor.linhas / decorrido:,.0f} linhas/s); "
+          f"{leitor.candidatas} candidatas a B1, {leitor.invalidas} inválidas")
+    print(f"✅ Processados {len(acumulador.tarifas_por_estado)} estados "
+          f"({len(acumulador.tarifas_por_distribuidora)} distribuidoras)")
+    acumulador.relatorio_nao_identificados()
+
+    tarifas = acumulador.resultado()
+    distribuidoras = acumulador.resultado_distribuidoras()
+    if not tarifas:
+        print("\n❌ Nenhuma tarifa B1 vigente encontrada no arquivo")
+        raise SystemExit(1)
+
+    if args.simular:
+        for tarifa in sorted(tarifas, key=lambda x: x['estado']):
+            print(f"   {tarifa['estado']:<4} {tarifa['distribuidora']:<30} {tarifa['tarifa']:.5f}")
+        print("\n🔎 Simulação: nada foi gravado")
+        return
+
+    if acumulador.janelas is not None:
+        novas = registrar_vigencias(acumulador.janelas.values(),
+                                    os.path.join(DATA_DIR, 'historico.db'))
+        print(f"🗂️ Histórico: {novas} janelas de vigência novas ({len(acumulador.janelas)} no arquivo)")
+
+    if not tarifas_mudaram(tarifas, distribuidoras):
+        print("\n✅ Tarifas B1 inalteradas; tarifas.json mantido")
+    elif salvar_tarifas(tarifas, distribuidoras):
+        print("\n✅ Tarifas importadas do CSV da ANEEL")
+
+
+if __name__ == "__main__":
+    main()
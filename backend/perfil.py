@@ -0,0 +1,205 @@
+"""
+Perfil de execução por etapa dos scripts de sincronização.
+
+Cada etapa (`with perfil.etapa('tarifas'):`) registra tempo de relógio,
+tempo de CPU do processo, pico de memória alocada (tracemalloc) e o
+número de registros processados (`perfil.contar(n)`), de onde sai a
+vazão em registros por segundo. Dentro de uma etapa, `perfil.trecho()`
+e `perfil.iterar()` somam o tempo de partes repetidas (processar cada
+página, esperar o download da próxima), sem medir memória.
+
+O relatório é um dict pronto para JSON. Com o perfil desativado
+(SEM_PERFIL), etapas e trechos não medem nada.
+
+tracemalloc deixa as alocações mais lentas: os tempos medidos com o
+perfil ligado são maiores que os de uma execução normal e servem para
+comparar execuções com perfil entre si.
+"""
+
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+_MB = 1024 * 1024
+
+
+class Etapa:
+    """Medidas de uma etapa (e dos trechos somados dentro dela)."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.registros = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.memoria_inicio = 0
+        self.memoria_pico = 0
+        self.trechos = {}
+
+    def somar_trecho(self, nome, wall, cpu, registros):
+        trecho = self.trechos.setdefault(nome, [0.0, 0.0, 0, 0])
+        trecho[0] += wall
+        trecho[1] += cpu
+        trecho[2] += registros
+        trecho[3] += 1
+
+    def relatorio(self):
+        dados = {
+            'nome': self.nome,
+            'wall_s': round(self.wall, 6),
+            'cpu_s': round(self.cpu, 6),
+            'memoria_pico_mb': round(max(0, self.memoria_pico - self.memoria_inicio) / _MB, 3),
+            'registros': self.registros,
+            'registros_por_s': round(self.registros / self.wall, 1) if self.wall and self.registros else None,
+        }
+        if self.trechos:
+            dados['trechos'] = {
+                nome: {
+                    'wall_s': round(wall, 6),
+                    'cpu_s': round(cpu, 6),
+                    'chamadas': chamadas,
+                    'registros': registros,
+                    'registros_por_s': round(registros / wall, 1) if wall and registros else None,
+                }
+                for nome, (wall, cpu, registros, chamadas) in self.trechos.items()
+            }
+        return dados
+
+
+class PerfilExecucao:
+    """
+    Coleta as etapas de uma execução. Etapas podem ser aninhadas: o pico
+    de memória de uma etapa interna também conta para as externas.
+    """
+
+    def __init__(self, parametros=None):
+        self.parametros = parametros or {}
+        self.etapas = []
+        self._pilha = []
+        self._inicio = None
+        self._inicio_cpu = None
+        self._pico_total = 0
+        self._iniciou_tracemalloc = False
+
+    def iniciar(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._inicio = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        self._inicio_data = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+
+    def parar(self):
+        self._pico_total = max(self._pico_total, tracemalloc.get_traced_memory()[1])
+        self._wall_total = time.perf_counter() - self._inicio
+        self._cpu_total = time.process_time() - self._inicio_cpu
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+
+    def _propagar_pico(self):
+        # Pico desde o último reset vale para todas as etapas abertas
+        pico = tracemalloc.get_traced_memory()[1]
+        for aberta in self._pilha:
+            aberta.memoria_pico = max(aberta.memoria_pico, pico)
+        self._pico_total = max(self._pico_total, pico)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def etapa(self, nome):
+        self._propagar_pico()
+        etapa = Etapa(nome)
+        etapa.memoria_inicio = etapa.memoria_pico = tracemalloc.get_traced_memory()[0]
+        self.etapas.append(etapa)
+        self._pilha.append(etapa)
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        try:
+            yield etapa
+        finally:
+            etapa.wall = time.perf_counter() - inicio
+            etapa.cpu = time.process_time() - inicio_cpu
+            self._propagar_pico()
+            self._pilha.pop()
+
+    def contar(self, registros):
+        """Soma registros processados na etapa atual."""
+        if self._pilha:
+            self._pilha[-1].registros += registros
+
+    @contextmanager
+    def trecho(self, nome, registros=0):
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            if self._pilha:
+                self._pilha[-1].somar_trecho(nome, time.perf_counter() - inicio,
+                                             time.process_time() - inicio_cpu, registros)
+
+    def iterar(self, nome, iteravel):
+        """Repassa `iteravel`, somando o tempo de cada next() no trecho `nome`."""
+        iterador = iter(iteravel)
+        while True:
+            inicio = time.perf_counter()
+            inicio_cpu = time.process_time()
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                if self._pilha:
+                    self._pilha[-1].somar_trecho(nome, time.perf_counter() - inicio,
+                                                 time.process_time() - inicio_cpu, 0)
+            yield item
+
+    def relatorio(self):
+        return {
+            'inicio': self._inicio_data,
+            'python': platform.python_version(),
+            'parametros': self.parametros,
+            'total': {
+                'wall_s': round(self._wall_total, 6),
+                'cpu_s': round(self._cpu_total, 6),
+                'memoria_pico_mb': round(self._pico_total / _MB, 3),
+            },
+            'etapas': [etapa.relatorio() for etapa in self.etapas],
+        }
+
+    def imprimir(self):
+        print(f"\n⏱️ Perfil da sincronização")
+        print("-" * 78)
+        print(f"{'Etapa':<28} {'Relógio (s)':>11} {'CPU (s)':>9} {'Pico (MB)':>10} {'Registros/s':>14}")
+        print("-" * 78)
+        for etapa in self.etapas:
+            dados = etapa.relatorio()
+            vazao = f"{dados['registros_por_s']:,.0f}" if dados['registros_por_s'] else '-'
+            print(f"{etapa.nome:<28} {dados['wall_s']:11.3f} {dados['cpu_s']:9.3f} "
+                  f"{dados['memoria_pico_mb']:10.2f} {vazao:>14}")
+            for nome, trecho in dados.get('trechos', {}).items():
+                vazao = f"{trecho['registros_por_s']:,.0f}" if trecho['registros_por_s'] else '-'
+                print(f"  {nome:<26} {trecho['wall_s']:11.3f} {trecho['cpu_s']:9.3f} "
+                      f"{'':>10} {vazao:>14}")
+        print("-" * 78)
+        print(f"{'Total':<28} {self._wall_total:11.3f} {self._cpu_total:9.3f} "
+              f"{self._pico_total / _MB:10.2f}")
+
+
+class _SemPerfil:
+    """Perfil desativado: mesma interface, sem medições."""
+
+    def etapa(self, nome):
+        return nullcontext()
+
+    def contar(self, registros):
+        pass
+
+    def trecho(self, nome, registros=0):
+        return nullcontext()
+
+    def iterar(self, nome, iteravel):
+        return iteravel
+
+
+SEM_PERFIL = _SemPerfil()
@@ -0,0 +1,182 @@
+"""
+Projeção da conta mês a mês (POST /api/projection).
+
+O CEP é resolvido uma única vez; a tarifa de cada mês (histórico de
+vigências da distribuidora, com a tarifa atual quando não há histórico)
+e a bandeira de cada mês (calendário de bandeiras) são obtidas em
+arrays, e energia, bandeira e total de todos os meses saem de operações
+numpy sobre esses arrays, sem laço Python por mês. numpy (no
+requirements.txt da raiz, usado pela Vercel) é importado só na primeira
+projeção, fora do cold start da API.
+
+O consumo vem como um vetor (`consumos`, um valor por mês) ou como um
+perfil (`consumo_mensal` + `meses`, com `sazonalidade` opcional: 12
+fatores, de janeiro a dezembro).
+
+Quando a UF está na tabela de tributos, cada mês traz também o total com
+ICMS e PIS/COFINS (faixa de ICMS pelo consumo do mês).
+"""
+
+import math
+from datetime import date
+
+from bandeiras import indice_mes, nome_mes
+from calculo import ErroCalculo
+from impostos import carregar_tabela_impostos
+
+# Maior horizonte aceito (50 anos)
+MESES_MAXIMOS = 600
+
+
+def _numero(valor, campo):
+    # True/False viram 1/0 em float(); no JSON, não são números
+    if isinstance(valor, bool):
+        raise ErroCalculo(f'{campo} deve ser numérico', 400)
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ErroCalculo(f'{campo} deve ser numérico', 400)
+    if not math.isfinite(numero) or numero < 0:
+        raise ErroCalculo(f'{campo} deve ser um número não negativo', 400)
+    return numero
+
+
+def _inteiro(valor, campo):
+    # int() aceitaria True (1) e truncaria 1.5
+    if isinstance(valor, bool):
+        raise ErroCalculo(f'{campo} deve ser inteiro', 400)
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ErroCalculo(f'{campo} deve ser inteiro', 400)
+    if not numero.is_integer():
+        raise ErroCalculo(f'{campo} deve ser inteiro', 400)
+    return int(numero)
+
+
+def ler_projecao(data):
+    """
+    Valida o corpo da requisição. Retorna (cep, número do mês inicial,
+    consumos por mês como array numpy).
+    """
+    import numpy as np
+
+    if not isinstance(data, dict):
+        raise ErroCalculo('Corpo da requisição deve ser um objeto JSON', 400)
+
+    cep = str(data.get('cep') or '').replace('-', '').strip()
+    if not cep:
+        raise ErroCalculo('CEP é obrigatório', 400)
+
+    inicio = data.get('inicio')
+    if inicio in (None, ''):
+        mes_inicial = indice_mes(date.today())
+    else:
+        try:
+            mes_inicial = indice_mes(date.fromisoformat(str(inicio).strip()[:7] + '-01'))
+        except ValueError:
+            raise ErroCalculo('inicio inválido (use AAAA-MM)', 400)
+
+    if data.get('consumos') is not None:
+        consumos = data['consumos']
+        if not isinstance(consumos, list) or not consumos:
+            raise ErroCalculo('consumos deve ser uma lista com o consumo de cada mês', 400)
+        if len(consumos) > MESES_MAXIMOS:
+            raise ErroCalculo(f'Projeção excede o limite de {MESES_MAXIMOS} meses', 413)
+        consumos = np.array([_numero(c, 'consumos') for c in consumos], dtype=float)
+    else:
+        consumo = _numero(data.get('consumo_mensal', 0), 'consumo_mensal')
+        meses = _inteiro(data.get('meses', 12), 'meses')
+        if consumo <= 0 or meses <= 0:
+            raise ErroCalculo('Informe consumos ou consumo_mensal e meses', 400)
+        if meses > MESES_MAXIMOS:
+            raise ErroCalculo(f'Projeção excede o limite de {MESES_MAXIMOS} meses', 413)
+
+        consumos = np.full(meses, consumo)
+        sazonalidade = data.get('sazonalidade')
+        if sazonalidade is not None:
+            if not isinstance(sazonalidade, list) or len(sazonalidade) != 12:
+                raise ErroCalculo('sazonalidade deve ter 12 fatores (janeiro a dezembro)', 400)
+            fatores = np.array([_numero(f, 'sazonalidade') for f in sazonalidade])
+            consumos *= fatores[(mes_inicial + np.arange(meses)) % 12]
+
+    return cep, mes_inicial, consumos
+
+
+def _primeiros_dias(indices):
+    # Ordinal (date.toordinal) do dia 1º de cada mês
+    import numpy as np
+
+    dias_desde_1970 = (indices - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]')
+    return dias_desde_1970.astype(np.int64) + date(1970, 1, 1).toordinal()
+
+
+def _tarifas_mensais(snapshot, estado, distribuidora, indices):
+    # Tarifa de cada mês (no dia 1º): histórico da distribuidora do CEP,
+    # senão o da referência do estado, senão a tarifa atual. Retorna
+    # (distribuidora, tarifas, se vieram do histórico)
+    import numpy as np
+
+    from historico import obter_historico
+
+    tarifa_atual = snapshot.indice.tarifa_para(estado, distribuidora)
+    if not tarifa_atual:
+        raise ErroCalculo('Estado não encontrado na base de dados', 404)
+
+    historico = obter_historico()
+    for nome in (distribuidora, tarifa_atual['distribuidora']):
+        if nome and historico.possui(nome):
+            tarifas = historico.tarifas_em(nome, _primeiros_dias(indices))
+            sem_tarifa = np.flatnonzero(np.isnan(tarifas))
+            if sem_tarifa.size:
+                mes = nome_mes(int(indices[sem_tarifa[0]]))
+                raise ErroCalculo(f'Sem tarifa homologada para {mes}', 404)
+            return nome, tarifas, True
+
+    return tarifa_atual['distribuidora'], np.full(len(indices), tarifa_atual['tarifa']), False
+
+
+def projetar(snapshot, estado, distribuidora, mes_inicial, consumos):
+    """
+    Projeta a conta de cada mês a partir de `mes_inicial` (número do
+    mês). Retorna o dicionário da resposta do /projection, com as séries
+    mensais em listas paralelas.
+    """
+    import numpy as np
+
+    indices = mes_inicial + np.arange(len(consumos))
+    distribuidora, tarifas, historica = _tarifas_mensais(snapshot, estado, distribuidora, indices)
+    valores_bandeira, codigos_bandeira, nomes_bandeira = snapshot.calendario.dos_meses(indices)
+
+    valor_energia = consumos * tarifas
+    valor_bandeira = consumos * valores_bandeira
+    valor_total = valor_energia + valor_bandeira
+
+    projecao = {
+        'estado': estado,
+        'distribuidora': distribuidora,
+        'inicio': nome_mes(mes_inicial),
+        'meses': len(consumos),
+        'tarifa_historica': historica,
+        'mensal': {
+            'mes': [nome_mes(indice) for indice in range(mes_inicial, mes_inicial + len(consumos))],
+            'consumo': consumos.tolist(),
+            'tarifa': tarifas.tolist(),
+            'bandeira': np.array(nomes_bandeira, dtype=object)[codigos_bandeira].tolist(),
+            'valor_bandeira': valor_bandeira.tolist(),
+            'valor_total': valor_total.tolist()
+        },
+        'total': {
+            'consumo': float(consumos.sum()),
+            'valor_energia': float(valor_energia.sum()),
+            'valor_bandeira': float(valor_bandeira.sum()),
+            'valor_total': float(valor_total.sum())
+        },
+        'ultima_atualizacao_dados': snapshot.indice.ultima_atualizacao
+    }
+    fatores = carregar_tabela_impostos().fatores(estado, consumos)
+    if fatores is not None:
+        valor_com_impostos = valor_total * fatores
+        projecao['mensal']['valor_total_com_impostos'] = valor_com_impostos.tolist()
+        projecao['total']['valor_total_com_impostos'] = float(valor_com_impostos.sum())
+    return projecao
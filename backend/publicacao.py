@@ -0,0 +1,265 @@
+"""
+Publicação dos arquivos de dados (tarifas.json e bandeira.json).
+
+A API relê os arquivos quando o mtime/tamanho muda (ver tarifa_store),
+então uma escrita direta no arquivo vigente pode ser lida pela metade.
+Aqui cada arquivo é gravado num temporário no mesmo diretório, com
+fsync, e trocado com os.replace(): o leitor vê o arquivo anterior ou o
+novo, nunca um intermediário, e o conteúdo já está em disco quando o
+nome passa a apontar para ele.
+
+PublicacaoDados acumula as alterações em memória (bandeira, tarifas,
+importações em lote) e grava tudo de uma vez em publicar(): cada arquivo
+alterado é reescrito uma única vez, com `versao_publicacao` incrementada,
+e o tarifas.bin é regenerado uma vez no final.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from snapshot_binario import gerar_snapshot_binario
+
+# Diretório de dados
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+ARQUIVOS = ('tarifas.json', 'bandeira.json')
+
+# Valores de referência das bandeiras (R$/kWh)
+BANDEIRAS_DISPONIVEIS = {
+    "verde": {
+        "nome": "Verde",
+        "valor_kwh": 0.0,
+        "descricao": "Condições favoráveis de geração"
+    },
+    "amarela": {
+        "nome": "Amarela",
+        "valor_kwh": 0.01885,
+        "descricao": "Condições de geração menos favoráveis"
+    },
+    "vermelha_1": {
+        "nome": "Vermelha Patamar 1",
+        "valor_kwh": 0.04463,
+        "descricao": "Condições mais custosas de geração"
+    },
+    "vermelha_2": {
+        "nome": "Vermelha Patamar 2",
+        "valor_kwh": 0.07877,
+        "descricao": "Condições ainda mais custosas de geração"
+    }
+}
+
+
+class ErroPublicacao(Exception):
+    """Alteração inválida (estado, tarifa, bandeira ou mês)."""
+
+
+def gravar_json_atomico(caminho, dados, **opcoes_json):
+    """
+    Grava `dados` em `caminho` como JSON, com gravar_arquivo_atomico().
+    """
+    gravar_arquivo_atomico(caminho, json.dumps(dados, **opcoes_json).encode('utf-8'))
+
+
+def gravar_arquivo_atomico(caminho, conteudo):
+    """
+    Grava os bytes de `conteudo` em `caminho`: temporário no mesmo
+    diretório, fsync e os.replace(). Em caso de erro, o arquivo anterior
+    fica intacto.
+    """
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    try:
+        with open(temporario, 'wb') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+    # A troca de nome também precisa chegar ao disco
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _numero(valor, campo):
+    try:
+        numero = float(str(valor).strip().replace(',', '.'))
+    except (TypeError, ValueError):
+        raise ErroPublicacao(f'Valor inválido para {campo}: {valor!r}')
+    if numero != numero or numero < 0:
+        raise ErroPublicacao(f'Valor inválido para {campo}: {valor!r}')
+    return numero
+
+
+class PublicacaoDados:
+    """
+    Alterações pendentes sobre os arquivos de dados, gravadas juntas em
+    publicar().
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._documentos = {}
+        self._alterados = set()
+
+    def _caminho(self, nome):
+        return os.path.join(self.data_dir, nome)
+
+    def documento(self, nome):
+        """Conteúdo atual (com as alterações pendentes) de um dos ARQUIVOS."""
+        if nome not in self._documentos:
+            try:
+                with open(self._caminho(nome), 'r', encoding='utf-8') as f:
+                    self._documentos[nome] = json.load(f)
+            except FileNotFoundError:
+                self._documentos[nome] = {}
+        return self._documentos[nome]
+
+    def substituir(self, nome, dados):
+        """Troca o conteúdo inteiro de um arquivo."""
+        self._documentos[nome] = dados
+        self._alterados.add(nome)
+
+    @property
+    def pendente(self):
+        return bool(self._alterados)
+
+    def versao_publicada(self):
+        """Maior `versao_publicacao` entre os arquivos já gravados."""
+        versoes = []
+        for nome in ARQUIVOS:
+            try:
+                with open(self._caminho(nome), 'r', encoding='utf-8') as f:
+                    versoes.append(json.load(f).get('versao_publicacao', 0))
+            except (OSError, ValueError):
+                continue
+        return max(versoes, default=0)
+
+    def definir_bandeira(self, nome, valor, mes=None):
+        """
+        Grava a bandeira `nome` (R$ `valor`/kWh) no calendário, no mês
+        `mes` ("AAAA-MM", padrão: mês corrente). A bandeira atual passa a
+        ser a do último mês do calendário até o mês corrente; os demais
+        meses são preservados.
+        """
+        if not nome:
+            raise ErroPublicacao('Nome da bandeira é obrigatório')
+        valor = _numero(valor, 'a bandeira')
+
+        agora = datetime.now()
+        mes = mes or agora.strftime('%Y-%m')
+        try:
+            datetime.strptime(mes, '%Y-%m')
+        except ValueError:
+            raise ErroPublicacao(f'Mês inválido: {mes!r} (use AAAA-MM)')
+
+        data = self.documento('bandeira.json')
+        calendario = [entrada for entrada in data.get('calendario', []) if entrada['mes'] != mes]
+        calendario.append({'mes': mes, 'bandeira': nome, 'valor_kwh': valor})
+        calendario.sort(key=lambda entrada: entrada['mes'])
+        data['calendario'] = calendario
+
+        ate_hoje = [entrada for entrada in calendario if entrada['mes'] <= agora.strftime('%Y-%m')]
+        if ate_hoje:
+            atual = ate_hoje[-1]
+            data['mes_referencia'] = datetime.strptime(atual['mes'], '%Y-%m').strftime("%B de %Y")
+            data['bandeira_atual'] = atual['bandeira']
+            data['valor_kwh'] = atual['valor_kwh']
+            data['descricao'] = "Condições de geração atualizadas"
+        data.setdefault('bandeiras_disponiveis', BANDEIRAS_DISPONIVEIS)
+
+        self._alterados.add('bandeira.json')
+
+    def definir_tarifa(self, estado, tarifa, distribuidora=None, tusd=None, te=None):
+        """
+        Define a tarifa (R$/kWh) de referência da UF ou, com
+        `distribuidora`, a de uma distribuidora da UF. Entradas da mesma
+        distribuidora nas duas listas de tarifas.json recebem o mesmo valor.
+        """
+        estado = str(estado or '').strip().upper()
+        if len(estado) != 2 or not estado.isalpha():
+            raise ErroPublicacao(f'Estado inválido: {estado!r}')
+        tarifa = _numero(tarifa, 'a tarifa')
+        if tarifa == 0:
+            raise ErroPublicacao('Tarifa deve ser maior que zero')
+        componentes = {campo: _numero(valor, campo.upper())
+                       for campo, valor in (('tusd', tusd), ('te', te)) if valor is not None}
+
+        data = self.documento('tarifas.json')
+        referencias = data.setdefault('tarifas', [])
+        referencia = next((t for t in referencias if t['estado'] == estado), None)
+        if distribuidora is None:
+            if referencia is None:
+                raise ErroPublicacao(f'{estado} não tem tarifa; informe a distribuidora')
+            distribuidora = referencia['distribuidora']
+
+        alvos = [t for t in referencias + data.get('distribuidoras', [])
+                 if t['estado'] == estado and t['distribuidora'].upper() == distribuidora.upper()]
+        if not alvos:
+            nova = {'estado': estado, 'distribuidora': distribuidora, 'tarifa': tarifa}
+            if referencia is None:
+                referencias.append(nova)
+            else:
+                data.setdefault('distribuidoras', []).append(nova)
+            alvos = [nova]
+
+        for alvo in alvos:
+            alvo['tarifa'] = tarifa
+            alvo.update(componentes)
+
+        data['ultima_atualizacao'] = datetime.now().strftime("%B de %Y")
+        self._alterados.add('tarifas.json')
+
+    def aplicar(self, operacoes):
+        """
+        Aplica uma lista de operações ({"tipo": "bandeira", "nome",
+        "valor", "mes"?} ou {"tipo": "tarifa", "estado", "tarifa",
+        "distribuidora"?, "tusd"?, "te"?}). Nada é gravado até publicar().
+        """
+        if not isinstance(operacoes, list):
+            raise ErroPublicacao('Envie uma lista de operações')
+        for i, operacao in enumerate(operacoes):
+            if not isinstance(operacao, dict):
+                raise ErroPublicacao(f'Operação {i}: esperado um objeto')
+            tipo = operacao.get('tipo')
+            try:
+                if tipo == 'bandeira':
+                    self.definir_bandeira(operacao.get('nome'), operacao.get('valor'),
+                                          operacao.get('mes'))
+                elif tipo == 'tarifa':
+                    self.definir_tarifa(operacao.get('estado'), operacao.get('tarifa'),
+                                        operacao.get('distribuidora'), operacao.get('tusd'),
+                                        operacao.get('te'))
+                else:
+                    raise ErroPublicacao(f'tipo desconhecido: {tipo!r}')
+            except ErroPublicacao as e:
+                raise ErroPublicacao(f'Operação {i}: {e}')
+
+    def publicar(self):
+        """
+        Grava os arquivos alterados (cada um uma única vez) e regenera o
+        tarifas.bin. Retorna a nova versão de publicação, ou None se não
+        havia alterações.
+        """
+        if not self._alterados:
+            return None
+
+        versao = self.versao_publicada() + 1
+        for nome in ARQUIVOS:
+            if nome in self._alterados:
+                dados = self._documentos[nome]
+                dados['versao_publicacao'] = versao
+                gravar_json_atomico(self._caminho(nome), dados, ensure_ascii=False, indent=2)
+        self._alterados.clear()
+
+        gerar_snapshot_binario(self.data_dir)
+        return versao
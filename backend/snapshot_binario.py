@@ -0,0 +1,250 @@
+"""
+Snapshot binário das tarifas (data/tarifas.bin).
+
+Gerado pelos scripts de atualização ao lado de tarifas.json e
+bandeira.json, é um cache binário que evita o json.loads da tabela de
+tarifas na partida a frio da API. Não é uma leitura sob demanda: o
+índice de tarifas precisa de todos os registros, então a carga decodifica
+o arquivo inteiro de uma vez (struct.iter_unpack sobre o mapeamento em
+memória, registros de tamanho fixo, cada nome de distribuidora
+decodificado uma vez) e fecha o mapeamento. O ganho está em trocar o
+parser de JSON por esse desempacotamento.
+
+Formato (little-endian):
+
+    cabeçalho   4s magic "CETF", H versão do formato, H tamanho do
+                registro, I número de registros, 16s versão dos dados,
+                4q mtime_ns e tamanho de tarifas.json e de bandeira.json
+                no momento da geração, I offset e I tamanho dos
+                metadados, I offset e I tamanho da tabela de strings
+    registros   2s estado, H tamanho e I offset (na tabela de strings)
+                da distribuidora, d tarifa, d tusd, d te (NaN quando o
+                campo não existe no JSON); primeiro os da lista
+                "tarifas", depois os da lista "distribuidoras"
+    metadados   JSON (UTF-8) com o tamanho de cada lista, os demais
+                campos de tarifas.json e o conteúdo de bandeira.json
+                (poucos bytes, não cresce com o número de registros)
+    strings     nomes das distribuidoras em UTF-8, concatenados
+
+O snapshot vale para os JSON atuais se o mtime/tamanho deles ainda for
+o registrado no cabeçalho (sem ler os JSON) ou, quando o mtime mudou sem
+o conteúdo mudar (cópia no deploy, checkout), se a versão dos dados (hash
+dos bytes dos JSON, a mesma do TarifaStore) bater. Caso contrário está
+desatualizado e é ignorado.
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+
+# Diretório de dados
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+ARQUIVO_BINARIO = 'tarifas.bin'
+ARQUIVOS_ORIGEM = ('tarifas.json', 'bandeira.json')
+
+MAGIC = b'CETF'
+VERSAO_FORMATO = 3
+
+# Listas de tarifas.json gravadas como registros binários, nesta ordem
+LISTAS = ('tarifas', 'distribuidoras')
+
+CABECALHO = struct.Struct('<4sHHI16sqqqqIIII')
+REGISTRO = struct.Struct('<2sHIddd')
+
+# Componentes opcionais de cada tarifa (NaN no registro quando ausentes)
+COMPONENTES = ('tusd', 'te')
+
+
+class SnapshotInvalido(Exception):
+    """Arquivo binário ausente, corrompido ou de outro formato."""
+
+
+def versao_dados(conteudos):
+    """
+    Versão dos dados: hash dos bytes de tarifas.json e bandeira.json.
+    """
+    return hashlib.sha1(b'\0'.join(conteudos)).hexdigest()[:16]
+
+
+def assinatura_origem(data_dir=DATA_DIR):
+    """
+    ((mtime_ns, tamanho), ...) de tarifas.json e bandeira.json.
+    """
+    assinatura = []
+    for nome in ARQUIVOS_ORIGEM:
+        st = os.stat(os.path.join(data_dir, nome))
+        assinatura.append((st.st_mtime_ns, st.st_size))
+    return tuple(assinatura)
+
+
+def serializar(tarifas_data, bandeira, versao, assinatura=((0, 0), (0, 0))):
+    """
+    Monta o conteúdo binário a partir dos dicionários já carregados.
+    """
+    strings = bytearray()
+    posicoes = {}
+    registros = []
+    listas = [(lista, len(tarifas_data[lista])) for lista in LISTAS if lista in tarifas_data]
+    for lista, _ in listas:
+        for tarifa in tarifas_data[lista]:
+            nome = tarifa['distribuidora'].encode('utf-8')
+            if nome not in posicoes:
+                posicoes[nome] = len(strings)
+                strings += nome
+            registros.append(REGISTRO.pack(
+                tarifa['estado'].encode('ascii'), len(nome), posicoes[nome],
+                tarifa['tarifa'], *(tarifa.get(campo, math.nan) for campo in COMPONENTES)
+            ))
+
+    metadados = json.dumps({
+        'listas': listas,
+        'tarifas': {k: v for k, v in tarifas_data.items() if k not in LISTAS},
+        'bandeira': bandeira
+    }, ensure_ascii=False).encode('utf-8')
+
+    offset_metadados = CABECALHO.size + REGISTRO.size * len(registros)
+    offset_strings = offset_metadados + len(metadados)
+    cabecalho = CABECALHO.pack(
+        MAGIC, VERSAO_FORMATO, REGISTRO.size, len(registros), versao.encode('ascii'),
+        *assinatura[0], *assinatura[1], offset_metadados, len(metadados), offset_strings, len(strings)
+    )
+    return cabecalho + b''.join(registros) + metadados + bytes(strings)
+
+
+def gerar_snapshot_binario(data_dir=DATA_DIR):
+    """
+    Gera data/tarifas.bin a partir dos JSON atuais.
+
+    A escrita é a mesma dos JSON (publicacao.gravar_arquivo_atomico):
+    um leitor nunca encontra o arquivo pela metade.
+    """
+    # Importado aqui: publicacao importa este módulo
+    from publicacao import gravar_arquivo_atomico
+
+    assinatura = assinatura_origem(data_dir)
+    conteudos = []
+    for nome in ARQUIVOS_ORIGEM:
+        with open(os.path.join(data_dir, nome), 'rb') as f:
+            conteudos.append(f.read())
+
+    dados = serializar(json.loads(conteudos[0]), json.loads(conteudos[1]),
+                       versao_dados(conteudos), assinatura)
+
+    caminho = os.path.join(data_dir, ARQUIVO_BINARIO)
+    gravar_arquivo_atomico(caminho, dados)
+    return caminho
+
+
+def _tarifa(estado, distribuidora, tarifa, tusd, te):
+    # Dicionário igual ao de tarifas.json (sem os componentes ausentes)
+    dados = {'estado': estado.decode('ascii'), 'distribuidora': distribuidora, 'tarifa': tarifa}
+    for campo, valor in zip(COMPONENTES, (tusd, te)):
+        if valor == valor:
+            dados[campo] = valor
+    return dados
+
+
+class SnapshotBinario:
+    """
+    Leitura de tarifas.bin mapeado em memória (aberto só durante a carga).
+    """
+
+    def __init__(self, caminho):
+        with open(caminho, 'rb') as f:
+            try:
+                self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                # Arquivo vazio
+                raise SnapshotInvalido(str(e))
+
+        try:
+            (magic, formato, tamanho_registro, self.total, versao,
+             mtime_tarifas, tamanho_tarifas, mtime_bandeira, tamanho_bandeira,
+             self._offset_metadados, self._tamanho_metadados,
+             self._offset_strings, self._tamanho_strings) = CABECALHO.unpack_from(self._mapa, 0)
+        except struct.error as e:
+            self.fechar()
+            raise SnapshotInvalido(str(e))
+
+        fim = self._offset_strings + self._tamanho_strings
+        if (magic != MAGIC or formato != VERSAO_FORMATO or tamanho_registro != REGISTRO.size
+                or fim != len(self._mapa)
+                or self._offset_metadados != CABECALHO.size + REGISTRO.size * self.total):
+            self.fechar()
+            raise SnapshotInvalido('Formato de tarifas.bin não reconhecido')
+
+        self.versao = versao.decode('ascii')
+        self.assinatura = ((mtime_tarifas, tamanho_tarifas), (mtime_bandeira, tamanho_bandeira))
+
+    def fechar(self):
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def __len__(self):
+        return self.total
+
+    def _string(self, offset, tamanho):
+        inicio = self._offset_strings + offset
+        return self._mapa[inicio:inicio + tamanho].decode('utf-8')
+
+    def registro(self, i):
+        """Tarifa do i-ésimo registro, no formato de tarifas.json."""
+        estado, tamanho, offset, tarifa, tusd, te = REGISTRO.unpack_from(
+            self._mapa, CABECALHO.size + i * REGISTRO.size)
+        return _tarifa(estado, self._string(offset, tamanho), tarifa, tusd, te)
+
+    def __iter__(self):
+        # Um nome de distribuidora repetido é decodificado uma única vez
+        nomes = {}
+        with memoryview(self._mapa) as visao:
+            for estado, tamanho, offset, tarifa, tusd, te in REGISTRO.iter_unpack(
+                    visao[CABECALHO.size:self._offset_metadados]):
+                nome = nomes.get(offset)
+                if nome is None:
+                    nome = nomes[offset] = self._string(offset, tamanho)
+                yield _tarifa(estado, nome, tarifa, tusd, te)
+
+    def metadados(self):
+        inicio = self._offset_metadados
+        return json.loads(self._mapa[inicio:inicio + self._tamanho_metadados])
+
+
+def carregar_snapshot_binario(data_dir=DATA_DIR, assinatura=None, versao=None):
+    """
+    (tarifas_data, bandeira, versao) lidos de tarifas.bin, no mesmo
+    formato dos JSON. Todos os registros são decodificados aqui e o
+    arquivo é fechado antes de retornar.
+
+    Retorna None se o arquivo não existe, é inválido ou não corresponde
+    aos JSON atuais, identificados pela `assinatura` (mtime/tamanho) ou
+    pela `versao` dos dados.
+    """
+    try:
+        snapshot = SnapshotBinario(os.path.join(data_dir, ARQUIVO_BINARIO))
+    except (OSError, SnapshotInvalido):
+        return None
+
+    with snapshot:
+        if snapshot.assinatura != assinatura and snapshot.versao != versao:
+            return None
+        metadados = snapshot.metadados()
+        tarifas_data = dict(metadados['tarifas'])
+        registros = list(snapshot)
+        inicio = 0
+        for lista, quantidade in metadados['listas']:
+            tarifas_data[lista] = registros[inicio:inicio + quantidade]
+            inicio += quantidade
+        return tarifas_data, metadados['bandeira'], snapshot.versao
+
+
+if __name__ == '__main__':
+    print(f"✅ Snapshot gerado em: {gerar_snapshot_binario()}")
@@ -0,0 +1,80 @@
+"""
+Subclasses residenciais com desconto por faixa de consumo (Tarifa Social).
+
+As regras vêm de data/subclasses.json: para cada subclasse, faixas de
+consumo mensal com o desconto sobre a tarifa (energia e bandeira), e,
+por distribuidora, regras próprias que substituem as gerais. Na carga,
+as faixas de cada regra são compiladas em limites acumulados e, para
+cada faixa, um par (a, b) tal que o consumo faturado (kWh pagos pela
+tarifa cheia) é a * consumo + b. Uma conta custa um bisect e uma
+multiplicação com soma, sem percorrer as faixas.
+"""
+
+import json
+import os
+from bisect import bisect_left
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SUBCLASSES_PATH = os.path.join(DATA_DIR, 'subclasses.json')
+
+
+def _compilar(faixas):
+    # Faixa i vai de `inicio` (limite da anterior) a `ate_kwh`; nela, o
+    # faturado é consumo - (descontado até `inicio` + desconto * (consumo - inicio))
+    limites = []
+    coeficientes = []
+    inicio = descontado = 0.0
+    for faixa in sorted(faixas, key=lambda faixa: faixa['ate_kwh']):
+        desconto = faixa['desconto']
+        coeficientes.append((1 - desconto, desconto * inicio - descontado))
+        descontado += desconto * (faixa['ate_kwh'] - inicio)
+        inicio = faixa['ate_kwh']
+        limites.append(inicio)
+    coeficientes.append((1.0, -descontado))
+    return limites, coeficientes
+
+
+class TabelaSubclasses:
+    """
+    Regras de desconto por subclasse (e por distribuidora) compiladas.
+    """
+
+    def __init__(self, subclasses_data):
+        self.descricoes = {}
+        self._regras = {}
+        for nome, regra in subclasses_data['subclasses'].items():
+            self.descricoes[nome] = regra.get('descricao', '')
+            self._regras[nome] = _compilar(regra.get('faixas', []))
+        self._por_distribuidora = {}
+        for distribuidora, regras in subclasses_data.get('distribuidoras', {}).items():
+            for nome, regra in regras.items():
+                self._por_distribuidora[(distribuidora.upper(), nome)] = _compilar(regra.get('faixas', []))
+
+    def __contains__(self, nome):
+        return isinstance(nome, str) and nome in self._regras
+
+    def consumo_faturado(self, subclasse, consumo, distribuidora=None):
+        """
+        kWh de `consumo` que pagam a tarifa cheia na `subclasse`, pela
+        regra da `distribuidora` se ela tiver uma própria.
+        """
+        regra = None
+        if distribuidora:
+            regra = self._por_distribuidora.get((distribuidora.upper(), subclasse))
+        limites, coeficientes = regra or self._regras[subclasse]
+        a, b = coeficientes[bisect_left(limites, consumo)]
+        return a * consumo + b
+
+
+_tabela_cache = None
+
+
+def carregar_tabela_subclasses():
+    """
+    Carrega e compila as regras das subclasses (uma única vez por processo).
+    """
+    global _tabela_cache
+    if _tabela_cache is None:
+        with open(SUBCLASSES_PATH, 'r', encoding='utf-8') as f:
+            _tabela_cache = TabelaSubclasses(json.load(f))
+    return _tabela_cache
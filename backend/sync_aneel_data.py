@@ -3,27 +3,64 @@ Script para sincronizar dados reais da API da ANEEL.
 
 Este script busca:
 1. Tarifas homologadas vigentes (Grupo B1 - Residencial)
-2. Bandeira tarifária atual
+2. Histórico de acionamento das bandeiras tarifárias
 
 E atualiza os arquivos JSON da aplicação com dados oficiais.
 """
 
-import requests
+import argparse
+import cProfile
+import hashlib
 import json
 import os
-from datetime import datetime
-from collections import defaultdict
+import time
+import unicodedata
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+
+from bandeiras import normalizar_bandeira
+from historico import registrar_vigencias
+from perfil import SEM_PERFIL, PerfilExecucao
+from publicacao import PublicacaoDados
+from upstream import UpstreamError, obter_cliente
 
 # Configuração da API
-API_BASE = "https://dadosabertos.aneel.gov.br/api/3/action/datastore_search"
+API_BASE = os.environ.get(
+    'ANEEL_API_BASE',
+    "https://dadosabertos.aneel.gov.br/api/3/action/datastore_search"
+)
 
 # Resource IDs oficiais
 RESOURCE_TARIFAS = "fcf2906c-7c32-4b9b-a637-054e7a5234f4"  # Tarifas homologadas
 RESOURCE_BANDEIRA = "0591b8f6-fe54-437b-b72b-1aa2efd46e42"  # Bandeira acionamento
 
+# Paginação da consulta de tarifas
+TAMANHO_PAGINA = 5000
+PAGINAS_PARALELAS = 4
+
+# Registros por bloco no processamento colunar
+TAMANHO_LOTE_COLUNAR = 50000
+
 # Diretório de dados
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
+# Estado da última sincronização (versão do recurso, offset, hash de cada
+# página, acumulador)
+CHECKPOINT_PATH = os.path.join(DATA_DIR, 'sync_checkpoint.json')
+
+# Campos dos registros usados pelo AcumuladorTarifasB1 (e no hash das páginas)
+CAMPOS_REDUCAO = (
+    'SigAgente', 'DatInicioVigencia', 'DatFimVigencia', 'DscSubGrupo',
+    'DscModalidadeTarifaria', 'DscClasse', 'VlrTUSD', 'VlrTE'
+)
+
+# Intervalo mínimo entre gravações do checkpoint (s). Cada gravação
+# reescreve o estado inteiro do acumulador, que cresce com o recurso;
+# gravar a cada página tornaria o custo total quadrático.
+INTERVALO_CHECKPOINT = 30
+
 # Mapeamento DISTRIBUIDORA → ESTADO
 # Baseado em informações públicas das principais distribuidoras
 DISTRIBUIDORA_ESTADO = {
@@ -175,89 +212,257 @@ def converter_valor(valor_str):
     except:
         return 0.0
 
+def normalizar_nome(nome):
+    """
+    Maiúsculas, sem acentos e com espaços colapsados ("Enel  Ceará" → "ENEL CEARA").
+    """
+    nome = unicodedata.normalize('NFKD', str(nome).upper())
+    nome = ''.join(c for c in nome if not unicodedata.combining(c))
+    return ' '.join(nome.split())
+
+class IdentificadorDistribuidoras:
+    """
+    Identificação distribuidora → estado, compilada uma única vez.
+
+    O match exato é um acesso a dicionário (pelo nome em maiúsculas e pelo
+    nome normalizado, sem acentos). O match parcial mantém a regra original
+    (primeiro nome do mapeamento, na ordem do dicionário, contido no nome
+    da distribuidora ou que o contém) e o resultado de cada SigAgente fica
+    memorizado: a varredura roda uma vez por agente distinto, não uma vez
+    por registro.
+    """
+
+    def __init__(self, mapeamento):
+        self._exato = {}
+        for nome, estado in mapeamento.items():
+            self._exato.setdefault(nome.upper().strip(), estado)
+        for nome, estado in mapeamento.items():
+            self._exato.setdefault(normalizar_nome(nome), estado)
+
+        self._parcial = [(normalizar_nome(nome), estado) for nome, estado in mapeamento.items()]
+        self._memo = {}
+
+    def _resolver(self, distribuidora):
+        distribuidora_upper = distribuidora.upper().strip()
+        if not distribuidora_upper:
+            return None
+
+        # Tentar match exato
+        estado = self._exato.get(distribuidora_upper)
+        if estado:
+            return estado
+
+        normalizado = normalizar_nome(distribuidora_upper)
+        estado = self._exato.get(normalizado)
+        if estado:
+            return estado
+
+        # Tentar match parcial
+        for nome, estado in self._parcial:
+            if nome in normalizado or normalizado in nome:
+                return estado
+
+        return None
+
+    def identificar(self, distribuidora):
+        try:
+            return self._memo[distribuidora]
+        except KeyError:
+            estado = self._memo[distribuidora] = self._resolver(distribuidora)
+            return estado
+
+_identificador = IdentificadorDistribuidoras(DISTRIBUIDORA_ESTADO)
+
 def identificar_estado(distribuidora):
     """
     Identifica o estado de uma distribuidora.
     """
-    distribuidora_upper = distribuidora.upper().strip()
+    return _identificador.identificar(distribuidora)
 
-    # Tentar match exato
-    if distribuidora_upper in DISTRIBUIDORA_ESTADO:
-        return DISTRIBUIDORA_ESTADO[distribuidora_upper]
+def buscar_pagina_tarifas(offset, limit):
+    """
+    Busca uma página de tarifas B1 da API da ANEEL.
 
-    # Tentar match parcial
-    for nome, estado in DISTRIBUIDORA_ESTADO.items():
-        if nome in distribuidora_upper or distribuidora_upper in nome:
-            return estado
+    Retorna (registros, total de registros da consulta).
+    """
+    params = {
+        'resource_id': RESOURCE_TARIFAS,
+        'q': 'B1',
+        'limit': limit,
+        'offset': offset,
+    }
+    data = obter_cliente().get_json(API_BASE, params=params, timeout=(10, 90))
+
+    if not data.get('success'):
+        raise UpstreamError('API retornou erro')
 
-    return None
+    result = data.get('result', {})
+    return result.get('records', []), result.get('total', 0)
 
-def buscar_tarifas_api(limit=50000):
+def iterar_paginas_tarifas(tamanho_pagina=TAMANHO_PAGINA, paralelo=PAGINAS_PARALELAS,
+                           limite=None, offset_inicial=0):
     """
-    Busca tarifas da API da ANEEL, filtrando por B1 (residencial).
+    Gera (offset, registros, total) de cada página de tarifas B1 da API.
+
+    A primeira página buscada informa o total; as seguintes são buscadas
+    em paralelo (no máximo `paralelo` em andamento) e entregues em ordem
+    de offset, de modo que só algumas páginas ficam em memória por vez.
     """
     print("🔍 Buscando tarifas residenciais da API da ANEEL...")
 
-    # Tentar buscar especificamente B1
-    url = f"{API_BASE}?resource_id={RESOURCE_TARIFAS}&q=B1&limit={limit}"
+    registros, total = buscar_pagina_tarifas(offset_inicial, tamanho_pagina)
+    if limite is not None:
+        total = min(total, limite)
 
-    try:
-        response = requests.get(url, timeout=90)
-        response.raise_for_status()
+    paginas = max(1, -(-(total - offset_inicial) // tamanho_pagina))
+    print(f"   {total} registros; {paginas} páginas de até {tamanho_pagina} a partir do offset {offset_inicial}")
 
-        data = response.json()
+    entregues = offset_inicial
+    if offset_inicial < total:
+        registros = registros[:total - entregues]
+        entregues += len(registros)
+        yield offset_inicial, registros, total
 
-        if data.get('success'):
-            records = data.get('result', {}).get('records', [])
-            total = data.get('result', {}).get('total', 0)
+    offsets = iter(range(offset_inicial + tamanho_pagina, total, tamanho_pagina))
+    with ThreadPoolExecutor(max_workers=paralelo) as executor:
+        pendentes = deque(
+            (offset, executor.submit(buscar_pagina_tarifas, offset, tamanho_pagina))
+            for offset in islice(offsets, paralelo)
+        )
+        while pendentes:
+            offset, futuro = pendentes.popleft()
+            registros, _ = futuro.result()
 
-            print(f"✅ Recebidos {len(records)} registros de {total} totais")
-            print(f"   Buscando especificamente por 'B1' no dataset")
-            return records
-        else:
-            print("❌ API retornou erro")
-            return []
+            proximo = next(offsets, None)
+            if proximo is not None:
+                pendentes.append((proximo, executor.submit(buscar_pagina_tarifas, proximo, tamanho_pagina)))
 
-    except Exception as e:
-        print(f"❌ Erro ao buscar API: {e}")
-        return []
+            registros = registros[:total - entregues]
+            entregues += len(registros)
+            yield offset, registros, total
 
-def processar_tarifas_b1(records):
+    print(f"✅ Recebidos {entregues - offset_inicial} registros de {total} totais")
+
+def eh_b1(subgrupo='', classe='', modalidade=''):
     """
-    Processa registros e extrai tarifas B1 vigentes por estado.
+    Verifica se é B1 residencial (critério mais flexível).
     """
-    print("\n📊 Processando tarifas residenciais (B1)...")
+    subgrupo = str(subgrupo).upper()
+    classe = str(classe).upper()
+    modalidade = str(modalidade).upper()
+
+    # Muitos registros têm "N/A", então vamos também aceitar modalidade convencional
+    return ('B1' in subgrupo or
+            'B1' in classe or
+            'RESIDENCIAL' in classe or
+            'CONVENCIONAL' in modalidade)
+
+# Marca a chave ausente no registro (diferente de string vazia)
+_AUSENTE = object()
+
+_EPOCA = datetime(1970, 1, 1)
+
+def _microssegundos(momento):
+    return (momento - _EPOCA) // timedelta(microseconds=1)
+
+def _de_microssegundos(valor):
+    return _EPOCA + timedelta(microseconds=valor)
+
+def _codificar(np, valores):
+    # Valores por linha → (código inteiro por linha, lista de valores distintos)
+    tabela = dict.fromkeys(valores)
+    for codigo, valor in enumerate(tabela):
+        tabela[valor] = codigo
+    codigos = np.fromiter(map(tabela.__getitem__, valores), dtype=np.intp, count=len(valores))
+    return codigos, list(tabela)
+
+def _coluna(np, registros, campo, padrao='', linhas=None):
+    valores = registros if linhas is None else [registros[i] for i in linhas]
+    return _codificar(np, [r.get(campo, padrao) for r in valores])
+
+def _por_valor(np, funcao, codificada, dtype):
+    # Aplica `funcao` a cada valor distinto e expande para as linhas
+    codigos, valores = codificada
+    return np.array([funcao(v) for v in valores], dtype=dtype)[codigos]
+
+def _mais_recentes(np, chaves, vigencias):
+    # Por chave: posição da linha de maior vigência (no empate, a primeira),
+    # com as chaves na ordem da sua primeira linha
+    posicoes = np.arange(len(chaves))
+    ordem = np.lexsort((posicoes, -vigencias, chaves))
+    chaves_ordenadas = chaves[ordem]
+    vencedoras = ordem[np.flatnonzero(np.r_[True, chaves_ordenadas[1:] != chaves_ordenadas[:-1]])]
+    vencedora_por_chave = dict(zip(chaves[vencedoras].tolist(), vencedoras.tolist()))
+
+    _, primeiras = np.unique(chaves, return_index=True)
+    return [vencedora_por_chave[chaves[primeira]] for primeira in sorted(primeiras.tolist())]
+
+def _guardar_mais_recente(tabela, chave, tarifa):
+    # Substituir só se for mais recente
+    atual = tabela.get(chave)
+    if atual is None or tarifa['_data_vigencia'] > atual['_data_vigencia']:
+        tabela[chave] = tarifa
+
+def _tabela_datas(np, valores):
+    # Por valor distinto: (data válida?, instante em microssegundos)
+    validas = np.zeros(len(valores), dtype=bool)
+    instantes = np.zeros(len(valores), dtype=np.int64)
+    for i, valor in enumerate(valores):
+        if valor is _AUSENTE or not valor:
+            continue
+        try:
+            instantes[i] = _microssegundos(datetime.strptime(valor, '%Y-%m-%d'))
+            validas[i] = True
+        except (TypeError, ValueError):
+            pass
+    return validas, instantes
 
-    data_atual = datetime.now()
-    tarifas_por_estado = {}
+class AcumuladorTarifasB1:
+    """
+    Redução incremental dos registros da ANEEL em tarifas B1 por estado.
+
+    Cada registro é filtrado e incorporado assim que chega, então os
+    registros não precisam estar todos em memória.
+    """
 
-    # DEBUG: Ver estrutura dos dados
-    if records:
-        print("\n🔍 DEBUG - Analisando estrutura dos primeiros registros:")
-        for i, record in enumerate(records[:3], 1):
-            print(f"\n  Registro {i}:")
-            print(f"    DscSubGrupo: {record.get('DscSubGrupo', 'N/A')}")
-            print(f"    DscClasse: {record.get('DscClasse', 'N/A')}")
-            print(f"    DscModalidadeTarifaria: {record.get('DscModalidadeTarifaria', 'N/A')}")
-            print(f"    SigAgente: {record.get('SigAgente', 'N/A')}")
+    def __init__(self, data_atual=None, debug=True, historico=False):
+        self.data_atual = data_atual or datetime.now()
+        self.tarifas_por_estado = {}
+        # Todas as distribuidoras (SigAgente → tarifa mais recente)
+        self.tarifas_por_distribuidora = {}
+        self.registros = 0
+        # Próximo instante em que algum registro B1 entra ou sai de vigência
+        self.proxima_mudanca = None
+        # SigAgente sem estado identificado → número de registros B1 descartados
+        self.nao_identificados = Counter()
+        # Com `historico`, todas as janelas de vigência B1, vigentes ou não:
+        # (SigAgente, início, fim) → tarifa da primeira linha da janela
+        self.janelas = {} if historico else None
+        self._debug = debug
+
+    def _imprimir_debug(self, numero, record):
+        # DEBUG: Ver estrutura dos primeiros registros
+        if numero == 1:
+            print("\n🔍 DEBUG - Analisando estrutura dos primeiros registros:")
+        print(f"\n  Registro {numero}:")
+        print(f"    DscSubGrupo: {record.get('DscSubGrupo', 'N/A')}")
+        print(f"    DscClasse: {record.get('DscClasse', 'N/A')}")
+        print(f"    DscModalidadeTarifaria: {record.get('DscModalidadeTarifaria', 'N/A')}")
+        print(f"    SigAgente: {record.get('SigAgente', 'N/A')}")
+
+    def adicionar(self, record):
+        self.registros += 1
+
+        if self._debug and self.registros <= 3:
+            self._imprimir_debug(self.registros, record)
 
-    for record in records:
         # Filtrar apenas B1 (pode vir em diferentes campos)
-        subgrupo = str(record.get('DscSubGrupo', '')).upper()
-        classe = str(record.get('DscClasse', '')).upper()
-        modalidade = str(record.get('DscModalidadeTarifaria', '')).upper()
-
-        # Verificar se é B1 residencial (critério mais flexível)
-        # Muitos registros têm "N/A", então vamos também aceitar modalidade convencional
-        eh_b1 = ('B1' in subgrupo or
-                 'B1' in classe or
-                 'RESIDENCIAL' in classe or
-                 'CONVENCIONAL' in modalidade)
-
-        if not eh_b1:
-            continue
+        if not eh_b1(record.get('DscSubGrupo', ''), record.get('DscClasse', ''),
+                     record.get('DscModalidadeTarifaria', '')):
+            return
 
         # Verificar vigência
+        janela = None
         try:
             data_inicio = record.get('DatInicioVigencia', '')
             data_fim = record.get('DatFimVigencia', '')
@@ -266,20 +471,27 @@ def processar_tarifas_b1(records):
                 inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
                 fim = datetime.strptime(data_fim, '%Y-%m-%d')
 
-                # Verificar se está vigente
-                if not (inicio <= data_atual <= fim):
-                    continue
+                self._registrar_mudanca(inicio if inicio > self.data_atual else fim)
+                janela = (inicio, fim)
         except:
             # Se não conseguir parsear data, ignora filtro de vigência
             pass
 
+        if janela:
+            if self.janelas is not None:
+                self._registrar_janela(record, *janela)
+
+            # Verificar se está vigente
+            if not (janela[0] <= self.data_atual <= janela[1]):
+                return
+
         # Pegar valores
         distribuidora = record.get('SigAgente', '').strip()
         tusd = converter_valor(record.get('VlrTUSD', 0))
         te = converter_valor(record.get('VlrTE', 0))
 
         if tusd == 0 and te == 0:
-            continue
+            return
 
         # Calcular tarifa total
         # Valores estão em R$/MWh segundo dicionário de dados da ANEEL
@@ -292,92 +504,630 @@ def processar_tarifas_b1(records):
         estado = identificar_estado(distribuidora)
 
         if not estado:
-            continue
+            self.nao_identificados[distribuidora] += 1
+            return
 
-        # Guardar apenas mais recente por estado (data de vigência)
+        # Guardar apenas mais recente por estado e por distribuidora (data de vigência)
         try:
             data_vigencia_atual = datetime.strptime(record.get('DatFimVigencia', '1900-01-01'), '%Y-%m-%d')
-
-            if estado not in tarifas_por_estado:
-                tarifas_por_estado[estado] = {
-                    'estado': estado,
-                    'distribuidora': distribuidora,
-                    'tarifa': round(tarifa_total, 5),
-                    'tusd': round(tusd_kwh, 5),
-                    'te': round(te_kwh, 5),
-                    '_data_vigencia': data_vigencia_atual
-                }
-            else:
-                # Substituir se for mais recente
-                if data_vigencia_atual > tarifas_por_estado[estado]['_data_vigencia']:
-                    tarifas_por_estado[estado] = {
-                        'estado': estado,
-                        'distribuidora': distribuidora,
-                        'tarifa': round(tarifa_total, 5),
-                        'tusd': round(tusd_kwh, 5),
-                        'te': round(te_kwh, 5),
-                        '_data_vigencia': data_vigencia_atual
-                    }
         except:
-            pass
-
-    print(f"✅ Processados {len(tarifas_por_estado)} estados")
-
+            return
+
+        tarifa = {
+            'estado': estado,
+            'distribuidora': distribuidora,
+            'tarifa': round(tarifa_total, 5),
+            'tusd': round(tusd_kwh, 5),
+            'te': round(te_kwh, 5),
+            '_data_vigencia': data_vigencia_atual
+        }
+        _guardar_mais_recente(self.tarifas_por_estado, estado, tarifa)
+        _guardar_mais_recente(self.tarifas_por_distribuidora, distribuidora, tarifa)
+
+    def _registrar_janela(self, record, inicio, fim):
+        distribuidora = str(record.get('SigAgente') or '').strip()
+        tusd = converter_valor(record.get('VlrTUSD', 0))
+        te = converter_valor(record.get('VlrTE', 0))
+        if tusd == 0 and te == 0:
+            return
+        estado = identificar_estado(distribuidora)
+        if estado:
+            self._guardar_janela(estado, distribuidora, inicio, fim, tusd, te)
+
+    def _guardar_janela(self, estado, distribuidora, inicio, fim, tusd, te):
+        chave = (distribuidora, inicio.date().isoformat(), fim.date().isoformat())
+        if chave not in self.janelas:
+            self.janelas[chave] = {
+                'estado': estado,
+                'distribuidora': distribuidora,
+                'inicio': chave[1],
+                'fim': chave[2],
+                'tarifa': round((tusd + te) / 1000, 5),
+                'tusd': round(tusd / 1000, 5),
+                'te': round(te / 1000, 5)
+            }
+
+    def adicionar_lote(self, registros):
+        """
+        Incorpora uma lista de registros de uma vez, em modo colunar.
+
+        Equivale a chamar adicionar() para cada registro, na ordem. Cada
+        coluna é codificada pelos seus valores distintos (subgrupos,
+        classes, datas de vigência e agentes são poucos), de modo que
+        upper(), strptime() e a identificação do estado rodam uma vez por
+        valor distinto; o filtro B1, a janela de vigência, TUSD + TE e a
+        redução "vigência mais recente por estado" viram operações numpy
+        sobre as colunas. Requer numpy.
+        """
+        import numpy as np
+
+        registros = list(registros)
+        if self._debug:
+            for numero in range(self.registros + 1, min(3, self.registros + len(registros)) + 1):
+                self._imprimir_debug(numero, registros[numero - self.registros - 1])
+        self.registros += len(registros)
+        if not registros:
+            return
+
+        def coluna(campo, padrao='', linhas=None):
+            return _coluna(np, registros, campo, padrao, linhas)
+
+        def por_valor(funcao, codificada, dtype):
+            return _por_valor(np, funcao, codificada, dtype)
+
+        # Filtro B1, avaliado por valor distinto de cada coluna
+        filtro_b1 = (
+            por_valor(lambda v: eh_b1(subgrupo=v), coluna('DscSubGrupo'), bool)
+            | por_valor(lambda v: eh_b1(classe=v), coluna('DscClasse'), bool)
+            | por_valor(lambda v: eh_b1(modalidade=v), coluna('DscModalidadeTarifaria'), bool)
+        )
+
+        # Vigência: o filtro só vale quando as duas datas são válidas
+        codigos, valores = coluna('DatInicioVigencia')
+        validas, instantes = _tabela_datas(np, valores)
+        inicio_valido, inicio = validas[codigos], instantes[codigos]
+
+        codigos, valores = coluna('DatFimVigencia', _AUSENTE)
+        validas, instantes = _tabela_datas(np, valores)
+        fim_valido, fim = validas[codigos], instantes[codigos]
+        # Na comparação entre vigências, a chave ausente vale 1900-01-01
+        ausente = np.array([v is _AUSENTE for v in valores], dtype=bool)[codigos]
+        vigencia_valida = fim_valido | ausente
+        data_vigencia = np.where(ausente, _microssegundos(datetime(1900, 1, 1)), fim)
+
+        agora = _microssegundos(self.data_atual)
+        com_datas = filtro_b1 & inicio_valido & fim_valido
+        momentos = np.where(inicio > agora, inicio, fim)[com_datas]
+        momentos = momentos[momentos >= agora]
+        if momentos.size:
+            self._registrar_mudanca(_de_microssegundos(int(momentos.min())))
+
+        vigentes = filtro_b1 & ~(com_datas & ((inicio > agora) | (agora > fim)))
+
+        # Agentes e valores só das linhas que passaram pelos filtros (com o
+        # histórico, também das janelas B1 fora de vigência)
+        extraidas = np.flatnonzero(filtro_b1 if self.janelas is not None else vigentes)
+        if not extraidas.size:
+            return
+        codigos_agente, agentes = _codificar(
+            np, [str(registros[i].get('SigAgente') or '').strip() for i in extraidas])
+        tusd = por_valor(converter_valor, coluna('VlrTUSD', 0, extraidas), float)
+        te = por_valor(converter_valor, coluna('VlrTE', 0, extraidas), float)
+        com_valor = (tusd != 0) | (te != 0)
+        estados = [identificar_estado(agente) for agente in agentes]
+
+        if self.janelas is not None:
+            self._registrar_janelas_lote(np, com_datas[extraidas] & com_valor, codigos_agente,
+                                         agentes, estados, tusd, te,
+                                         inicio[extraidas], fim[extraidas])
+
+        # Daqui em diante, só as linhas vigentes
+        selecao = np.flatnonzero(vigentes[extraidas])
+        if not selecao.size:
+            return
+        linhas = extraidas[selecao]
+        codigos_agente, tusd, te, com_valor = (
+            codigos_agente[selecao], tusd[selecao], te[selecao], com_valor[selecao])
+
+        siglas = sorted({estado for estado in estados if estado})
+        codigo_estado = np.array([siglas.index(e) if e else -1 for e in estados],
+                                 dtype=np.intp)[codigos_agente]
+
+        sem_estado = np.bincount(codigos_agente[com_valor & (codigo_estado < 0)],
+                                 minlength=len(agentes))
+        for i in np.flatnonzero(sem_estado):
+            self.nao_identificados[agentes[i]] += int(sem_estado[i])
+
+        candidatas = np.flatnonzero(com_valor & (codigo_estado >= 0) & vigencia_valida[linhas])
+        if not candidatas.size:
+            return
+        vigencia = data_vigencia[linhas][candidatas]
+
+        tarifas = {}
+
+        def tarifa(j):
+            # Tarifa da j-ésima candidata (uma vez por linha vencedora)
+            if j not in tarifas:
+                i = candidatas[j]
+                tusd_mwh = float(tusd[i])
+                te_mwh = float(te[i])
+                tarifas[j] = {
+                    'estado': siglas[codigo_estado[i]],
+                    'distribuidora': agentes[codigos_agente[i]],
+                    'tarifa': round((tusd_mwh + te_mwh) / 1000, 5),
+                    'tusd': round(tusd_mwh / 1000, 5),
+                    'te': round(te_mwh / 1000, 5),
+                    '_data_vigencia': _de_microssegundos(int(vigencia[j]))
+                }
+            return tarifas[j]
+
+        for tabela, chaves, nomes in (
+                (self.tarifas_por_estado, codigo_estado[candidatas], siglas),
+                (self.tarifas_por_distribuidora, codigos_agente[candidatas], agentes)):
+            for j in _mais_recentes(np, chaves, vigencia):
+                _guardar_mais_recente(tabela, nomes[chaves[j]], tarifa(j))
+
+    def _registrar_janelas_lote(self, np, validas, codigos_agente, agentes, estados,
+                                tusd, te, inicio, fim):
+        # Equivale a _registrar_janela() para cada linha, na ordem: só a
+        # primeira linha de cada (agente, início, fim) é guardada
+        com_estado = np.array([bool(e) for e in estados], dtype=bool)[codigos_agente]
+        validas = np.flatnonzero(validas & com_estado)
+        if not validas.size:
+            return
+        chaves = np.stack([codigos_agente[validas], inicio[validas], fim[validas]], axis=1)
+        _, primeiras = np.unique(chaves, axis=0, return_index=True)
+        for k in sorted(primeiras.tolist()):
+            i = validas[k]
+            self._guardar_janela(estados[codigos_agente[i]], agentes[codigos_agente[i]],
+                                 _de_microssegundos(int(inicio[i])), _de_microssegundos(int(fim[i])),
+                                 float(tusd[i]), float(te[i]))
+
+    def _registrar_mudanca(self, momento):
+        if momento >= self.data_atual and (self.proxima_mudanca is None or momento < self.proxima_mudanca):
+            self.proxima_mudanca = momento
+
+    def exportar_estado(self):
+        """
+        Estado parcial serializável em JSON (para o checkpoint).
+        """
+        return {
+            'data_atual': self.data_atual.isoformat(),
+            'registros': self.registros,
+            'proxima_mudanca': self.proxima_mudanca.isoformat() if self.proxima_mudanca else None,
+            'nao_identificados': dict(self.nao_identificados),
+            'tarifas_por_estado': {
+                estado: {**tarifa, '_data_vigencia': tarifa['_data_vigencia'].isoformat()}
+                for estado, tarifa in self.tarifas_por_estado.items()
+            },
+            'tarifas_por_distribuidora': {
+                distribuidora: {**tarifa, '_data_vigencia': tarifa['_data_vigencia'].isoformat()}
+                for distribuidora, tarifa in self.tarifas_por_distribuidora.items()
+            },
+            'janelas': None if self.janelas is None else list(self.janelas.values())
+        }
+
+    @classmethod
+    def restaurar_estado(cls, dados, debug=False):
+        """
+        Recria um acumulador a partir de exportar_estado().
+        """
+        acumulador = cls(datetime.fromisoformat(dados['data_atual']), debug=debug,
+                         historico=dados.get('janelas') is not None)
+        acumulador.registros = dados['registros']
+        if dados.get('proxima_mudanca'):
+            acumulador.proxima_mudanca = datetime.fromisoformat(dados['proxima_mudanca'])
+        acumulador.nao_identificados.update(dados.get('nao_identificados', {}))
+        acumulador.tarifas_por_estado = {
+            estado: {**tarifa, '_data_vigencia': datetime.fromisoformat(tarifa['_data_vigencia'])}
+            for estado, tarifa in dados['tarifas_por_estado'].items()
+        }
+        acumulador.tarifas_por_distribuidora = {
+            distribuidora: {**tarifa, '_data_vigencia': datetime.fromisoformat(tarifa['_data_vigencia'])}
+            for distribuidora, tarifa in dados.get('tarifas_por_distribuidora', {}).items()
+        }
+        for janela in dados.get('janelas') or []:
+            acumulador.janelas[(janela['distribuidora'], janela['inicio'], janela['fim'])] = janela
+        return acumulador
+
+    def relatorio_nao_identificados(self, limite=15):
+        """
+        Lista as distribuidoras que não puderam ser associadas a um estado.
+        """
+        if not self.nao_identificados:
+            return
+
+        total = sum(self.nao_identificados.values())
+        print(f"\n⚠️ {len(self.nao_identificados)} distribuidoras sem estado identificado "
+              f"({total} registros B1 descartados):")
+        for distribuidora, registros in self.nao_identificados.most_common(limite):
+            print(f"   {distribuidora or '(vazio)':<30} {registros:>7} registros")
+        if len(self.nao_identificados) > limite:
+            print(f"   ... e mais {len(self.nao_identificados) - limite}")
+        print("   Inclua-as em DISTRIBUIDORA_ESTADO para aproveitar suas tarifas")
+
+    def resultado(self):
+        """
+        Tarifas por estado, sem os campos auxiliares.
+        """
+        return _sem_campos_auxiliares(self.tarifas_por_estado.values())
+
+    def resultado_distribuidoras(self):
+        """
+        Tarifas de todas as distribuidoras, sem os campos auxiliares.
+        """
+        return _sem_campos_auxiliares(self.tarifas_por_distribuidora.values())
+
+def _sem_campos_auxiliares(tarifas):
     # Remover campo auxiliar _data_vigencia antes de retornar
     tarifas_limpas = []
-    for tarifa in tarifas_por_estado.values():
+    for tarifa in tarifas:
         tarifa_limpa = {k: v for k, v in tarifa.items() if not k.startswith('_')}
         tarifas_limpas.append(tarifa_limpa)
 
     return tarifas_limpas
 
-def buscar_bandeira_atual():
+def buscar_versao_recurso():
     """
-    Busca bandeira tarifária atual da API.
+    Versão do recurso de tarifas (last_modified do resource_show), ou None.
     """
-    print("\n🚦 Buscando bandeira tarifária atual...")
+    url = API_BASE.rsplit('/', 1)[0] + '/resource_show'
+    try:
+        data = obter_cliente().get_json(url, params={'id': RESOURCE_TARIFAS}, timeout=(10, 30))
+    except Exception as e:
+        print(f"⚠️ Não foi possível consultar a versão do recurso: {e}")
+        return None
 
-    url = f"{API_BASE}?resource_id={RESOURCE_BANDEIRA}&limit=100"
+    result = data.get('result') or {}
+    return result.get('last_modified') or result.get('metadata_modified')
 
+def carregar_checkpoint():
+    """
+    Lê o checkpoint da última sincronização, se existir.
+    """
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        with open(CHECKPOINT_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-        data = response.json()
+def salvar_checkpoint(checkpoint):
+    """
+    Grava o checkpoint (arquivo temporário + rename, nunca fica pela metade).
+    """
+    tmp_path = CHECKPOINT_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, CHECKPOINT_PATH)
 
-        if data.get('success'):
-            records = data.get('result', {}).get('records', [])
+def hash_pagina(registros):
+    """
+    Hash de uma página de registros, só com os CAMPOS_REDUCAO: o que não
+    muda o resultado do AcumuladorTarifasB1 não invalida a página.
+    """
+    conteudo = [[record.get(campo) for campo in CAMPOS_REDUCAO] for record in registros]
+    return hashlib.sha1(json.dumps(conteudo).encode('utf-8')).hexdigest()
 
-            if records:
-                # Pegar registro mais recente
-                registro_recente = max(records, key=lambda x: x.get('DatInicioVigencia', ''))
+def concluir_checkpoint():
+    """
+    Marca o checkpoint como concluído. Chamado só depois que as tarifas
+    foram publicadas (ou conferidas como inalteradas): até lá, a próxima
+    execução retoma do checkpoint em vez de considerar o recurso
+    sincronizado.
+    """
+    checkpoint = carregar_checkpoint()
+    if checkpoint and checkpoint.get('proximo_offset') == checkpoint.get('total'):
+        checkpoint['concluido'] = True
+        salvar_checkpoint(checkpoint)
 
-                bandeira = registro_recente.get('SigBandeiraTarifaria', 'VERDE')
-                valor = converter_valor(registro_recente.get('ValorBandeira', 0))
+def sincronizar_tarifas(forcar=False, tamanho_pagina=TAMANHO_PAGINA, colunar=False,
+                        perfil=SEM_PERFIL):
+    """
+    Busca e processa as tarifas B1 de forma incremental.
+
+    - Se o recurso não mudou (mesmo last_modified) e nenhuma vigência
+      começou ou terminou desde a última execução, nada é baixado e a
+      função retorna None.
+    - Se a execução anterior foi interrompida, retoma do último offset
+      processado, com o estado parcial salvo no checkpoint.
+    - O checkpoint guarda o hash de cada página processada. Quando o
+      last_modified mudou ou não pôde ser consultado, as páginas já
+      processadas são baixadas e conferidas: as de mesmo hash não são
+      reduzidas de novo. Se todas coincidem com as de uma sincronização
+      concluída, a função retorna None; na primeira página diferente, o
+      estado do checkpoint é descartado e o recurso é reprocessado do
+      início.
+    - O checkpoint é gravado no máximo a cada INTERVALO_CHECKPOINT
+      segundos (uma interrupção perde só as páginas desse intervalo). Ao
+      final ele fica com todas as páginas processadas, mas só é marcado
+      como concluído por concluir_checkpoint(), depois da publicação: se
+      ela falhar, a próxima execução retoma sem baixar o recurso de novo.
+    - Com `colunar=True`, cada página é reduzida de uma vez com numpy
+      (AcumuladorTarifasB1.adicionar_lote).
+    - `perfil` recebe as etapas "tarifas" (com os trechos download,
+      processamento e checkpoint) e "historico".
+
+    Retorna (tarifas por estado, tarifas de todas as distribuidoras).
+    """
+    versao = buscar_versao_recurso()
+    checkpoint = None if forcar else carregar_checkpoint()
+    agora = datetime.now()
+
+    compativel = bool(
+        checkpoint
+        and checkpoint.get('resource_id') == RESOURCE_TARIFAS
+        and checkpoint.get('tamanho_pagina') == tamanho_pagina
+        and checkpoint.get('hashes_paginas') is not None
+        and checkpoint['acumulador'].get('janelas') is not None
+    )
+    mesma_versao = compativel and versao is not None and checkpoint.get('versao_recurso') == versao
+    checkpoint_concluido = compativel and checkpoint.get('concluido')
+
+    sem_mudanca_vigencia = False
+    if checkpoint_concluido:
+        proxima_mudanca = checkpoint['acumulador'].get('proxima_mudanca')
+        sem_mudanca_vigencia = proxima_mudanca is None or agora < datetime.fromisoformat(proxima_mudanca)
+
+    if mesma_versao and sem_mudanca_vigencia:
+        print(f"✅ Recurso de tarifas inalterado desde a última sincronização ({versao})")
+        return None
+
+    acumulador = AcumuladorTarifasB1(agora, historico=True)
+    offset_inicial = 0
+    # Hash de cada página já reduzida no acumulador
+    hashes = []
+    # Hashes do checkpoint a conferir antes de reaproveitar o estado dele
+    conferir = []
+
+    do_dia = compativel and checkpoint['acumulador']['data_atual'][:10] == agora.date().isoformat()
+    if compativel and not checkpoint_concluido and do_dia:
+        acumulador = AcumuladorTarifasB1.restaurar_estado(checkpoint['acumulador'])
+        if mesma_versao:
+            hashes = checkpoint['hashes_paginas']
+            offset_inicial = checkpoint['proximo_offset']
+            print(f"↩️ Retomando sincronização interrompida no offset {offset_inicial}")
+        else:
+            conferir = checkpoint['hashes_paginas']
+            print(f"↩️ Versão do recurso {'desconhecida' if versao is None else 'alterada'}; "
+                  f"conferindo {len(conferir)} páginas do checkpoint pelo hash")
+    elif sem_mudanca_vigencia:
+        # Versão alterada ou desconhecida: se nenhuma página mudou, não há o
+        # que publicar
+        acumulador = AcumuladorTarifasB1.restaurar_estado(checkpoint['acumulador'])
+        conferir = checkpoint['hashes_paginas']
+        print(f"🔎 Versão do recurso {'desconhecida' if versao is None else 'alterada'}; "
+              f"conferindo {len(conferir)} páginas da última sincronização pelo hash")
+
+    def gravar(proximo_offset, total, concluido):
+        salvar_checkpoint({
+            'resource_id': RESOURCE_TARIFAS,
+            'versao_recurso': versao,
+            'tamanho_pagina': tamanho_pagina,
+            'total': total,
+            'proximo_offset': proximo_offset,
+            'concluido': concluido,
+            'hashes_paginas': hashes,
+            'acumulador': acumulador.exportar_estado(),
+        })
+
+    print("\n📊 Processando tarifas residenciais (B1) à medida que as páginas chegam...")
+
+    with perfil.etapa('tarifas'):
+        while True:
+            total = offset_inicial
+            diferente = None
+            ultima_gravacao = time.monotonic()
+            paginas = iterar_paginas_tarifas(tamanho_pagina, offset_inicial=offset_inicial)
+            for offset, registros, total in perfil.iterar('download', paginas):
+                perfil.contar(len(registros))
+                hash_atual = hash_pagina(registros)
+                indice = offset // tamanho_pagina
+                if indice < len(conferir):
+                    if hash_atual == conferir[indice]:
+                        # O estado restaurado já inclui esta página
+                        hashes.append(hash_atual)
+                        continue
+                    diferente = offset
+                    break
+                if checkpoint_concluido and conferir and not do_dia:
+                    # Páginas além das da sincronização concluída, cujo estado
+                    # é de outro dia: não dá para continuar a partir dele
+                    diferente = offset
+                    break
+
+                with perfil.trecho('processamento', len(registros)):
+                    if colunar:
+                        acumulador.adicionar_lote(registros)
+                    else:
+                        for record in registros:
+                            acumulador.adicionar(record)
+                hashes.append(hash_atual)
+
+                if time.monotonic() - ultima_gravacao >= INTERVALO_CHECKPOINT:
+                    with perfil.trecho('checkpoint'):
+                        gravar(offset + tamanho_pagina, total, concluido=False)
+                    ultima_gravacao = time.monotonic()
+
+            if diferente is None and len(hashes) < len(conferir):
+                # O recurso encolheu
+                diferente = total
+            if diferente is None:
+                break
+
+            paginas.close()
+            print(f"⚠️ Conteúdo do recurso mudou desde o checkpoint (offset {diferente}); "
+                  f"reprocessando do início")
+            acumulador = AcumuladorTarifasB1(agora, historico=True)
+            offset_inicial = 0
+            hashes = []
+            conferir = []
+            checkpoint_concluido = False
+
+        if checkpoint_concluido and conferir and len(hashes) == len(conferir):
+            # Todas as páginas iguais às da última sincronização
+            gravar(total, total, concluido=True)
+            print("✅ Conteúdo do recurso de tarifas idêntico ao da última sincronização")
+            return None
+
+        gravar(total, total, concluido=False)
+
+    print(f"✅ Processados {len(acumulador.tarifas_por_estado)} estados "
+          f"({len(acumulador.tarifas_por_distribuidora)} distribuidoras)")
+    acumulador.relatorio_nao_identificados()
+
+    # Histórico: todas as janelas de vigência, vigentes ou não (só acrescenta)
+    with perfil.etapa('historico'):
+        perfil.contar(len(acumulador.janelas))
+        novas = registrar_vigencias(acumulador.janelas.values(),
+                                    os.path.join(DATA_DIR, 'historico.db'))
+    print(f"🗂️ Histórico: {novas} janelas de vigência novas ({len(acumulador.janelas)} no recurso)")
+
+    return acumulador.resultado(), acumulador.resultado_distribuidoras()
+
+def _ordenar_distribuidoras(distribuidoras):
+    return sorted(distribuidoras, key=lambda x: (x['estado'], x['distribuidora']))
+
+def tarifas_mudaram(tarifas, distribuidoras=None):
+    """
+    Compara as tarifas calculadas com as de tarifas.json.
+    """
+    try:
+        with open(os.path.join(DATA_DIR, 'tarifas.json'), 'r', encoding='utf-8') as f:
+            atuais = json.load(f)
+    except (OSError, ValueError):
+        return True
 
-                print(f"✅ Bandeira atual: {bandeira} - R$ {valor}/kWh")
+    def ordenar(lista):
+        return sorted(lista, key=lambda x: x['estado'])
 
-                return {
-                    'bandeira': bandeira,
-                    'valor': valor
-                }
+    if ordenar(atuais.get('tarifas', [])) != ordenar(tarifas):
+        return True
+    return (distribuidoras is not None and
+            _ordenar_distribuidoras(atuais.get('distribuidoras', [])) != _ordenar_distribuidoras(distribuidoras))
 
-        print("⚠️ Usando valores padrão de bandeiras")
-        return None
+def buscar_bandeiras_api(tamanho_pagina=1000):
+    """
+    Busca todos os acionamentos de bandeira (RESOURCE_BANDEIRA), página a página.
+    """
+    registros = []
+    while True:
+        params = {
+            'resource_id': RESOURCE_BANDEIRA,
+            'limit': tamanho_pagina,
+            'offset': len(registros),
+        }
+        data = obter_cliente().get_json(API_BASE, params=params, timeout=(10, 30))
+        if not data.get('success'):
+            raise UpstreamError('API retornou erro')
+
+        result = data.get('result', {})
+        pagina = result.get('records', [])
+        registros.extend(pagina)
+        if not pagina or len(registros) >= result.get('total', 0):
+            return registros
+
+def processar_bandeiras(records):
+    """
+    Monta o calendário de bandeiras: [{'mes': 'AAAA-MM', 'bandeira',
+    'valor_kwh'}, ...], em ordem de mês.
+
+    Aceita os campos do dataset de acionamento (DatCompetencia,
+    NomBandeiraAcionada, VlrAdicionalBandeira em R$/MWh) e os do formato
+    antigo do recurso (DatInicioVigencia, SigBandeiraTarifaria,
+    ValorBandeira em R$/kWh). Se um mês aparece mais de uma vez, vale o
+    último registro.
+    """
+    calendario = {}
+    for record in records:
+        mes = str(record.get('DatCompetencia') or record.get('DatInicioVigencia') or '')[:7]
+        nome = record.get('NomBandeiraAcionada') or record.get('SigBandeiraTarifaria')
+        try:
+            datetime.strptime(mes, '%Y-%m')
+        except ValueError:
+            continue
+        if not nome:
+            continue
 
-    except Exception as e:
-        print(f"❌ Erro ao buscar bandeira: {e}")
-        return None
+        if 'VlrAdicionalBandeira' in record:
+            valor = converter_valor(record['VlrAdicionalBandeira']) / 1000
+        else:
+            valor = converter_valor(record.get('ValorBandeira', 0))
 
-def salvar_tarifas(tarifas):
+        calendario[mes] = {
+            'mes': mes,
+            'bandeira': normalizar_bandeira(nome),
+            'valor_kwh': round(valor, 5)
+        }
+    return [calendario[mes] for mes in sorted(calendario)]
+
+def salvar_bandeiras(calendario, agora=None):
+    """
+    Grava o calendário em bandeira.json e atualiza a bandeira atual com a
+    do mês corrente (ou a do último mês anterior a ele no calendário).
+
+    Retorna False se bandeira.json já estava igual.
+    """
+    publicacao = PublicacaoDados(DATA_DIR)
+    data = dict(publicacao.documento('bandeira.json'))
+    anterior = dict(data)
+
+    agora = agora or datetime.now()
+    ate_hoje = [entrada for entrada in calendario if entrada['mes'] <= agora.strftime('%Y-%m')]
+    if ate_hoje:
+        atual = ate_hoje[-1]
+        data['mes_referencia'] = datetime.strptime(atual['mes'], '%Y-%m').strftime("%B de %Y")
+        data['bandeira_atual'] = atual['bandeira']
+        data['valor_kwh'] = atual['valor_kwh']
+    data['calendario'] = calendario
+
+    if data == anterior:
+        return False
+
+    publicacao.substituir('bandeira.json', data)
+    publicacao.publicar()
+
+    print(f"✅ Calendário de bandeiras salvo: {len(calendario)} meses "
+          f"(atual: {data['bandeira_atual']} - R$ {data['valor_kwh']:.5f}/kWh)")
+    return True
+
+def sincronizar_bandeiras(perfil=SEM_PERFIL):
+    """
+    Atualiza o calendário de bandeiras com todos os acionamentos da ANEEL.
+    """
+    print("\n🚦 Buscando o histórico de acionamento das bandeiras...")
+    with perfil.etapa('bandeiras'):
+        try:
+            with perfil.trecho('download'):
+                registros = buscar_bandeiras_api()
+            perfil.contar(len(registros))
+            with perfil.trecho('processamento', len(registros)):
+                calendario = processar_bandeiras(registros)
+        except Exception as e:
+            print(f"❌ Erro ao buscar bandeiras: {e}")
+            return False
+
+        if not calendario:
+            print("⚠️ Nenhum acionamento de bandeira encontrado; bandeira.json mantido")
+            return False
+        with perfil.trecho('gravacao'):
+            salvo = salvar_bandeiras(calendario)
+    if not salvo:
+        print(f"✅ Calendário de bandeiras inalterado ({len(calendario)} meses)")
+    return True
+
+def salvar_tarifas(tarifas, distribuidoras=None, perfil=SEM_PERFIL):
     """
     Salva tarifas no formato JSON da aplicação.
+
+    `tarifas` tem a tarifa de referência de cada estado; `distribuidoras`,
+    a de todas as distribuidoras (usada quando o CEP identifica qual
+    delas atende o endereço). `perfil` recebe a etapa "salvar".
     """
     if not tarifas:
         print("❌ Nenhuma tarifa para salvar")
         return False
 
-    print(f"\n💾 Salvando {len(tarifas)} tarifas...")
+    print(f"\n💾 Salvando {len(tarifas)} tarifas ({len(distribuidoras or [])} distribuidoras)...")
 
     data = {
         "ultima_atualizacao": datetime.now().strftime("%B de %Y"),
@@ -385,20 +1135,21 @@ def salvar_tarifas(tarifas):
         "observacao": "Dados oficiais processados automaticamente",
         "tarifas": sorted(tarifas, key=lambda x: x['estado'])
     }
+    if distribuidoras:
+        data["distribuidoras"] = _ordenar_distribuidoras(distribuidoras)
 
-    output_path = os.path.join(DATA_DIR, 'tarifas.json')
+    with perfil.etapa('salvar'):
+        perfil.contar(len(tarifas) + len(distribuidoras or []))
 
-    # Backup do arquivo anterior
-    if os.path.exists(output_path):
-        backup_path = output_path.replace('.json', f'_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-        os.rename(output_path, backup_path)
-        print(f"💾 Backup criado: {os.path.basename(backup_path)}")
+        # Sem backup do arquivo anterior: as tarifas de cada vigência ficam em
+        # historico.db (gravado por sincronizar_tarifas). Gravação atômica:
+        # a API lê o arquivo anterior ou o novo, nunca um pela metade
+        publicacao = PublicacaoDados(DATA_DIR)
+        publicacao.substituir('tarifas.json', data)
+        versao = publicacao.publicar()
 
-    # Salvar novo arquivo
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"✅ Tarifas salvas em: tarifas.json")
+    print(f"✅ Tarifas salvas em: tarifas.json (publicação {versao})")
+    print(f"✅ Snapshot binário atualizado: tarifas.bin")
 
     # Mostrar preview
     print("\n📊 Preview das tarifas salvas:")
@@ -413,45 +1164,97 @@ def salvar_tarifas(tarifas):
 
     return True
 
-def main():
-    """Função principal."""
+def sincronizar(args, perfil=SEM_PERFIL):
+    """Bandeiras, tarifas e gravação, com as mensagens de progresso."""
     print("\n" + "="*70)
     print("🔌 SINCRONIZAÇÃO DE DADOS DA ANEEL")
     print("="*70)
     print("\nEste script busca dados REAIS da API da ANEEL e atualiza a aplicação.")
     print()
 
-    # 1. Buscar tarifas
-    records = buscar_tarifas_api(limit=20000)
+    # Bandeiras: calendário mês a mês (independente das tarifas)
+    sincronizar_bandeiras(perfil)
+
+    # 1 e 2. Buscar tarifas página por página e processar B1 à medida que chegam
+    try:
+        resultado = sincronizar_tarifas(forcar=args.forcar, colunar=args.colunar, perfil=perfil)
+    except Exception as e:
+        print(f"\n❌ Não foi possível buscar dados da API: {e}")
+        print("   Execute novamente para retomar do último checkpoint")
+        return
 
-    if not records:
-        print("\n❌ Não foi possível buscar dados da API")
+    if resultado is None:
+        print("\n✅ Nada a fazer: dados já sincronizados")
         return
 
-    # 2. Processar tarifas B1
-    tarifas = processar_tarifas_b1(records)
+    tarifas, distribuidoras = resultado
 
     if not tarifas:
         print("\n❌ Nenhuma tarifa B1 encontrada")
         return
 
-    # 3. Salvar tarifas
-    if salvar_tarifas(tarifas):
+    # 3. Salvar tarifas (só se algo mudou)
+    with perfil.etapa('comparacao'):
+        mudaram = tarifas_mudaram(tarifas, distribuidoras)
+    if not mudaram:
+        print("\n✅ Tarifas B1 inalteradas; tarifas.json mantido")
+        concluir_checkpoint()
+    elif salvar_tarifas(tarifas, distribuidoras, perfil=perfil):
         print("\n✅ SUCESSO! Dados sincronizados com a ANEEL")
+        concluir_checkpoint()
     else:
         print("\n❌ Erro ao salvar dados")
-
-    # 4. Buscar bandeira (opcional, comentado pois pode não funcionar bem)
-    # bandeira = buscar_bandeira_atual()
+        print("   Execute novamente para publicar a partir do checkpoint")
 
     print("\n" + "="*70)
     print("📝 IMPORTANTE:")
     print("="*70)
     print("  • Verifique se os valores fazem sentido (~R$ 0.65 a R$ 0.95/kWh)")
     print("  • Compare com sua conta de energia para validar")
-    print("  • A bandeira tarifária deve ser atualizada manualmente")
+    print("  • A bandeira de cada mês vem do histórico de acionamentos da ANEEL")
     print("  • Execute este script mensalmente para manter dados atualizados")
     print()
 
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description='Sincroniza tarifas com a API da ANEEL')
+    parser.add_argument('--forcar', action='store_true',
+                        help='ignora o checkpoint e reprocessa todo o recurso')
+    parser.add_argument('--colunar', action='store_true',
+                        help='processa cada página em modo colunar (requer numpy)')
+    parser.add_argument('--profile', nargs='?', const='sync_profile.json', metavar='ARQUIVO',
+                        help='mede tempo, CPU, pico de memória e registros/s por etapa e '
+                             'grava o relatório em JSON (padrão: sync_profile.json)')
+    parser.add_argument('--cprofile', metavar='ARQUIVO',
+                        help='com --profile, grava também o cProfile da execução '
+                             '(para pstats ou snakeviz)')
+    args = parser.parse_args()
+
+    if not args.profile:
+        if args.cprofile:
+            parser.error('--cprofile requer --profile')
+        sincronizar(args)
+        return
+
+    perfil = PerfilExecucao({'forcar': args.forcar, 'colunar': args.colunar,
+                             'cprofile': bool(args.cprofile)})
+    profiler = cProfile.Profile() if args.cprofile else None
+    perfil.iniciar()
+    if profiler:
+        profiler.enable()
+    try:
+        sincronizar(args, perfil)
+    finally:
+        if profiler:
+            profiler.disable()
+        perfil.parar()
+        perfil.imprimir()
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(perfil.relatorio(), f, ensure_ascii=False, indent=2)
+        print(f"📄 Relatório de perfil salvo em: {args.profile}")
+        if profiler:
+            profiler.dump_stats(args.cprofile)
+            print(f"📄 cProfile salvo em: {args.cprofile} (python -m pstats {args.cprofile})")
+
 if __name__ == "__main__":
     main()
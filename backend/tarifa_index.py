@@ -0,0 +1,90 @@
+"""
+Índice pré-calculado das tarifas.
+
+Construído uma vez a partir do conteúdo de tarifas.json, evita a busca
+linear pelo estado e a ordenação da tabela inteira a cada requisição:
+as consultas por UF/distribuidora são acessos a dicionário e o bloco de
+comparação de cada estado já fica montado.
+
+`tarifas` traz a tarifa de referência de cada estado (usada no ranking
+entre estados); `distribuidoras`, quando presente, traz a tarifa de
+todas as distribuidoras.
+"""
+
+
+class IndiceTarifas:
+    """
+    Tarifas indexadas por UF e por distribuidora, com ranking pré-calculado.
+    """
+
+    def __init__(self, tarifas_data):
+        tarifas = tarifas_data['tarifas']
+        self.ultima_atualizacao = tarifas_data.get('ultima_atualizacao')
+        self.total_estados = len(tarifas)
+
+        # Primeira ocorrência vence, como na busca linear original
+        self.por_estado = {}
+        self.por_distribuidora = {}
+        for tarifa in tarifas:
+            self.por_estado.setdefault(tarifa['estado'], tarifa)
+        for tarifa in tarifas_data.get('distribuidoras', []) + tarifas:
+            self.por_distribuidora.setdefault(tarifa['distribuidora'].upper(), tarifa)
+
+        ordenadas = sorted(tarifas, key=lambda x: x['tarifa'])
+        self.mais_barato = ordenadas[0] if ordenadas else None
+        self.mais_caro = ordenadas[-1] if ordenadas else None
+
+        # Posição (1 = mais barato) e percentil de cada estado
+        self.posicao = {}
+        self.percentil = {}
+        for i, tarifa in enumerate(ordenadas):
+            self.posicao.setdefault(tarifa['estado'], i + 1)
+        for estado, posicao in self.posicao.items():
+            if self.total_estados > 1:
+                self.percentil[estado] = round(100 * (posicao - 1) / (self.total_estados - 1), 1)
+            else:
+                self.percentil[estado] = 0.0
+
+        # Bloco "comparacao" da resposta, montado uma única vez por estado
+        self.comparacao = {}
+        if ordenadas:
+            extremos = {
+                'mais_barato': {
+                    'estado': self.mais_barato['estado'],
+                    'tarifa': self.mais_barato['tarifa']
+                },
+                'mais_caro': {
+                    'estado': self.mais_caro['estado'],
+                    'tarifa': self.mais_caro['tarifa']
+                }
+            }
+            for estado in self.por_estado:
+                self.comparacao[estado] = {
+                    **extremos,
+                    'posicao': self.posicao[estado],
+                    'total_estados': self.total_estados,
+                    'percentil': self.percentil[estado]
+                }
+
+    def tarifa_estado(self, estado):
+        """Tarifa de uma UF, ou None."""
+        return self.por_estado.get(estado)
+
+    def tarifa_distribuidora(self, distribuidora):
+        """Tarifa de uma distribuidora (sigla, sem diferenciar maiúsculas), ou None."""
+        return self.por_distribuidora.get(distribuidora.upper())
+
+    def tarifa_para(self, estado, distribuidora=None):
+        """
+        Tarifa da distribuidora, se conhecida e do mesmo estado; senão, a
+        tarifa de referência da UF (ou None).
+        """
+        if distribuidora:
+            tarifa = self.por_distribuidora.get(distribuidora.upper())
+            if tarifa is not None and tarifa['estado'] == estado:
+                return tarifa
+        return self.por_estado.get(estado)
+
+    def comparacao_estado(self, estado):
+        """Bloco de comparação pré-montado para a UF."""
+        return self.comparacao.get(estado)
@@ -0,0 +1,127 @@
+"""
+Armazenamento das tarifas e da bandeira compartilhado pelo processo.
+
+Os arquivos de dados são lidos uma vez e mantidos em um snapshot
+imutável. A cada `intervalo_verificacao` segundos, no máximo, o store
+compara o mtime/tamanho dos arquivos com os do snapshot atual; se o
+script de sincronização reescreveu algum deles, um novo snapshot é
+montado e trocado atomicamente. Requisições em andamento continuam com o
+snapshot que já tinham em mãos, então nunca enxergam dados pela metade.
+
+Quando data/tarifas.bin corresponde à versão atual dos JSON, as tarifas
+são lidas dele (ver snapshot_binario) em vez de decodificar o JSON.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from bandeiras import CalendarioBandeiras
+from snapshot_binario import carregar_snapshot_binario, versao_dados
+from tarifa_index import IndiceTarifas
+
+# Diretório de dados
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+ARQUIVOS = ('tarifas.json', 'bandeira.json')
+
+SnapshotTarifas = namedtuple('SnapshotTarifas',
+                             ['tarifas', 'bandeira', 'indice', 'versao', 'calendario'])
+
+
+class TarifaStore:
+    """
+    Snapshot atual de tarifas.json + bandeira.json, recarregado quando mudam.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, intervalo_verificacao=1.0, relogio=time.monotonic):
+        self.data_dir = data_dir
+        self.intervalo_verificacao = intervalo_verificacao
+        self._relogio = relogio
+        self._snapshot = None
+        self._assinatura = None
+        self._proxima_verificacao = 0.0
+        self._lock = threading.Lock()
+
+    def _caminho(self, nome):
+        return os.path.join(self.data_dir, nome)
+
+    def _assinatura_arquivos(self):
+        assinatura = []
+        for nome in ARQUIVOS:
+            st = os.stat(self._caminho(nome))
+            assinatura.append((st.st_mtime_ns, st.st_size))
+        return tuple(assinatura)
+
+    def _carregar(self, assinatura):
+        # tarifas.bin gerado a partir destes mesmos arquivos: nem lê os JSON
+        binario = carregar_snapshot_binario(self.data_dir, assinatura=assinatura)
+
+        if binario is None:
+            conteudos = []
+            for nome in ARQUIVOS:
+                with open(self._caminho(nome), 'rb') as f:
+                    conteudos.append(f.read())
+            versao = versao_dados(conteudos)
+
+            # mtime diferente mas mesmo conteúdo (ex.: cópia no deploy)
+            binario = carregar_snapshot_binario(self.data_dir, versao=versao)
+            if binario is None:
+                binario = (json.loads(conteudos[0]), json.loads(conteudos[1]), versao)
+
+        tarifas, bandeira, versao = binario
+
+        return SnapshotTarifas(tarifas, bandeira, IndiceTarifas(tarifas), versao,
+                               CalendarioBandeiras(bandeira))
+
+    def _recarregar_se_mudou(self):
+        # Só uma thread verifica; as demais seguem com o snapshot atual
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return
+        try:
+            agora = self._relogio()
+            if self._snapshot is not None and agora < self._proxima_verificacao:
+                return
+            self._proxima_verificacao = agora + self.intervalo_verificacao
+
+            try:
+                assinatura = self._assinatura_arquivos()
+                if assinatura == self._assinatura:
+                    return
+                snapshot = self._carregar(assinatura)
+            except (OSError, ValueError):
+                # Arquivo sendo reescrito: mantém o snapshot anterior
+                if self._snapshot is None:
+                    raise
+                return
+
+            self._snapshot = snapshot
+            self._assinatura = assinatura
+        finally:
+            self._lock.release()
+
+    def snapshot(self):
+        """
+        Snapshot vigente. Nunca lê disco, exceto na carga inicial e quando
+        os arquivos mudaram desde a última verificação.
+        """
+        if self._snapshot is None or self._relogio() >= self._proxima_verificacao:
+            self._recarregar_se_mudou()
+        return self._snapshot
+
+
+# Store compartilhado pelo processo
+_store = None
+_store_lock = threading.Lock()
+
+
+def obter_store():
+    """Retorna o store compartilhado (criado na primeira chamada)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TarifaStore()
+    return _store
@@ -1,22 +1,47 @@
 """
 Script para atualizar dados de tarifas e bandeiras tarifárias.
 
-Este script pode ser executado manualmente ou configurado em um cron job
-para atualização automática mensal dos dados.
+Sem argumentos, abre o menu interativo. Com um subcomando, aplica a
+alteração sem perguntas (para scripts e cron jobs):
+
+    python update_data.py bandeira amarela
+    python update_data.py bandeira "Vermelha Patamar 1" --valor 0.04463 --mes 2025-11
+    python update_data.py tarifa SP 0.79 --distribuidora "ENEL SP"
+    python update_data.py importar-csv tarifas.csv
+    python update_data.py aplicar alteracoes.json
+
+Todas as alterações de uma execução são gravadas juntas, com troca
+atômica dos arquivos (ver publicacao.py).
 
 Fontes oficiais:
 - ANEEL: https://dadosabertos.aneel.gov.br/
 - Sistema de Bandeiras: https://www.aneel.gov.br/bandeiras-tarifarias
 """
 
+import argparse
+import csv
 import json
-import requests
+import sys
 from datetime import datetime
 import os
 
+from publicacao import BANDEIRAS_DISPONIVEIS, ErroPublicacao, PublicacaoDados
+
 # Diretório de dados
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
+def gravar_bandeira(nome, valor):
+    """
+    Grava a bandeira `nome` (R$ `valor`/kWh) como atual e no calendário,
+    no mês corrente. Retorna o mês por extenso.
+
+    Os demais meses do calendário de bandeiras são preservados.
+    """
+    publicacao = PublicacaoDados(DATA_DIR)
+    publicacao.definir_bandeira(nome, valor)
+    publicacao.publicar()
+    return datetime.now().strftime("%B de %Y")
+
 def update_bandeira_manual():
     """
     Atualiza a bandeira tarifária manualmente.
@@ -56,41 +81,7 @@ def update_bandeira_manual():
         return False
 
     bandeira_escolhida = bandeiras[opcao]
-    mes_atual = datetime.now().strftime("%B de %Y")
-
-    bandeira_data = {
-        "mes_referencia": mes_atual,
-        "bandeira_atual": bandeira_escolhida["nome"],
-        "valor_kwh": bandeira_escolhida["valor"],
-        "descricao": "Condições de geração atualizadas",
-        "bandeiras_disponiveis": {
-            "verde": {
-                "nome": "Verde",
-                "valor_kwh": 0.0,
-                "descricao": "Condições favoráveis de geração"
-            },
-            "amarela": {
-                "nome": "Amarela",
-                "valor_kwh": 0.01885,
-                "descricao": "Condições de geração menos favoráveis"
-            },
-            "vermelha_1": {
-                "nome": "Vermelha Patamar 1",
-                "valor_kwh": 0.04463,
-                "descricao": "Condições mais custosas de geração"
-            },
-            "vermelha_2": {
-                "nome": "Vermelha Patamar 2",
-                "valor_kwh": 0.07877,
-                "descricao": "Condições ainda mais custosas de geração"
-            }
-        }
-    }
-
-    # Salvar arquivo
-    filepath = os.path.join(DATA_DIR, 'bandeira.json')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(bandeira_data, f, ensure_ascii=False, indent=2)
+    mes_atual = gravar_bandeira(bandeira_escolhida["nome"], bandeira_escolhida["valor"])
 
     print(f"\n✅ Bandeira atualizada para: {bandeira_escolhida['nome']}")
     print(f"   Valor: R$ {bandeira_escolhida['valor']:.5f}/kWh")
@@ -117,8 +108,9 @@ def fetch_aneel_tarifas():
     print("1. Acesse: https://dadosabertos.aneel.gov.br/")
     print("2. Procure por 'Tarifas de Energia Elétrica'")
     print("3. Baixe o CSV mais recente")
-    print("4. Use o script parse_aneel_csv.py para processar")
-    print("\nOu entre em contato com a ANEEL para acesso à API.")
+    print("4. Importe com: python parse_aneel_csv.py arquivo.csv --colunar")
+    print("   (use --simular para conferir antes de gravar)")
+    print("\nOu sincronize direto pela API: python sync_aneel_data.py")
 
     return False
 
@@ -131,9 +123,8 @@ def update_tarifas_manual():
     print("=" * 60)
 
     # Carregar tarifas atuais
-    filepath = os.path.join(DATA_DIR, 'tarifas.json')
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    publicacao = PublicacaoDados(DATA_DIR)
+    data = publicacao.documento('tarifas.json')
 
     print("\nEstados disponíveis:")
     for i, tarifa in enumerate(data['tarifas'], 1):
@@ -153,25 +144,135 @@ def update_tarifas_manual():
         print(f"Tarifa atual: R$ {tarifa['tarifa']:.5f}/kWh")
 
         nova_tarifa = float(input("Nova tarifa (R$/kWh): "))
-        tarifa['tarifa'] = nova_tarifa
 
-        # Atualizar data
-        data['ultima_atualizacao'] = datetime.now().strftime("%B de %Y")
-
-        # Salvar
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Também atualiza a mesma distribuidora na lista completa
+        publicacao.definir_tarifa(tarifa['estado'], nova_tarifa, tarifa['distribuidora'])
+        publicacao.publicar()
 
         print(f"\n✅ Tarifa atualizada com sucesso!")
         print(f"   {tarifa['estado']} - Nova tarifa: R$ {nova_tarifa:.5f}/kWh")
         return True
 
-    except ValueError:
+    except (ValueError, ErroPublicacao):
         print("Valor inválido!")
         return False
 
 
-def main():
+def valor_bandeira(nome):
+    """
+    Nome completo e valor de referência (R$/kWh) de uma bandeira, pelo
+    nome ou pela chave ("amarela", "vermelha_1"); (nome, None) se não
+    for uma das bandeiras conhecidas.
+    """
+    procurado = nome.strip().lower()
+    for chave, bandeira in BANDEIRAS_DISPONIVEIS.items():
+        if procurado in (chave, bandeira['nome'].lower()):
+            return bandeira['nome'], bandeira['valor_kwh']
+    return nome.strip(), None
+
+def ler_csv_tarifas(arquivo):
+    """
+    Lê tarifas de um CSV com cabeçalho: `estado` e `tarifa` (R$/kWh)
+    obrigatórios; `distribuidora`, `tusd` e `te` opcionais. Aceita `,`
+    ou `;` como separador e vírgula decimal.
+
+    Retorna a lista de operações {"tipo": "tarifa", ...}.
+    """
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    separador = ';' if amostra.count(';') > amostra.count(',') else ','
+
+    operacoes = []
+    leitor = csv.DictReader(arquivo, delimiter=separador)
+    campos = {campo.strip().lower() for campo in leitor.fieldnames or []}
+    if not {'estado', 'tarifa'} <= campos:
+        raise ErroPublicacao('CSV sem as colunas estado e tarifa')
+
+    for linha in leitor:
+        linha = {(chave or '').strip().lower(): (valor or '').strip() for chave, valor in linha.items()}
+        if not any(linha.values()):
+            continue
+        operacao = {'tipo': 'tarifa', 'estado': linha['estado'], 'tarifa': linha['tarifa']}
+        for campo in ('distribuidora', 'tusd', 'te'):
+            if linha.get(campo):
+                operacao[campo] = linha[campo]
+        operacoes.append(operacao)
+    return operacoes
+
+def executar_comando(args):
+    """
+    Aplica o subcomando sem interação. Retorna o código de saída.
+    """
+    publicacao = PublicacaoDados(DATA_DIR)
+    try:
+        if args.comando == 'bandeira':
+            nome, valor = valor_bandeira(args.nome)
+            if args.valor is not None:
+                valor = args.valor
+            if valor is None:
+                print(f"❌ Bandeira desconhecida: {args.nome} (informe --valor)")
+                return 1
+            publicacao.definir_bandeira(nome, valor, args.mes)
+            descricao = f"bandeira {nome} (R$ {valor:.5f}/kWh)"
+        elif args.comando == 'tarifa':
+            publicacao.definir_tarifa(args.estado, args.tarifa, args.distribuidora,
+                                      args.tusd, args.te)
+            descricao = f"tarifa de {args.estado.upper()}"
+        elif args.comando == 'importar-csv':
+            with open(args.arquivo, 'r', encoding='utf-8-sig', newline='') as f:
+                operacoes = ler_csv_tarifas(f)
+            publicacao.aplicar(operacoes)
+            descricao = f"{len(operacoes)} tarifas de {args.arquivo}"
+        else:
+            if args.arquivo == '-':
+                operacoes = json.load(sys.stdin)
+            else:
+                with open(args.arquivo, 'r', encoding='utf-8') as f:
+                    operacoes = json.load(f)
+            publicacao.aplicar(operacoes)
+            descricao = f"{len(operacoes)} alterações de {args.arquivo}"
+    except (ErroPublicacao, OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.simular:
+        print(f"🔎 Simulação: {descricao} validadas, nada foi gravado")
+        return 0
+
+    versao = publicacao.publicar()
+    print(f"✅ Publicado: {descricao} (versão {versao})")
+    print("   Em produção, a CDN pode servir contas antigas por alguns minutos após o deploy "
+          "(Cache-Control do /api/calculate); limpe o cache da CDN para valer na hora")
+    return 0
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description='Atualiza tarifas e bandeiras (sem argumentos, abre o menu interativo)')
+    parser.add_argument('--simular', action='store_true',
+                        help='valida as alterações sem gravar nada')
+    comandos = parser.add_subparsers(dest='comando')
+
+    bandeira = comandos.add_parser('bandeira', help='define a bandeira de um mês')
+    bandeira.add_argument('nome', help='verde, amarela, vermelha_1, vermelha_2 ou o nome completo')
+    bandeira.add_argument('--valor', type=float, help='R$/kWh (padrão: valor de referência)')
+    bandeira.add_argument('--mes', help='AAAA-MM (padrão: mês corrente)')
+
+    tarifa = comandos.add_parser('tarifa', help='define a tarifa de uma UF ou distribuidora')
+    tarifa.add_argument('estado', help='sigla da UF')
+    tarifa.add_argument('tarifa', type=float, help='R$/kWh')
+    tarifa.add_argument('--distribuidora', help='padrão: a distribuidora de referência da UF')
+    tarifa.add_argument('--tusd', type=float)
+    tarifa.add_argument('--te', type=float)
+
+    importar = comandos.add_parser('importar-csv', help='importa tarifas de um CSV (uma gravação)')
+    importar.add_argument('arquivo')
+
+    aplicar = comandos.add_parser('aplicar', help='aplica uma lista JSON de alterações (uma gravação)')
+    aplicar.add_argument('arquivo', help='arquivo JSON, ou - para a entrada padrão')
+
+    return parser
+
+def menu():
     print("\n🔌 SISTEMA DE ATUALIZAÇÃO DE DADOS - CALCULADORA DE ENERGIA\n")
 
     while True:
@@ -197,5 +298,12 @@ def main():
         else:
             print("\n❌ Opção inválida!")
 
+def main():
+    args = criar_parser().parse_args()
+    if args.comando is None:
+        menu()
+        return
+    sys.exit(executar_comando(args))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,180 @@
+"""
+Cliente HTTP compartilhado para as APIs externas (ViaCEP e ANEEL).
+
+Mantém um pool de conexões keep-alive por host, aplica timeouts de
+conexão/leitura por host, repete falhas transitórias com backoff
+exponencial e jitter, e abre um disjuntor (circuit breaker) por host
+quando as falhas se acumulam, para não prender workers esperando um
+serviço fora do ar.
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metricas import registrar_upstream
+
+# Timeouts (conexão, leitura) em segundos, por host
+TIMEOUTS = {
+    'viacep.com.br': (2, 3),
+    'dadosabertos.aneel.gov.br': (10, 90),
+}
+TIMEOUT_PADRAO = (3, 10)
+
+# Status que valem uma nova tentativa
+STATUS_TRANSITORIOS = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """Falha ao consultar um serviço externo."""
+
+
+class CircuitoAberto(UpstreamError):
+    """O disjuntor do host está aberto; a chamada nem foi tentada."""
+
+
+class Disjuntor:
+    """
+    Circuit breaker simples: abre após `limite_falhas` falhas seguidas e
+    libera uma chamada de teste depois de `tempo_reabertura` segundos.
+    """
+
+    def __init__(self, limite_falhas=5, tempo_reabertura=30, relogio=time.monotonic):
+        self.limite_falhas = limite_falhas
+        self.tempo_reabertura = tempo_reabertura
+        self._relogio = relogio
+        self._falhas = 0
+        self._aberto_em = None
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        with self._lock:
+            if self._aberto_em is None:
+                return 'fechado'
+            if self._relogio() - self._aberto_em >= self.tempo_reabertura:
+                return 'meio-aberto'
+            return 'aberto'
+
+    def permitir(self):
+        """Indica se uma chamada pode ser feita agora."""
+        with self._lock:
+            if self._aberto_em is None:
+                return True
+            if self._relogio() - self._aberto_em >= self.tempo_reabertura:
+                # Meio-aberto: deixa passar uma chamada de teste
+                self._aberto_em = self._relogio()
+                return True
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self._aberto_em = None
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self._falhas >= self.limite_falhas:
+                self._aberto_em = self._relogio()
+
+
+class ClienteUpstream:
+    """
+    Sessão HTTP com pool de conexões, timeouts, retentativas e disjuntor.
+    """
+
+    def __init__(self, timeouts=None, tentativas=3, backoff_base=0.2,
+                 backoff_max=2.0, tamanho_pool=20, limite_falhas=5,
+                 tempo_reabertura=30):
+        self.timeouts = dict(TIMEOUTS if timeouts is None else timeouts)
+        self.tentativas = tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limite_falhas = limite_falhas
+        self.tempo_reabertura = tempo_reabertura
+
+        self.sessao = requests.Session()
+        adapter = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+        self.sessao.mount('http://', adapter)
+        self.sessao.mount('https://', adapter)
+
+        self._disjuntores = {}
+        self._lock = threading.Lock()
+
+    def disjuntor(self, host):
+        """Disjuntor associado a um host."""
+        with self._lock:
+            disjuntor = self._disjuntores.get(host)
+            if disjuntor is None:
+                disjuntor = self._disjuntores[host] = Disjuntor(
+                    self.limite_falhas, self.tempo_reabertura)
+            return disjuntor
+
+    def _espera(self, tentativa):
+        # Backoff exponencial com "full jitter"
+        teto = min(self.backoff_max, self.backoff_base * (2 ** tentativa))
+        return random.uniform(0, teto)
+
+    def get(self, url, params=None, timeout=None, tentativas=None):
+        """
+        GET com retentativas. Retorna a resposta (inclusive 4xx) ou levanta
+        UpstreamError se o host estiver indisponível.
+        """
+        host = urlsplit(url).hostname or ''
+        timeout = timeout or self.timeouts.get(host, TIMEOUT_PADRAO)
+        tentativas = tentativas or self.tentativas
+        disjuntor = self.disjuntor(host)
+
+        if not disjuntor.permitir():
+            registrar_upstream(host, 'circuito_aberto')
+            raise CircuitoAberto(f'Circuito aberto para {host}')
+
+        ultimo_erro = None
+        for tentativa in range(tentativas):
+            if tentativa:
+                time.sleep(self._espera(tentativa))
+            try:
+                response = self.sessao.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                registrar_upstream(host, 'erro_conexao')
+                ultimo_erro = e
+                continue
+
+            if response.status_code in STATUS_TRANSITORIOS:
+                registrar_upstream(host, 'status_transitorio')
+                ultimo_erro = UpstreamError(f'{host} respondeu {response.status_code}')
+                continue
+
+            registrar_upstream(host, 'sucesso')
+            disjuntor.registrar_sucesso()
+            return response
+
+        registrar_upstream(host, 'falha')
+        disjuntor.registrar_falha()
+        raise UpstreamError(f'Falha ao consultar {host}: {ultimo_erro}')
+
+    def get_json(self, url, params=None, timeout=None, tentativas=None):
+        """GET que exige status 2xx e devolve o corpo JSON."""
+        response = self.get(url, params=params, timeout=timeout, tentativas=tentativas)
+        response.raise_for_status()
+        return response.json()
+
+
+# Cliente compartilhado pelo processo
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def obter_cliente():
+    """Retorna o cliente compartilhado (criado na primeira chamada)."""
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                _cliente = ClienteUpstream()
+    return _cliente
@@ -4,6 +4,7 @@ import axios from 'axios'
 const EnergyCalculator = () => {
   const [cep, setCep] = useState('')
   const [consumo, setConsumo] = useState('')
+  const [subclasse, setSubclasse] = useState('')
   const [loading, setLoading] = useState(false)
   const [result, setResult] = useState(null)
   const [error, setError] = useState(null)
@@ -28,9 +29,13 @@ const EnergyCalculator = () => {
     setResult(null)
 
     try {
-      const response = await axios.post('/api/calculate', {
-        cep: cep.replace('-', ''),
-        consumo: parseFloat(consumo)
+      // GET: cálculos repetidos são servidos pelo cache da CDN
+      const response = await axios.get('/api/calculate', {
+        params: {
+          cep: cep.replace('-', ''),
+          consumo: parseFloat(consumo),
+          ...(subclasse && { subclasse })
+        }
       })
 
       setResult(response.data)
@@ -94,6 +99,23 @@ const EnergyCalculator = () => {
             </div>
           </div>
 
+          <div>
+            <label htmlFor="subclasse" className="block text-sm font-medium text-gray-700 mb-2">
+              Subclasse
+            </label>
+            <select
+              id="subclasse"
+              value={subclasse}
+              onChange={(e) => setSubclasse(e.target.value)}
+              className="w-full px-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-primary-500 focus:border-transparent transition"
+            >
+              <option value="">Residencial</option>
+              <option value="baixa_renda">Tarifa Social (baixa renda)</option>
+              <option value="baixa_renda_escalonada">Tarifa Social escalonada</option>
+              <option value="indigena_quilombola">Tarifa Social indígena/quilombola</option>
+            </select>
+          </div>
+
           <button
             type="submit"
             disabled={loading}
@@ -153,12 +175,48 @@ const EnergyCalculator = () => {
                     {formatCurrency(result.valor_bandeira)}
                   </p>
                 </div>
+                {result.desconto > 0 && (
+                  <div className="flex justify-between items-center mb-2">
+                    <p className="text-gray-700">
+                      Desconto Tarifa Social já aplicado ({result.consumo_faturado.toFixed(1)} kWh faturados)
+                    </p>
+                    <p className="text-lg font-semibold text-green-700">
+                      -{formatCurrency(result.desconto)}
+                    </p>
+                  </div>
+                )}
                 <div className="border-t border-primary-300 mt-3 pt-3 flex justify-between items-center">
-                  <p className="text-xl font-bold text-gray-800">Valor Total Estimado</p>
-                  <p className="text-3xl font-bold text-primary-700">
+                  <p className="text-xl font-bold text-gray-800">
+                    {result.impostos ? 'Valor sem Impostos' : 'Valor Total Estimado'}
+                  </p>
+                  <p className={result.impostos ? 'text-lg font-semibold text-gray-800' : 'text-3xl font-bold text-primary-700'}>
                     {formatCurrency(result.valor_total)}
                   </p>
                 </div>
+                {result.impostos && (
+                  <>
+                    <div className="flex justify-between items-center mt-3 mb-2">
+                      <p className="text-gray-700">ICMS ({(result.impostos.icms.aliquota * 100).toFixed(1)}%)</p>
+                      <p className="text-lg font-semibold text-gray-800">
+                        {formatCurrency(result.impostos.icms.valor)}
+                      </p>
+                    </div>
+                    <div className="flex justify-between items-center mb-2">
+                      <p className="text-gray-700">
+                        PIS/COFINS ({((result.impostos.pis.aliquota + result.impostos.cofins.aliquota) * 100).toFixed(2)}%)
+                      </p>
+                      <p className="text-lg font-semibold text-gray-800">
+                        {formatCurrency(result.impostos.pis.valor + result.impostos.cofins.valor)}
+                      </p>
+                    </div>
+                    <div className="border-t border-primary-300 mt-3 pt-3 flex justify-between items-center">
+                      <p className="text-xl font-bold text-gray-800">Valor Total Estimado</p>
+                      <p className="text-3xl font-bold text-primary-700">
+                        {formatCurrency(result.valor_total_com_impostos)}
+                      </p>
+                    </div>
+                  </>
+                )}
               </div>
 
               {result.comparacao && (
@@ -196,7 +254,7 @@ const EnergyCalculator = () => {
           </li>
           <li className="flex items-start">
             <span className="font-semibold text-amber-800 mr-2">•</span>
-            <span><strong>Impostos NÃO inclusos:</strong> O cálculo NÃO inclui ICMS (18-33%), PIS/COFINS (~3-4%), que são adicionados pela distribuidora</span>
+            <span><strong>Impostos estimados:</strong> ICMS pela alíquota de referência do estado (com as faixas de isenção ou redução por consumo) e PIS/COFINS por alíquotas médias; na conta, PIS/COFINS variam mês a mês</span>
           </li>
           <li className="flex items-start">
             <span className="font-semibold text-amber-800 mr-2">•</span>
@@ -211,7 +269,7 @@ const EnergyCalculator = () => {
 
       <div className="mt-4 bg-blue-50 border border-blue-200 rounded-lg p-4">
         <p className="text-xs text-blue-800 text-center">
-          💡 <strong>Dica:</strong> O valor final na sua conta pode ser até 30-40% maior devido aos impostos estaduais e federais
+          💡 <strong>Dica:</strong> O valor final na sua conta pode variar um pouco em relação ao estimado, conforme as alíquotas efetivas de PIS/COFINS e a contribuição de iluminação pública do município
         </p>
       </div>
     </div>